@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+"""
+Benchmark the memory taken by scraped odds in the model classes.
+
+Builds several cycles of racing cards, 100k outcomes in total by default, once
+with plain dataclasses laid out like the models used to be (a __dict__ per
+instance, a fresh string per name) and once with the current slotted models
+that intern their names, and prints the memory of each.
+"""
+
+import argparse
+import gc
+import logging
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List
+
+from surebetbot.core.models import Market, MarketType, Outcome
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)],
+)
+logger = logging.getLogger("benchmark_models")
+
+RUNNERS_PER_RACE = 20
+
+
+@dataclass
+class DictOutcome:
+    name: str
+    odds: float
+
+
+@dataclass
+class DictMarket:
+    id: str
+    type: MarketType
+    name: str
+    outcomes: List[DictOutcome]
+    is_live: bool = False
+    line: float = None
+
+
+def build_cycles(outcome_class: Callable, market_class: Callable, outcomes: int, cycles: int) -> list:
+    """
+    Build racing Win markets the way a scraper does, with every name formatted afresh.
+
+    Args:
+        outcome_class: Class of the outcomes
+        market_class: Class of the markets
+        outcomes: Outcomes in total across every cycle
+        cycles: Scrape cycles kept in memory
+
+    Returns:
+        The markets of every cycle
+    """
+    races = max(1, outcomes // (cycles * RUNNERS_PER_RACE))
+    markets = []
+    for cycle in range(cycles):
+        for race in range(races):
+            markets.append(market_class(
+                id="win",
+                type=MarketType.WIN,
+                name="".join(["W", "in"]),
+                outcomes=[
+                    outcome_class(name=f"{runner + 1}. Horse {race}-{runner} (Jockey {runner})", odds=2.0 + runner)
+                    for runner in range(RUNNERS_PER_RACE)
+                ],
+            ))
+    return markets
+
+
+def measure(outcome_class: Callable, market_class: Callable, outcomes: int, cycles: int) -> int:
+    """Bytes allocated to hold the built markets."""
+    gc.collect()
+    tracemalloc.start()
+    markets = build_cycles(outcome_class, market_class, outcomes, cycles)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del markets
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--outcomes", type=int, default=100_000, help="Outcomes in total")
+    parser.add_argument("--cycles", type=int, default=5, help="Scrape cycles kept in memory")
+    args = parser.parse_args()
+
+    started = datetime.now()
+    before = measure(DictOutcome, DictMarket, args.outcomes, args.cycles)
+    after = measure(Outcome, Market, args.outcomes, args.cycles)
+    per_100k = 100_000 / args.outcomes
+
+    logger.info(f"Dataclasses with __dict__: {before * per_100k / 2**20:.1f} MiB per 100k outcomes")
+    logger.info(f"Slotted, interned models:  {after * per_100k / 2**20:.1f} MiB per 100k outcomes")
+    logger.info(f"Saved {(1 - after / before) * 100:.0f}% in {(datetime.now() - started).total_seconds():.1f}s")
+
+
+if __name__ == "__main__":
+    main()
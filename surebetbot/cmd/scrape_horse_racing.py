@@ -11,6 +11,8 @@ import sys
 from datetime import datetime
 
 from surebetbot.core.models import SportType
+from surebetbot.scrapers.browser_pool import close_browser_pool
+from surebetbot.scrapers.http_client import close_http_client
 from surebetbot.scrapers.sportsbet_horse_racing import SportsbetHorseRacingScraper
 
 # Set up logging
@@ -111,8 +113,10 @@ async def main():
         logger.error(f"Error scraping horse racing events: {str(e)}")
     
     finally:
-        # Close the scraper
+        # Close the scraper and shut down the shared browsers and connections
         await scraper.cleanup()
+        await close_browser_pool()
+        await close_http_client()
     
     logger.info("Sportsbet horse racing scraper completed")
 
@@ -12,6 +12,8 @@ from datetime import datetime
 from typing import Dict, List
 
 from surebetbot.core.models import Event, SportType
+from surebetbot.scrapers.browser_pool import close_browser_pool
+from surebetbot.scrapers.http_client import close_http_client
 from surebetbot.scrapers.sportsbet_scraper import SportsbetScraper
 
 # Set up logging
@@ -169,8 +171,10 @@ async def main():
             logger.warning("No events found")
     
     finally:
-        # Close the scraper
+        # Close the scraper and shut down the shared browsers and connections
         await scraper.cleanup()
+        await close_browser_pool()
+        await close_http_client()
     
     logger.info("Sportsbet scraper completed")
 
@@ -0,0 +1,60 @@
+"""
+Alias tables used to match the same team or competition across bookmakers.
+
+Keys and values are normalized names: lowercase, no punctuation, single spaces.
+"""
+
+from typing import Dict
+
+# Whole-name aliases, mapped to the name every bookmaker's spelling is compared under.
+# Bare city names are left out on purpose: "Sydney" is Sydney FC in soccer but the Swans in AFL.
+TEAM_ALIASES: Dict[str, str] = {
+    "man utd": "manchester united",
+    "man united": "manchester united",
+    "man city": "manchester city",
+    "spurs": "tottenham hotspur",
+    "tottenham": "tottenham hotspur",
+    "wolves": "wolverhampton wanderers",
+    "wolverhampton": "wolverhampton wanderers",
+    "brighton": "brighton hove albion",
+    "nottm forest": "nottingham forest",
+    "sheff utd": "sheffield united",
+    "milan": "ac milan",
+    "inter": "inter milan",
+    "internazionale": "inter milan",
+    "psg": "paris saint germain",
+    "paris sg": "paris saint germain",
+    "bayern": "bayern munich",
+    "bayern munchen": "bayern munich",
+    "atletico": "atletico madrid",
+    "wsw": "western sydney wanderers",
+    "gws": "gws giants",
+    "greater western sydney": "gws giants",
+}
+
+# Word-level aliases applied before the whole-name table
+TOKEN_ALIASES: Dict[str, str] = {
+    "utd": "united",
+    "st": "saint",
+}
+
+# Words that carry no identity ("FC", "The"). "AC" stays: it is what tells AC Milan from Inter.
+STOP_TOKENS = {"fc", "afc", "sc", "cf", "the", "club"}
+
+# Words that tell a club's other sides apart; names only match when they agree on these
+QUALIFIER_TOKENS = {"women", "womens", "w", "u17", "u19", "u20", "u21", "u23", "reserves", "ii", "b", "youth"}
+
+COMPETITION_ALIASES: Dict[str, str] = {
+    "epl": "english premier league",
+    "premier league": "english premier league",
+    "a league": "a league men",
+    "a league mens": "a league men",
+    "isuzu ute a league": "a league men",
+    "la liga": "spanish la liga",
+    "serie a": "italian serie a",
+    "bundesliga": "german bundesliga",
+    "ucl": "uefa champions league",
+    "champions league": "uefa champions league",
+    "nba": "nba",
+    "nbl": "nbl",
+}
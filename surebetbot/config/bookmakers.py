@@ -0,0 +1,148 @@
+"""
+Bookmaker definitions and per-bookmaker scraping configuration.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from surebetbot.config import settings
+from surebetbot.core.models import Bookmaker, SportType
+
+
+SPORTSBET = Bookmaker(
+    id="sportsbet",
+    name="Sportsbet",
+    base_url="https://www.sportsbet.com.au"
+)
+
+TAB = Bookmaker(
+    id="tab",
+    name="TAB",
+    base_url="https://www.tab.com.au"
+)
+
+LADBROKES = Bookmaker(
+    id="ladbrokes",
+    name="Ladbrokes",
+    base_url="https://www.ladbrokes.com.au"
+)
+
+BOOKMAKERS: Dict[str, Bookmaker] = {
+    bookmaker.id: bookmaker for bookmaker in (SPORTSBET, TAB, LADBROKES)
+}
+
+
+# Hosts of analytics, tag managers and ad networks. None of them carry odds.
+TRACKER_URL_PATTERNS = [
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googleadservices.com",
+    "doubleclick.net",
+    "connect.facebook.net",
+    "facebook.com/tr",
+    "bat.bing.com",
+    "clarity.ms",
+    "hotjar.com",
+    "nr-data.net",
+    "newrelic.com",
+    "segment.io",
+    "optimizely.com",
+    "scorecardresearch.com",
+    "quantserve.com",
+    "tiqcdn.com",
+    "adnxs.com",
+    "criteo.com",
+    "tiktok.com/i18n/pixel",
+]
+
+
+@dataclass
+class ResourceFilterConfig:
+    """
+    Which requests a bookmaker's pages are allowed to make.
+    Allowed URL patterns win over blocked resource types and blocked URL patterns.
+    """
+    blocked_resource_types: List[str] = field(default_factory=lambda: ["image", "media", "font"])
+    blocked_url_patterns: List[str] = field(default_factory=lambda: list(TRACKER_URL_PATTERNS))
+    allowed_url_patterns: List[str] = field(default_factory=list)
+    enabled: bool = True
+
+
+RESOURCE_FILTERS: Dict[str, ResourceFilterConfig] = {
+    # Sportsbet serves runner silks and team logos as images; the odds are plain text
+    "sportsbet": ResourceFilterConfig(
+        blocked_resource_types=["image", "media", "font", "texttrack", "eventsource", "manifest"],
+        blocked_url_patterns=TRACKER_URL_PATTERNS + ["sportsbet.com.au/content/promos"],
+    ),
+}
+
+
+def get_resource_filter_config(bookmaker_id: str) -> ResourceFilterConfig:
+    """
+    Get the resource filter configuration of a bookmaker.
+
+    Args:
+        bookmaker_id: The bookmaker's id
+
+    Returns:
+        The bookmaker's configuration, or the default one if it has none
+    """
+    return RESOURCE_FILTERS.get(bookmaker_id, ResourceFilterConfig())
+
+
+@dataclass
+class ScrapeBudget:
+    """
+    How hard the scheduler may hit a bookmaker's site.
+    Requests and bytes are paced with token buckets; pages are a hard limit.
+    """
+    requests_per_second: float = 1.0
+    burst: int = 3  # Requests sent back to back before pacing kicks in
+    concurrent_pages: int = settings.MAX_CONCURRENT_PAGES
+    bytes_per_minute: int = 20 * 2**20
+
+
+SCRAPE_BUDGETS: Dict[str, ScrapeBudget] = {
+    # Sportsbet's API gateway copes with more than the browser-only sites
+    "sportsbet": ScrapeBudget(requests_per_second=3.0, burst=6, concurrent_pages=4, bytes_per_minute=60 * 2**20),
+    "tab": ScrapeBudget(requests_per_second=1.0, burst=3, concurrent_pages=2),
+    "ladbrokes": ScrapeBudget(requests_per_second=1.0, burst=3, concurrent_pages=2),
+}
+
+
+def get_scrape_budget(bookmaker_id: str) -> ScrapeBudget:
+    """
+    Get the scrape budget of a bookmaker.
+
+    Args:
+        bookmaker_id: The bookmaker's id
+
+    Returns:
+        The bookmaker's budget, or the default one if it has none
+    """
+    return SCRAPE_BUDGETS.get(bookmaker_id, ScrapeBudget())
+
+
+# URL fragments of the JSON endpoints each bookmaker's frontend loads its odds from
+ODDS_API_PATTERNS: Dict[str, List[str]] = {
+    "sportsbet": ["/apigw/sportsbook-sports/", "/apigw/sportsbook-racing/"],
+    "tab": ["api.beta.tab.com.au/v1/tab-info-service/"],
+    "ladbrokes": ["api.ladbrokes.com.au/v2/"],
+}
+
+
+# JSON endpoints that can be fetched without a browser, per bookmaker and sport.
+# A sport without an endpoint (or whose endpoint fails) is scraped with Playwright.
+API_ENDPOINTS: Dict[str, Dict[SportType, List[str]]] = {
+    "sportsbet": {
+        SportType.SOCCER: [
+            "https://www.sportsbet.com.au/apigw/sportsbook-sports/Sportsbook/Sports/Class/29/Events?displayType=default",
+        ],
+        SportType.BASKETBALL: [
+            "https://www.sportsbet.com.au/apigw/sportsbook-sports/Sportsbook/Sports/Class/16/Events?displayType=default",
+        ],
+        SportType.TENNIS: [
+            "https://www.sportsbet.com.au/apigw/sportsbook-sports/Sportsbook/Sports/Class/13/Events?displayType=default",
+        ],
+    },
+}
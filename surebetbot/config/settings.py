@@ -0,0 +1,96 @@
+"""
+Runtime settings for SureBetBot.
+
+Every value can be overridden with an environment variable (or a local
+.env file) of the same name.
+"""
+
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    """Read a boolean flag from the environment."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Browser pool
+BROWSER_TYPE = os.getenv("BROWSER_TYPE", "firefox")  # Firefox works best with Sportsbet
+BROWSER_HEADLESS = _env_bool("BROWSER_HEADLESS", True)
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "2"))  # Warm browsers per browser type
+BROWSER_MAX_PAGES = int(os.getenv("BROWSER_MAX_PAGES", "200"))  # Recycle a browser after this many pages
+CONTEXT_MAX_PAGES = int(os.getenv("CONTEXT_MAX_PAGES", "50"))  # Recycle a context after this many pages
+
+# Scraping
+MAX_CONCURRENT_PAGES = int(os.getenv("MAX_CONCURRENT_PAGES", "4"))  # Event pages fetched at once per scraper
+NETWORK_CAPTURE = _env_bool("NETWORK_CAPTURE", True)  # Parse odds from captured JSON API responses before the DOM
+
+# HTTP fast path
+HTTP_CONNECTION_LIMIT = int(os.getenv("HTTP_CONNECTION_LIMIT", "100"))
+HTTP_LIMIT_PER_HOST = int(os.getenv("HTTP_LIMIT_PER_HOST", "8"))  # Keep-alive connections per bookmaker host
+HTTP_DNS_CACHE_TTL = int(os.getenv("HTTP_DNS_CACHE_TTL", "300"))  # Seconds
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "15"))  # Seconds per attempt
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+HTTP_BACKOFF = float(os.getenv("HTTP_BACKOFF", "0.5"))  # Seconds, doubled on every retry
+HTTP_MAX_RETRY_AFTER = float(os.getenv("HTTP_MAX_RETRY_AFTER", "60"))  # Seconds, cap on a server's Retry-After
+
+# Page readiness
+READINESS_TIMEOUT_MS = int(os.getenv("READINESS_TIMEOUT_MS", "8000"))  # Budget for a page to become ready
+NETWORK_QUIET_MS = int(os.getenv("NETWORK_QUIET_MS", "500"))  # No requests in flight for this long
+
+# Incremental scraping
+INCREMENTAL_SCRAPE = _env_bool("INCREMENTAL_SCRAPE", True)  # Only re-parse changed, near-start or stale events
+EVENT_STALE_TTL = int(os.getenv("EVENT_STALE_TTL", "600"))  # Seconds before an unchanged event is re-parsed anyway
+EVENT_NEAR_START = int(os.getenv("EVENT_NEAR_START", "1800"))  # Seconds before the start from which events are always re-parsed
+
+# Arbitrage
+MIN_PROFIT_PERCENTAGE = float(os.getenv("MIN_PROFIT_PERCENTAGE", "0.5"))  # Smallest profit worth an alert
+DEFAULT_TOTAL_STAKE = float(os.getenv("DEFAULT_TOTAL_STAKE", "100"))  # Total investment stakes are split from
+STAKE_STRATEGY = os.getenv("STAKE_STRATEGY", "equal_profit")  # proportional, equal_profit or profit_biased
+STAKE_ROUNDING = float(os.getenv("STAKE_ROUNDING", "1"))  # Stakes are multiples of this amount, 0 to keep cents
+MIDDLE_MAX_IMPLIED_SUM = float(os.getenv("MIDDLE_MAX_IMPLIED_SUM", "1.03"))  # Largest Σ 1/odds of a middle worth reporting
+
+# Alerts
+ALERT_TTL = int(os.getenv("ALERT_TTL", "3600"))  # Seconds before an unchanged opportunity is alerted again
+ALERT_PROFIT_STEP = float(os.getenv("ALERT_PROFIT_STEP", "0.5"))  # Profit change, in percentage points, that re-fires an alert
+ALERT_EXPIRY = float(os.getenv("ALERT_EXPIRY", "120"))  # Seconds after which an unsent alert is dropped as stale
+
+# Notifications
+DISCORD_WEBHOOK_URL = os.getenv("DISCORD_WEBHOOK_URL", "")
+NOTIFY_QUEUE_SIZE = int(os.getenv("NOTIFY_QUEUE_SIZE", "1000"))  # Alerts waiting to be sent before the oldest is dropped
+NOTIFY_BATCH_SIZE = int(os.getenv("NOTIFY_BATCH_SIZE", "10"))  # Alerts per message, Discord allows 10 embeds
+NOTIFY_BATCH_WINDOW = float(os.getenv("NOTIFY_BATCH_WINDOW", "0.5"))  # Seconds to wait for more alerts to share a message
+NOTIFY_RATE = float(os.getenv("NOTIFY_RATE", "2"))  # Messages per second, sustained
+NOTIFY_BURST = int(os.getenv("NOTIFY_BURST", "5"))  # Messages sent back to back before pacing kicks in
+NOTIFY_MAX_RETRIES = int(os.getenv("NOTIFY_MAX_RETRIES", "3"))
+NOTIFY_BACKOFF = float(os.getenv("NOTIFY_BACKOFF", "1"))  # Seconds, doubled on every retry
+NOTIFY_URGENCY_HORIZON = float(os.getenv("NOTIFY_URGENCY_HORIZON", "3600"))  # Seconds to start within which alerts jump the queue
+
+# History storage
+SQLITE_PATH = os.getenv("SQLITE_PATH", "output/surebetbot.db")  # Odds history database
+SQLITE_QUEUE_SIZE = int(os.getenv("SQLITE_QUEUE_SIZE", "100"))  # Snapshots waiting for the writer before the oldest is dropped
+SQLITE_COMPACT_AFTER = int(os.getenv("SQLITE_COMPACT_AFTER", "86400"))  # Seconds before ticks are folded into OHLC bars
+SQLITE_OHLC_INTERVAL = int(os.getenv("SQLITE_OHLC_INTERVAL", "300"))  # Seconds covered by one OHLC bar
+SQLITE_COMPACT_EVERY = int(os.getenv("SQLITE_COMPACT_EVERY", "3600"))  # Seconds between compactions, 0 to never compact
+
+# Scheduling
+SCHEDULE_MIN_INTERVAL = float(os.getenv("SCHEDULE_MIN_INTERVAL", "10"))  # Seconds between refreshes of an event about to start
+SCHEDULE_MAX_INTERVAL = float(os.getenv("SCHEDULE_MAX_INTERVAL", "3600"))  # Seconds between refreshes of an event days out
+SCHEDULE_INTERVAL_FRACTION = float(os.getenv("SCHEDULE_INTERVAL_FRACTION", "0.02"))  # Refresh interval as a share of the time to start
+SCHEDULE_DISCOVERY_INTERVAL = float(os.getenv("SCHEDULE_DISCOVERY_INTERVAL", "600"))  # Seconds between listing scrapes that find new events
+SCHEDULE_CONCURRENCY = int(os.getenv("SCHEDULE_CONCURRENCY", "4"))  # Jobs run at once across bookmakers
+SCHEDULE_AFTER_START = float(os.getenv("SCHEDULE_AFTER_START", "0"))  # Seconds after the start an event is still refreshed
+
+# In-memory state
+PRUNE_INTERVAL = float(os.getenv("PRUNE_INTERVAL", "60"))  # Seconds between evictions of started events
+PRUNE_IDLE_AFTER = float(os.getenv("PRUNE_IDLE_AFTER", "7200"))  # Seconds without a price before an event with no start time is evicted
+
+# Event matching
+MATCH_THRESHOLD = float(os.getenv("MATCH_THRESHOLD", "0.85"))  # Team name similarity needed to match events
+MATCH_TIME_TOLERANCE = int(os.getenv("MATCH_TIME_TOLERANCE", "15"))  # Minutes two start times may differ by
@@ -0,0 +1,361 @@
+"""
+Vectorized arbitrage detection.
+
+The odds of every scraped outcome are flattened into NumPy arrays once per
+cycle. Best odds per (matched event, market, outcome) across bookmakers and the
+implied-probability sum Σ 1/odds of every market are then computed in a few
+array operations instead of a Python loop over outcome combinations.
+
+Markets have any number of outcomes, from 2-way head to heads through 1X2 to
+racing fields of 20 runners, so the best prices are stored ragged: one flat
+array of cells with each market's outcomes contiguous, and per-market sums
+taken as segment reductions rather than over a table padded to the widest field.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from surebetbot.config import settings
+from surebetbot.core.matching import EventMatcher
+from surebetbot.core.market_keys import TYPE_KEYED_MARKETS, Line, describe_market
+from surebetbot.core.models import ArbitrageOpportunity, Bookmaker, MarketType, ScrapingResult
+from surebetbot.core.snapshot import OddsSnapshot
+
+logger = logging.getLogger(__name__)
+
+# Markets whose outcomes are mutually exclusive and exhaustive, so backing all of them always pays.
+# Place and exotic racing markets pay several selections at once and are left out, and correct score
+# markets list only some of the scores, so their outcomes are never known to cover every result.
+ARBITRAGE_MARKET_TYPES = {
+    MarketType.WIN,
+    MarketType.MONEYLINE,
+    MarketType.HANDICAP,
+    MarketType.TOTAL_OVER_UNDER,
+}
+
+
+def is_arbitrage_market(market_type: MarketType, name: str) -> bool:
+    """
+    Whether the outcomes of a keyed market cover every result, so that it can hold an arbitrage.
+
+    Args:
+        market_type: Type of the market key
+        name: Name of the market key, "" for the main result
+
+    Returns:
+        True for the main result and for handicap and total lines; props typed as a result
+        market ("To Win To Nil") may list only some of the results and are left out
+    """
+    if market_type not in ARBITRAGE_MARKET_TYPES:
+        return False
+    return market_type not in TYPE_KEYED_MARKETS or name == ""
+
+
+@dataclass
+class MarketBook:
+    """One market of one matched event, as laid out in the odds matrix."""
+    event_description: str
+    market_description: str
+    outcome_names: List[str] = field(default_factory=list)  # Display name per column
+    columns: Dict[str, int] = field(default_factory=dict)  # Outcome key to column
+    event: Hashable = None  # Matched event key
+    market_type: Optional[MarketType] = None
+    line: Optional[Line] = None  # Line of a handicap or total market
+    name: str = ""  # Market name key, "" for main result and line markets
+    start_time: Optional[datetime] = None
+
+    @property
+    def key(self) -> Tuple:
+        """(matched event, market type, line, market name), as the order book index keys the market."""
+        return (self.event, self.market_type, self.line, self.name)
+
+
+@dataclass
+class OddsMatrix:
+    """
+    Best-odds matrix of a batch of scraping results.
+
+    Markets of matched events are rows, each holding its own number of outcome
+    cells. Cell c of market m is at offsets[m] + c in the flat arrays.
+    """
+    books: List[MarketBook]
+    bookmakers: List[Bookmaker]
+    offsets: np.ndarray  # (markets + 1,) start of each market's cells
+    best_odds: np.ndarray  # (cells,) float64
+    best_bookmaker: np.ndarray  # (cells,) int index into bookmakers
+    outcome_counts: np.ndarray  # (markets,) outcomes seen per market
+    complete: np.ndarray  # (markets,) bool, some bookmaker priced every outcome of the market
+
+    def row(self, market: int) -> slice:
+        """The cells of one market."""
+        return slice(self.offsets[market], self.offsets[market + 1])
+
+    def implied_sums(self) -> np.ndarray:
+        """Σ 1/odds of every market's best prices, inf for markets that can not be covered."""
+        markets = np.repeat(np.arange(len(self.books)), self.outcome_counts)
+        sums = np.bincount(markets, weights=1.0 / self.best_odds, minlength=len(self.books))
+        usable = self.complete & (self.outcome_counts >= 2)
+        return np.where(usable, sums, np.inf)
+
+    def several_bookmakers(self) -> np.ndarray:
+        """Whether each market's best prices come from more than one bookmaker."""
+        markets = np.repeat(np.arange(len(self.books)), self.outcome_counts)
+        first = self.best_bookmaker[self.offsets[:-1]]
+        differs = self.best_bookmaker != first[markets]
+        return np.bincount(markets, weights=differs, minlength=len(self.books)) > 0
+
+
+def build_odds_matrix(
+    source: Union[Iterable[ScrapingResult], OddsSnapshot],
+    matcher: Optional[EventMatcher] = None,
+) -> OddsMatrix:
+    """
+    Lay out the odds of a batch of scraping results as arrays.
+
+    Args:
+        source: Scraping results of one cycle, one per bookmaker, or a snapshot of them
+        matcher: Matches events across bookmakers, events are grouped by exact names without one;
+            unused for a snapshot, which was matched when it was taken
+
+    Returns:
+        The best-odds matrix
+    """
+    snapshot = source if isinstance(source, OddsSnapshot) else OddsSnapshot.from_results(source, matcher)
+    # One flag per market key, plus a last, unset one that NO_KEY (-1) indexes
+    arbitrage_keys = np.zeros(len(snapshot.market_keys) + 1, dtype=bool)
+    for code, (market_type, _, name) in enumerate(snapshot.market_keys.values):
+        arbitrage_keys[code] = is_arbitrage_market(market_type, name)
+    usable = np.flatnonzero(
+        arbitrage_keys[snapshot.market_key] & (snapshot.price > 1.0) & ~snapshot.market_live[snapshot.market]
+    )
+
+    # Rows are (matched event, market key) pairs, cells are (row, outcome key) pairs,
+    # both numbered in order of first appearance
+    n_market_keys = max(len(snapshot.market_keys), 1)
+    n_outcome_keys = max(len(snapshot.outcome_keys), 1)
+    group = snapshot.event_group[snapshot.event[usable]].astype(np.int64)
+    row, row_first = _first_seen_codes(group * n_market_keys + snapshot.market_key[usable])
+    n_rows = len(row_first)
+
+    cell_codes, cell_first, cell_inverse = np.unique(
+        row * n_outcome_keys + snapshot.outcome[usable], return_index=True, return_inverse=True
+    )
+    cell_row = cell_codes // n_outcome_keys
+    # Cells of a row are contiguous, in the order their outcomes were first seen
+    cell_order = np.lexsort((cell_first, cell_row))
+    cell_rank = np.empty(len(cell_codes), dtype=np.int64)
+    cell_rank[cell_order] = np.arange(len(cell_codes))
+    cell = cell_rank[cell_inverse]
+
+    outcome_counts = np.bincount(cell_row, minlength=n_rows).astype(np.int64)
+    offsets = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(outcome_counts, out=offsets[1:])
+    # Every cell was created by a price, so none stays empty
+    best_odds = np.zeros(offsets[-1])
+    best_bookmaker = np.zeros(offsets[-1], dtype=np.int64)
+    complete = np.zeros(n_rows, dtype=bool)
+    books: List[MarketBook] = []
+    bookmakers = snapshot.bookmakers
+
+    if len(usable):
+        bk_arr = snapshot.bookmaker[usable].astype(np.int64)
+        odds_arr = snapshot.price[usable]
+
+        # Highest price per cell: sort by cell, then by descending odds, and keep each cell's first entry
+        order = np.lexsort((-odds_arr, cell))
+        _, first = np.unique(cell[order], return_index=True)
+        best = order[first]
+        best_odds[cell[best]] = odds_arr[best]
+        best_bookmaker[cell[best]] = bk_arr[best]
+
+        # A market is only covered when one bookmaker prices all of its outcomes; outcomes only
+        # some bookmakers list (or spell differently) would otherwise make up false arbitrages
+        quoted = np.unique(cell * len(bookmakers) + bk_arr)
+        quoted_cell = quoted // len(bookmakers)
+        market = np.searchsorted(offsets, quoted_cell, side="right") - 1
+        per_bookmaker = np.unique(market * len(bookmakers) + quoted % len(bookmakers), return_counts=True)
+        max_per_bookmaker = np.zeros(n_rows, dtype=np.int64)
+        np.maximum.at(max_per_bookmaker, per_bookmaker[0] // len(bookmakers), per_bookmaker[1])
+        complete = max_per_bookmaker == outcome_counts
+
+        # Rows are described by the first bookmaker that listed them
+        for first_price in usable[row_first].tolist():
+            event = snapshot.events[snapshot.event[first_price]]
+            market = snapshot.market_header(snapshot.market[first_price])
+            market_type, line, name = snapshot.market_keys.decode(snapshot.market_key[first_price])
+            books.append(MarketBook(
+                event_description=f"{event.home_team} vs {event.away_team}" if event.away_team else event.home_team,
+                market_description=describe_market(market, line),
+                event=snapshot.groups.decode(snapshot.event_group[snapshot.event[first_price]]),
+                market_type=market_type,
+                line=line,
+                name=name,
+                start_time=event.start_time,
+            ))
+
+        # Show each best price under the name its bookmaker used
+        best_price = np.empty(len(cell_codes), dtype=np.int64)
+        best_price[cell[best]] = usable[best]
+        cell_outcome = np.empty(len(cell_codes), dtype=np.int64)
+        cell_outcome[cell_rank] = cell_codes % n_outcome_keys
+        names = snapshot.name[best_price].tolist()
+        for index, (book_row, outcome) in enumerate(zip(cell_row[cell_order].tolist(), cell_outcome.tolist())):
+            book = books[book_row]
+            book.columns[snapshot.outcome_keys.decode(outcome)] = index - offsets[book_row]
+            book.outcome_names.append(snapshot.strings.decode(names[index]))
+
+    return OddsMatrix(
+        books=books,
+        bookmakers=bookmakers,
+        offsets=offsets,
+        best_odds=best_odds,
+        best_bookmaker=best_bookmaker,
+        outcome_counts=outcome_counts,
+        complete=complete,
+    )
+
+
+def _first_seen_codes(values: np.ndarray):
+    """
+    Dense codes of values, numbered in order of first appearance.
+
+    Returns:
+        (code per value, position of each code's first appearance)
+    """
+    _, first, inverse = np.unique(values, return_index=True, return_inverse=True)
+    order = np.argsort(first, kind="stable")
+    rank = np.empty(len(first), dtype=np.int64)
+    rank[order] = np.arange(len(first))
+    return rank[inverse.reshape(-1)], first[order]
+
+
+class ArbitrageDetector:
+    """
+    Finds arbitrage opportunities across the results of several bookmakers.
+    """
+
+    def __init__(
+        self,
+        min_profit_percentage: float = settings.MIN_PROFIT_PERCENTAGE,
+        total_stake: float = settings.DEFAULT_TOTAL_STAKE,
+        matcher: Optional[EventMatcher] = None,
+    ):
+        """
+        Initialize the detector.
+
+        Args:
+            min_profit_percentage: Smallest profit worth reporting, in percent
+            total_stake: Total investment the stakes are split from
+            matcher: Event matcher, kept across cycles so each event is matched once
+        """
+        self.min_profit_percentage = min_profit_percentage
+        self.total_stake = total_stake
+        self.matcher = matcher or EventMatcher()
+
+    def find_opportunities(self, results: Iterable[ScrapingResult]) -> List[ArbitrageOpportunity]:
+        """
+        Find the arbitrage opportunities in a batch of scraping results.
+
+        Args:
+            results: Scraping results of one cycle
+
+        Returns:
+            Opportunities above the profit threshold, most profitable first
+        """
+        matrix = build_odds_matrix(results, self.matcher)
+        if not matrix.books:
+            return []
+
+        sums = matrix.implied_sums()
+        # Σ 1/odds below this bound means at least min_profit_percentage profit
+        threshold = 1.0 / (1.0 + self.min_profit_percentage / 100)
+        # One bookmaker's own prices summing below 1 are a misread market, not an arbitrage
+        rows = np.flatnonzero((sums < 1.0) & (sums <= threshold) & matrix.several_bookmakers())
+        rows = rows[np.argsort(sums[rows], kind="stable")]
+
+        opportunities = [self._to_opportunity(matrix, row, sums[row]) for row in rows]
+        logger.info(f"Checked {len(matrix.books)} markets, found {len(opportunities)} arbitrage opportunities")
+        return opportunities
+
+    def _to_opportunity(self, matrix: OddsMatrix, row: int, implied_sum: float) -> ArbitrageOpportunity:
+        book = matrix.books[row]
+        cells = matrix.row(row)
+        return make_opportunity(
+            book.event_description,
+            book.market_description,
+            [
+                (name, float(odds), matrix.bookmakers[bookmaker])
+                for name, odds, bookmaker in zip(
+                    book.outcome_names, matrix.best_odds[cells], matrix.best_bookmaker[cells]
+                )
+            ],
+            self.total_stake,
+            implied_sum,
+            book.key,
+            book.start_time,
+        )
+
+
+def make_opportunity(
+    event_description: str,
+    market_description: str,
+    selections: List[Tuple[str, float, Bookmaker]],
+    total_stake: float,
+    implied_sum: Optional[float] = None,
+    market_key: Optional[Tuple] = None,
+    start_time: Optional[datetime] = None,
+) -> ArbitrageOpportunity:
+    """
+    Build an opportunity with stakes that return the same amount whichever outcome wins.
+
+    Args:
+        event_description: e.g. "Arsenal vs Chelsea"
+        market_description: e.g. "Match Result"
+        selections: (outcome name, best odds, bookmaker) per outcome
+        total_stake: Total investment split across the outcomes
+        implied_sum: Σ 1/odds of the selections, computed when not given
+        market_key: (matched event, market type, line, market name) of the market
+        start_time: When the event starts
+
+    Returns:
+        The opportunity
+    """
+    odds = np.array([selection[1] for selection in selections], dtype=np.float64)
+    if implied_sum is None:
+        implied_sum = float((1.0 / odds).sum())
+    # Stakes proportional to 1/odds return the same amount whichever outcome wins
+    stakes = np.round(total_stake / (odds * implied_sum), 2)
+
+    return ArbitrageOpportunity(
+        event_description=event_description,
+        market_description=market_description,
+        selections=selections,
+        profit_percentage=round((1.0 / implied_sum - 1.0) * 100, 4),
+        required_investment=round(float(stakes.sum()), 2),
+        stakes={name: float(stake) for (name, _, _), stake in zip(selections, stakes)},
+        market_key=market_key,
+        start_time=start_time,
+    )
+
+
+def find_arbitrage_opportunities(
+    results: Iterable[ScrapingResult],
+    min_profit_percentage: Optional[float] = None,
+) -> List[ArbitrageOpportunity]:
+    """
+    Find the arbitrage opportunities in a batch of scraping results.
+
+    Args:
+        results: Scraping results of one cycle
+        min_profit_percentage: Smallest profit worth reporting, defaults to the configured one
+
+    Returns:
+        Opportunities above the profit threshold, most profitable first
+    """
+    if min_profit_percentage is None:
+        min_profit_percentage = settings.MIN_PROFIT_PERCENTAGE
+    return ArbitrageDetector(min_profit_percentage=min_profit_percentage).find_opportunities(results)
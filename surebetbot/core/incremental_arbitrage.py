@@ -0,0 +1,258 @@
+"""
+Incremental arbitrage detection on a stream of odds changes.
+
+Instead of recomputing every market at the end of a scrape cycle, each price
+change is applied to the best-price order book as it is seen. Only markets
+whose best price actually moved have their running Σ 1/odds adjusted, and the
+caller is told which arbitrages opened, closed or changed profit. Markets of
+started events are dropped together with their prices in the order book.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Hashable, Iterable, List, Optional
+
+from surebetbot.config import settings
+from surebetbot.core.arbitrage import is_arbitrage_market, make_opportunity
+from surebetbot.core.matching import EventMatcher
+from surebetbot.core.models import ArbitrageOpportunity, Event, ScrapingResult
+from surebetbot.core.snapshot_diff import SnapshotDiff
+from surebetbot.storage.in_memory import MarketKey, OddsDelta, OrderBookIndex
+
+logger = logging.getLogger(__name__)
+
+# Running sums are re-added from scratch after this many changes to shed float drift
+RESUM_EVERY = 1000
+
+
+@dataclass
+class MarketState:
+    """Running totals of one market's best prices."""
+    implied_sum: float = 0.0  # Σ 1/best odds over the outcomes that have a price
+    outcomes: int = 0  # Outcomes with at least one price
+    quotes: Dict[str, int] = field(default_factory=dict)  # Outcomes each bookmaker prices
+    changes: int = 0
+    event_description: str = ""
+    market_description: str = ""
+    start_time: Optional[datetime] = None
+
+    @property
+    def complete(self) -> bool:
+        """Some bookmaker prices every outcome, so the outcome set is known to be whole."""
+        return self.outcomes >= 2 and max(self.quotes.values(), default=0) == self.outcomes
+
+
+@dataclass
+class ArbitrageUpdate:
+    """Arbitrages that changed state after a batch of deltas."""
+    opened: List[ArbitrageOpportunity] = field(default_factory=list)
+    closed: List[ArbitrageOpportunity] = field(default_factory=list)  # As they were last seen open
+    changed: List[ArbitrageOpportunity] = field(default_factory=list)  # Still open, with a new profit
+
+    def __bool__(self) -> bool:
+        return bool(self.opened or self.closed or self.changed)
+
+
+class IncrementalArbitrageDetector:
+    """
+    Keeps arbitrage state up to date one odds change at a time.
+    """
+
+    def __init__(
+        self,
+        min_profit_percentage: float = settings.MIN_PROFIT_PERCENTAGE,
+        total_stake: float = settings.DEFAULT_TOTAL_STAKE,
+        index: Optional[OrderBookIndex] = None,
+    ):
+        """
+        Initialize the detector.
+
+        Args:
+            min_profit_percentage: Smallest profit worth reporting, in percent
+            total_stake: Total investment the stakes are split from
+            index: Order book to keep the best prices in, a new one with an event matcher by default
+        """
+        self.min_profit_percentage = min_profit_percentage
+        self.total_stake = total_stake
+        self.index = index or OrderBookIndex(EventMatcher())
+        self._threshold = 1.0 / (1.0 + min_profit_percentage / 100)
+        self._markets: Dict[MarketKey, MarketState] = {}
+        self._open: Dict[MarketKey, ArbitrageOpportunity] = {}
+
+    @property
+    def open_opportunities(self) -> List[ArbitrageOpportunity]:
+        """Arbitrages currently open."""
+        return list(self._open.values())
+
+    def apply(self, delta: OddsDelta) -> ArbitrageUpdate:
+        """Apply one price change."""
+        return self.apply_many([delta])
+
+    def apply_many(self, deltas: Iterable[OddsDelta]) -> ArbitrageUpdate:
+        """
+        Apply a batch of price changes. Each touched market is evaluated once, at the end.
+
+        Args:
+            deltas: The changes, in the order they were seen
+
+        Returns:
+            The arbitrages opened, closed and changed by the batch
+        """
+        touched: Dict[MarketKey, None] = {}
+
+        for delta in deltas:
+            market_key = delta.market_key
+            if not is_arbitrage_market(market_key[1], market_key[3]):
+                continue
+            state = self._markets.get(market_key)
+            if state is None:
+                state = self._markets[market_key] = MarketState()
+            # The first bookmaker to list the market names it
+            if not state.event_description and delta.event_description:
+                state.event_description = delta.event_description
+            if not state.market_description and delta.market_description:
+                state.market_description = delta.market_description
+            if state.start_time is None:
+                state.start_time = delta.start_time
+
+            change = self.index.apply(delta)
+            bookmaker_id = delta.bookmaker.id
+            if change.added:
+                state.quotes[bookmaker_id] = state.quotes.get(bookmaker_id, 0) + 1
+            elif change.removed:
+                remaining = state.quotes.pop(bookmaker_id, 0) - 1
+                if remaining > 0:
+                    state.quotes[bookmaker_id] = remaining
+
+            if change.best == change.previous_best:
+                # A price below the best moved; the sum is unaffected, the coverage may not be
+                if change.added or change.removed:
+                    touched[market_key] = None
+                continue
+            if change.previous_best is None:
+                state.outcomes += 1
+            if change.best is None:
+                state.outcomes -= 1
+            state.implied_sum += (1.0 / change.best if change.best else 0.0) - \
+                (1.0 / change.previous_best if change.previous_best else 0.0)
+            state.changes += 1
+            if state.changes % RESUM_EVERY == 0:
+                self._resum(market_key, state)
+            touched[market_key] = None
+
+        update = ArbitrageUpdate()
+        for market_key in touched:
+            self._evaluate(market_key, update)
+        return update
+
+    def ingest_event(self, event: Event) -> ArbitrageUpdate:
+        """
+        Apply the price changes of a freshly scraped event.
+
+        Args:
+            event: A bookmaker's event
+
+        Returns:
+            The arbitrages opened, closed and changed by it
+        """
+        return self.apply_many(self.index.event_deltas(event))
+
+    def ingest_result(self, result: ScrapingResult) -> ArbitrageUpdate:
+        """Apply the price changes of every event of a scraping result."""
+        deltas: List[OddsDelta] = []
+        for event in result.events:
+            deltas.extend(self.index.event_deltas(event, result.timestamp))
+        return self.apply_many(deltas)
+
+    def apply_diff(self, diff: SnapshotDiff) -> ArbitrageUpdate:
+        """
+        Apply the changes between two snapshots taken with the index's event matcher.
+
+        Args:
+            diff: The diff of consecutive snapshots
+
+        Returns:
+            The arbitrages opened, closed and changed by it
+        """
+        if not diff:
+            return ArbitrageUpdate()
+        return self.apply_many(diff.deltas())
+
+    def evict_event(self, event: Hashable) -> None:
+        """
+        Drop an event's prices from the order book and its markets' state, open arbitrages included.
+
+        Args:
+            event: Canonical event key
+        """
+        for market_key in self.index.evict_event(event):
+            self._forget_market(market_key)
+
+    def prune(self, before: datetime, idle_before: Optional[datetime] = None) -> List[Hashable]:
+        """
+        Evict the events that started before a point in time, see OrderBookIndex.prune.
+
+        Args:
+            before: Events starting earlier are evicted
+            idle_before: Events without a start time are evicted when their prices were last
+                updated earlier, kept without one
+
+        Returns:
+            The evicted events
+        """
+        evicted = self.index.prune(before, idle_before)
+        if evicted:
+            gone = set(evicted)
+            for market_key in [market_key for market_key in self._markets if market_key[0] in gone]:
+                self._forget_market(market_key)
+        return evicted
+
+    def _forget_market(self, market_key: MarketKey) -> None:
+        self._markets.pop(market_key, None)
+        was_open = self._open.pop(market_key, None)
+        if was_open is not None:
+            logger.info(f"Arbitrage dropped with its event: {was_open.event_description} {was_open.market_description}")
+
+    def _resum(self, market_key: MarketKey, state: MarketState) -> None:
+        books = self.index.market(*market_key)
+        state.implied_sum = sum(1.0 / book.best().odds for book in books.values())
+        state.outcomes = len(books)
+
+    def _evaluate(self, market_key: MarketKey, update: ArbitrageUpdate) -> None:
+        state = self._markets[market_key]
+        was_open = self._open.get(market_key)
+
+        best = None
+        if state.complete and state.implied_sum < 1.0 and state.implied_sum <= self._threshold:
+            best = self.index.best_prices(*market_key)
+            # One bookmaker's own prices summing below 1 are a misread market, not an arbitrage
+            if len({price.bookmaker.id for price in best.values()}) < 2:
+                best = None
+
+        if best is not None:
+            opportunity = make_opportunity(
+                state.event_description,
+                state.market_description,
+                [(price.outcome_name, price.odds, price.bookmaker) for price in best.values()],
+                self.total_stake,
+                state.implied_sum,
+                market_key,
+                state.start_time,
+            )
+            self._open[market_key] = opportunity
+            if was_open is None:
+                logger.info(
+                    f"Arbitrage opened: {opportunity.event_description} {opportunity.market_description} "
+                    f"{opportunity.profit_percentage:.2f}%"
+                )
+                update.opened.append(opportunity)
+            elif opportunity.profit_percentage != was_open.profit_percentage:
+                update.changed.append(opportunity)
+        elif was_open is not None:
+            del self._open[market_key]
+            logger.info(f"Arbitrage closed: {was_open.event_description} {was_open.market_description}")
+            update.closed.append(was_open)
+
+        if not state.outcomes:
+            del self._markets[market_key]
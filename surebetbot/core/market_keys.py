@@ -0,0 +1,206 @@
+"""
+Keys under which odds from different bookmakers line up.
+
+Bookmakers name the same event, market and outcome differently ("Match Result"
+and "Head to Head", "Arsenal -1.5" and "Chelsea +1.5"). These helpers reduce
+them to keys that compare equal across bookmakers, for the odds matrix, the
+order book index and odds snapshots alike.
+"""
+
+import re
+from typing import Hashable, List, NamedTuple, Optional, Tuple
+
+from surebetbot.core.models import Event, Market, MarketType, Outcome, SportType
+from surebetbot.core.utils import LINE_MARKET_TYPES, LINE_PATTERN, is_main_result_market, parse_line
+
+# Result markets whose main market is matched across bookmakers by type alone; its name differs
+# between bookmakers ("Match Result", "Head to Head") while the outcomes are the same. Their other
+# markets ("First Half Winner") are told apart by what they settle on.
+TYPE_KEYED_MARKETS = {MarketType.WIN, MarketType.MONEYLINE}
+
+# Words that make a total or handicap count something other than the main score
+MARKET_SUBJECTS = (
+    (re.compile(r"\bcorners?\b"), "corners"),
+    (re.compile(r"\b(cards?|bookings?)\b"), "cards"),
+    (re.compile(r"\b(1st|first) half\b"), "first half"),
+    (re.compile(r"\b(2nd|second) half\b"), "second half"),
+    (re.compile(r"\bquarter\b"), "quarter"),
+    (re.compile(r"\bsets?\b"), "sets"),
+)
+
+
+class Line(NamedTuple):
+    """The line of a handicap or total market, as part of the market's key."""
+    value: float  # The total, or the home team's handicap
+    subject: str = ""  # What is counted when it is not the main score, e.g. "corners" or "home"
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase a team, runner or outcome name and drop punctuation and club suffixes."""
+    name = re.sub(r"[^\w\s]", " ", name.lower())
+    name = re.sub(r"\b(fc|afc|sc|cf)\b", " ", name)
+    return " ".join(name.split())
+
+
+def event_key(event: Event) -> Hashable:
+    """
+    Key under which the same event from different bookmakers is grouped.
+
+    Args:
+        event: A scraped event
+
+    Returns:
+        (sport, home, away, start date)
+    """
+    return (
+        event.sport,
+        normalize_name(event.home_team),
+        normalize_name(event.away_team),
+        event.start_time.date(),
+    )
+
+
+def market_key(market: Market, line: Optional[Line] = None) -> Tuple[MarketType, Optional[Line], str]:
+    """
+    Key under which the same market of an event is grouped.
+
+    Args:
+        market: The bookmaker's market
+        line: The line of a handicap or total market, from line_outcomes
+
+    Returns:
+        (market type, line, name): the name is "" for main result and line markets, the
+        period or subject of other result markets ("first half"), their normalized name otherwise
+    """
+    if market.type in LINE_MARKET_TYPES:
+        return (market.type, line, "")
+    if market.type in TYPE_KEYED_MARKETS:
+        if is_main_result_market(market.name):
+            return (market.type, None, "")
+        return (market.type, None, name_subject(market.name) or normalize_name(market.name))
+    return (market.type, None, normalize_name(market.name))
+
+
+def describe_market(market: Market, line: Optional[Line]) -> str:
+    """The market name, with the line added when the name does not already show it."""
+    if line is None or parse_line(market.name) is not None:
+        return market.name
+    if market.type == MarketType.HANDICAP:
+        return f"{market.name} {line.value:+g}"
+    return f"{market.name} {line.value:g}"
+
+
+def _team_side(event: Event, name: str, swapped: bool) -> Optional[str]:
+    """"home", "away" or "draw" for a normalized outcome name, None when it names neither team."""
+    if name == normalize_name(event.home_team):
+        return "away" if swapped else "home"
+    if name == normalize_name(event.away_team):
+        return "home" if swapped else "away"
+    if name in ("draw", "tie", "x"):
+        return "draw"
+    return None
+
+
+def name_subject(market_name: str) -> str:
+    """What a market name says it counts or settles on, e.g. "corners" or "first half", "" for the main score."""
+    name = normalize_name(market_name)
+    return " ".join(subject for pattern, subject in MARKET_SUBJECTS if pattern.search(name))
+
+
+def market_subject(event: Event, market: Market, swapped: bool = False) -> str:
+    """
+    What a total or handicap market counts, "" for the main score.
+
+    Args:
+        event: The bookmaker's event
+        market: A handicap or total market
+        swapped: The bookmaker lists the teams the other way round than the matched event
+    """
+    subject = name_subject(market.name)
+    # Team totals ("Arsenal Total Goals") count one team's score only
+    padded = f" {normalize_name(market.name)} "
+    for team, side in ((event.home_team, "home"), (event.away_team, "away")):
+        team = normalize_name(team)
+        if team and f" {team} " in padded:
+            side = {"home": "away", "away": "home"}[side] if swapped else side
+            return f"{side} {subject}".strip()
+    return subject
+
+
+def line_outcomes(
+    event: Event,
+    market: Market,
+    swapped: bool = False,
+) -> List[Tuple[Optional[Line], str, Outcome]]:
+    """
+    Key every outcome of a market, splitting handicap and total markets by line.
+
+    Bookmakers often list several lines in one market ("Alternative Totals") or name
+    the line only in the outcomes ("Over 2.5"), so the line is read per outcome.
+    Totals are keyed "over" and "under"; handicaps "home", "away" (and "draw" for
+    3-way handicaps) under the home team's handicap, so "Arsenal -1.5" and
+    "Chelsea +1.5" land in the same market.
+
+    Args:
+        event: The bookmaker's event
+        market: The market
+        swapped: The bookmaker lists the teams the other way round than the matched event
+
+    Returns:
+        (line, outcome key, outcome) per outcome; outcomes of line markets whose line or side
+        can not be read are left out, the line is None for other markets
+    """
+    if market.type not in LINE_MARKET_TYPES:
+        return [(None, outcome_key(event, market, outcome.name, swapped), outcome) for outcome in market.outcomes]
+
+    subject = market_subject(event, market, swapped)
+    default = market.line if market.line is not None else parse_line(market.name)
+    keyed = []
+    for outcome in market.outcomes:
+        value = parse_line(outcome.name)
+        name = normalize_name(LINE_PATTERN.sub(" ", outcome.name))
+
+        if market.type == MarketType.TOTAL_OVER_UNDER:
+            tokens = name.split()
+            side = "over" if "over" in tokens else "under" if "under" in tokens else None
+            if value is None:
+                value = default
+        else:
+            side = _team_side(event, name, False)
+            if side is not None and value is None and default is not None:
+                value = default if side != "away" else -default
+            if side == "away" and value is not None:
+                value = -value
+            if swapped and side is not None and value is not None:
+                side = {"home": "away", "away": "home", "draw": "draw"}[side]
+                value = -value
+
+        if side is None or value is None:
+            continue
+        keyed.append((value + 0.0, side, outcome))
+
+    # A 3-way handicap settles differently from a 2-way one on the same line
+    if any(side == "draw" for _, side, _ in keyed):
+        subject = f"{subject} 3 way".strip()
+    return [(Line(value=value, subject=subject), side, outcome) for value, side, outcome in keyed]
+
+
+def outcome_key(event: Event, market: Market, outcome_name: str, swapped: bool = False) -> str:
+    """
+    Key of an outcome within its market. Team names become "home" and "away"
+    so that bookmakers spelling the same team differently still line up.
+
+    Args:
+        event: The bookmaker's event
+        market: The market the outcome belongs to
+        outcome_name: The outcome name as the bookmaker shows it
+        swapped: The bookmaker lists the teams the other way round than the matched event
+    """
+    if event.sport == SportType.HORSE_RACING:
+        # Runner numbers ("3. Horse Name") and jockeys ("Horse Name (J Smith)") are not shown by every bookmaker
+        return normalize_name(re.sub(r"^\s*\d+\.\s*|\s*\([^)]*\)\s*$", "", outcome_name))
+
+    name = normalize_name(outcome_name)
+    if market.type in TYPE_KEYED_MARKETS:
+        return _team_side(event, name, swapped) or name
+    return name
@@ -0,0 +1,245 @@
+"""
+Cross-bookmaker event matching.
+
+Each bookmaker spells fixtures its own way ("Man Utd v Spurs", "Manchester
+United vs Tottenham Hotspur"). Events are only compared with the candidates in
+their block (same sport and start-time bucket), team names are compared with a
+token-set similarity after alias resolution, and every resolved match is
+cached, so each scraped event is matched once instead of against every event of
+every other bookmaker.
+"""
+
+import logging
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from surebetbot.config import settings
+from surebetbot.config.aliases import (
+    COMPETITION_ALIASES, QUALIFIER_TOKENS, STOP_TOKENS, TEAM_ALIASES, TOKEN_ALIASES,
+)
+from surebetbot.core.models import Event, SportType
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=65536)
+def normalize_team(name: str) -> str:
+    """
+    Normalize a team or runner name for matching.
+
+    Args:
+        name: The name as a bookmaker shows it
+
+    Returns:
+        Lowercase name without punctuation or filler words, with aliases resolved
+    """
+    text = re.sub(r"[^\w\s]", " ", name.lower())
+    tokens = [token for token in text.split() if token not in STOP_TOKENS]
+    text = " ".join(tokens)
+    if text in TEAM_ALIASES:
+        return TEAM_ALIASES[text]
+    text = " ".join(TOKEN_ALIASES.get(token, token) for token in tokens)
+    return TEAM_ALIASES.get(text, text)
+
+
+@lru_cache(maxsize=4096)
+def normalize_competition(name: str) -> str:
+    """Normalize a competition name for matching, with aliases resolved."""
+    text = " ".join(re.sub(r"[^\w\s]", " ", name.lower()).split())
+    return COMPETITION_ALIASES.get(text, text)
+
+
+def token_set_similarity(a: str, b: str) -> float:
+    """
+    Token-set similarity of two normalized names, between 0 and 1.
+
+    Shared words are put first and word order is ignored, so "western sydney
+    wanderers" and "wanderers western sydney" score 1. Words only one name has
+    count against the match, so a name never scores 1 against a longer name
+    containing it ("milan" against "inter milan"). Names that disagree on a
+    qualifier ("women", "u21") score 0.
+    """
+    if a == b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+
+    tokens_a = set(a.split())
+    tokens_b = set(b.split())
+    if tokens_a & QUALIFIER_TOKENS != tokens_b & QUALIFIER_TOKENS:
+        return 0.0
+    common = " ".join(sorted(tokens_a & tokens_b))
+    only_a = " ".join(sorted(tokens_a - tokens_b))
+    only_b = " ".join(sorted(tokens_b - tokens_a))
+    combined_a = f"{common} {only_a}".strip()
+    combined_b = f"{common} {only_b}".strip()
+    return SequenceMatcher(None, combined_a, combined_b).ratio()
+
+
+@dataclass
+class CanonicalEvent:
+    """One real-world fixture, as seen by one or more bookmakers."""
+    id: str
+    sport: SportType
+    home_team: str  # Normalized
+    away_team: str  # Normalized
+    competition: str  # Normalized
+    start_time: datetime
+    members: Dict[str, str] = field(default_factory=dict)  # Bookmaker id to the bookmaker's event id
+    start_time_known: bool = True  # False when the first bookmaker showed no start time
+
+
+@dataclass
+class EventMatch:
+    """Where a bookmaker's event landed."""
+    canonical: CanonicalEvent
+    swapped: bool = False  # The bookmaker lists the teams the other way round
+    score: float = 1.0
+
+
+class EventMatcher:
+    """
+    Matches scraped events to canonical events across bookmakers.
+    """
+
+    def __init__(
+        self,
+        threshold: float = settings.MATCH_THRESHOLD,
+        time_tolerance: timedelta = timedelta(minutes=settings.MATCH_TIME_TOLERANCE),
+        bucket_size: timedelta = timedelta(minutes=30),
+    ):
+        """
+        Initialize the matcher.
+
+        Args:
+            threshold: Team similarity needed to match within the same competition
+            time_tolerance: Largest start time difference between matched events
+            bucket_size: Width of the start-time blocks, at least the tolerance
+        """
+        self.threshold = threshold
+        # Matches across differently named competitions need stronger team evidence
+        self.cross_competition_threshold = min(1.0, threshold + 0.1)
+        self.time_tolerance = time_tolerance
+        self.bucket_size = max(bucket_size, time_tolerance)
+        self._blocks: Dict[Tuple[SportType, int], List[CanonicalEvent]] = {}
+        self._cache: Dict[Tuple[str, str], EventMatch] = {}
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return sum(len(block) for block in self._blocks.values())
+
+    def match(self, event: Event) -> EventMatch:
+        """
+        Find or create the canonical event of a scraped event.
+
+        Args:
+            event: A bookmaker's event
+
+        Returns:
+            The match, cached for the event's later cycles
+        """
+        cache_key = (event.bookmaker.id, event.id)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        home = normalize_team(event.home_team)
+        away = normalize_team(event.away_team)
+        competition = normalize_competition(event.competition)
+
+        best: Optional[EventMatch] = None
+        for candidate in self._candidates(event.sport, event.start_time):
+            if event.bookmaker.id in candidate.members:
+                continue
+            if abs(candidate.start_time - event.start_time) > self.time_tolerance:
+                continue
+            same_competition = token_set_similarity(competition, candidate.competition) >= 0.8
+            if not same_competition and not (away and candidate.away_team):
+                # Races have no opponents to compare; "Race 1" only identifies one within its meeting
+                continue
+            score, swapped = self._team_score(home, away, candidate)
+            needed = self.threshold if same_competition else self.cross_competition_threshold
+            if score >= needed and (best is None or score > best.score):
+                best = EventMatch(canonical=candidate, swapped=swapped, score=score)
+
+        if best is None:
+            best = EventMatch(canonical=self._add(event, home, away, competition))
+        else:
+            logger.debug(
+                f"Matched {event.bookmaker.id} {event.home_team} v {event.away_team} to "
+                f"{best.canonical.id} (score {best.score:.2f})"
+            )
+
+        best.canonical.members[event.bookmaker.id] = event.id
+        self._cache[cache_key] = best
+        return best
+
+    def prune(self, before: datetime, events: Iterable[str] = ()) -> None:
+        """
+        Forget canonical events that started before a point in time.
+
+        An event's bookmakers may show start times up to the time tolerance after the
+        canonical one, so it is kept that much longer than the order book keeps its prices.
+        Events without a start time are only dropped when named.
+
+        Args:
+            before: Events starting earlier are dropped along with their cached matches
+            events: Ids of canonical events to drop as well, e.g. the ones evicted from the order book
+        """
+        cutoff = before - self.time_tolerance
+        named = set(events)
+        dropped = set()
+        for key, block in list(self._blocks.items()):
+            kept = []
+            for event in block:
+                if event.id in named or (event.start_time_known and event.start_time < cutoff):
+                    dropped.add(event.id)
+                else:
+                    kept.append(event)
+            if kept:
+                self._blocks[key] = kept
+            else:
+                del self._blocks[key]
+        self._cache = {key: match for key, match in self._cache.items() if match.canonical.id not in dropped}
+
+    def _bucket(self, start_time: datetime) -> int:
+        return int(start_time.timestamp() // self.bucket_size.total_seconds())
+
+    def _candidates(self, sport: SportType, start_time: datetime) -> List[CanonicalEvent]:
+        # Neighbouring buckets too, so events either side of a bucket edge still meet
+        bucket = self._bucket(start_time)
+        candidates = []
+        for key in ((sport, bucket - 1), (sport, bucket), (sport, bucket + 1)):
+            candidates.extend(self._blocks.get(key, ()))
+        return candidates
+
+    def _team_score(self, home: str, away: str, candidate: CanonicalEvent) -> Tuple[float, bool]:
+        straight = min(
+            token_set_similarity(home, candidate.home_team),
+            token_set_similarity(away, candidate.away_team) if away or candidate.away_team else 1.0,
+        )
+        if not away or not candidate.away_team:
+            return straight, False
+        swapped = min(
+            token_set_similarity(home, candidate.away_team),
+            token_set_similarity(away, candidate.home_team),
+        )
+        return (swapped, True) if swapped > straight else (straight, False)
+
+    def _add(self, event: Event, home: str, away: str, competition: str) -> CanonicalEvent:
+        self._next_id += 1
+        canonical = CanonicalEvent(
+            id=f"{event.sport.name.lower()}_{self._next_id}",
+            sport=event.sport,
+            home_team=home,
+            away_team=away,
+            competition=competition,
+            start_time=event.start_time,
+            start_time_known=event.start_time_known,
+        )
+        self._blocks.setdefault((event.sport, self._bucket(event.start_time)), []).append(canonical)
+        return canonical
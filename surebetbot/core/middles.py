@@ -0,0 +1,138 @@
+"""
+Middle detection across adjacent handicap and total lines.
+
+A middle backs over a low total at one bookmaker and under a higher total at
+another (or a team's handicap against a tighter handicap for the other team).
+When the result lands between the two lines both bets win; otherwise one wins
+and the loss is small as long as Σ 1/odds stays close to 1. Middles are not
+risk-free, so they are reported separately from arbitrage opportunities.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+from surebetbot.config import settings
+from surebetbot.core.arbitrage import OddsMatrix, build_odds_matrix
+from surebetbot.core.matching import EventMatcher
+from surebetbot.core.models import Bookmaker, MarketType, ScrapingResult
+
+logger = logging.getLogger(__name__)
+
+# The two sides of each line market type: the one that wins above the window, the one that wins below
+MIDDLE_SIDES = {
+    MarketType.TOTAL_OVER_UNDER: ("over", "under"),
+    MarketType.HANDICAP: ("home", "away"),
+}
+
+
+@dataclass
+class Middle:
+    """Two sides at different lines of one market that both win inside a window."""
+    event_description: str
+    market_description: str
+    selections: List[Tuple[str, float, Bookmaker]]  # (outcome name, odds, bookmaker), low side first
+    lines: Tuple[float, float]  # Line of each selection; home handicaps for handicap markets
+    width: float  # Size of the window in goals or points
+    implied_sum: float  # Σ 1/odds; below 1 the middle is also an arbitrage
+
+
+def find_middles(matrix: OddsMatrix, max_implied_sum: float = settings.MIDDLE_MAX_IMPLIED_SUM) -> List[Middle]:
+    """
+    Find the middles between the lines of each handicap and total market.
+
+    Args:
+        matrix: Best-odds matrix of one cycle
+        max_implied_sum: Largest Σ 1/odds worth reporting
+
+    Returns:
+        Middles with the cheapest first
+    """
+    # Lines of the same event, market type and subject
+    groups: Dict[Tuple[Hashable, MarketType, str], List[int]] = {}
+    for row, book in enumerate(matrix.books):
+        if book.market_type in MIDDLE_SIDES and book.line is not None and "3 way" not in book.line.subject:
+            groups.setdefault((book.event, book.market_type, book.line.subject), []).append(row)
+
+    middles = []
+    for (_, market_type, _), rows in groups.items():
+        if len(rows) < 2:
+            continue
+        upper_side, lower_side = MIDDLE_SIDES[market_type]
+        for low in rows:
+            for high in rows:
+                low_line = matrix.books[low].line.value
+                high_line = matrix.books[high].line.value
+                if market_type == MarketType.TOTAL_OVER_UNDER:
+                    # Over the low total and under the high total both win in between
+                    if high_line <= low_line:
+                        continue
+                    width = high_line - low_line
+                elif low_line <= high_line:
+                    # The home team's larger handicap against the away team's side of a smaller one
+                    continue
+                else:
+                    width = low_line - high_line
+                first = _selection(matrix, low, upper_side)
+                second = _selection(matrix, high, lower_side)
+                if first is None or second is None:
+                    continue
+                implied_sum = 1.0 / first[1] + 1.0 / second[1]
+                if implied_sum > max_implied_sum:
+                    continue
+                book = matrix.books[low]
+                middles.append(Middle(
+                    event_description=book.event_description,
+                    market_description=book.market_description,
+                    selections=[first, second],
+                    lines=(low_line, high_line),
+                    width=width,
+                    implied_sum=implied_sum,
+                ))
+
+    middles.sort(key=lambda middle: middle.implied_sum)
+    return middles
+
+
+def _selection(matrix: OddsMatrix, row: int, side: str) -> Optional[Tuple[str, float, Bookmaker]]:
+    book = matrix.books[row]
+    col = book.columns.get(side)
+    if col is None:
+        return None
+    cell = matrix.offsets[row] + col
+    return book.outcome_names[col], float(matrix.best_odds[cell]), matrix.bookmakers[matrix.best_bookmaker[cell]]
+
+
+class MiddleDetector:
+    """
+    Finds middles across the results of several bookmakers.
+    """
+
+    def __init__(
+        self,
+        max_implied_sum: float = settings.MIDDLE_MAX_IMPLIED_SUM,
+        matcher: Optional[EventMatcher] = None,
+    ):
+        """
+        Initialize the detector.
+
+        Args:
+            max_implied_sum: Largest Σ 1/odds worth reporting
+            matcher: Event matcher, shared with the arbitrage detector so each event is matched once
+        """
+        self.max_implied_sum = max_implied_sum
+        self.matcher = matcher or EventMatcher()
+
+    def find_middles(self, results: Iterable[ScrapingResult]) -> List[Middle]:
+        """
+        Find the middles in a batch of scraping results.
+
+        Args:
+            results: Scraping results of one cycle
+
+        Returns:
+            Middles with the cheapest first
+        """
+        middles = find_middles(build_odds_matrix(results, self.matcher), self.max_implied_sum)
+        logger.info(f"Found {len(middles)} middles")
+        return middles
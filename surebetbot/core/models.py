@@ -1,7 +1,10 @@
-from dataclasses import dataclass
+import hashlib
+import math
+import sys
+from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum, auto
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Dict, Hashable, List, Optional, Tuple, Union
 from uuid import UUID, uuid4
 
 
@@ -39,7 +42,12 @@ class OddsFormat(Enum):
     AMERICAN = auto()  # +100, -150, etc.
 
 
-@dataclass
+# Models are slotted: a racing card holds thousands of outcomes and several cycles are
+# kept for change detection, so a per-instance __dict__ would dominate memory. Names
+# repeat across cycles and bookmakers and are interned to share one copy each.
+
+
+@dataclass(frozen=True, slots=True)
 class Bookmaker:
     id: str
     name: str
@@ -50,22 +58,29 @@ class Bookmaker:
     max_stake: Optional[float] = None  # Maximum stake allowed, None if no limit
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Outcome:
     name: str  # Name of the selection (e.g., "Manchester United", "Draw", "Over 2.5")
     odds: float  # Decimal odds
 
+    def __post_init__(self):
+        object.__setattr__(self, "name", sys.intern(self.name))
+
 
-@dataclass
+@dataclass(slots=True)
 class Market:
     id: str
     type: MarketType
     name: str  # Human-readable market name (e.g., "Match Winner", "Over/Under 2.5 Goals")
     outcomes: List[Outcome]
     is_live: bool = False
+    line: Optional[float] = None  # Handicap (from the home team's side) or total line, None if the outcomes name their own
 
+    def __post_init__(self):
+        self.name = sys.intern(self.name)
 
-@dataclass
+
+@dataclass(slots=True)
 class Event:
     id: str
     sport: SportType
@@ -76,7 +91,13 @@ class Event:
     markets: List[Market]
     bookmaker: Bookmaker
     url: str  # URL to the event page
-    created_at: datetime = datetime.now()
+    created_at: datetime = field(default_factory=datetime.now)
+    start_time_known: bool = True  # False when the bookmaker showed none and start_time is the parse time
+
+    def __post_init__(self):
+        self.home_team = sys.intern(self.home_team)
+        self.away_team = sys.intern(self.away_team)
+        self.competition = sys.intern(self.competition)
     
     def get_market_by_type(self, market_type: MarketType) -> Optional[Market]:
         """Get a market by its type"""
@@ -86,7 +107,7 @@ class Event:
         return None
 
 
-@dataclass
+@dataclass(slots=True)
 class ArbitrageOpportunity:
     event_description: str  # Combined event description (e.g. "Manchester United vs Liverpool")
     market_description: str  # Description of the market (e.g. "Match Winner")
@@ -94,8 +115,10 @@ class ArbitrageOpportunity:
     profit_percentage: float  # Arbitrage profit % (e.g., 2.5)
     required_investment: float  # Total stake required
     stakes: Dict[str, float]  # Stake for each selection
-    id: UUID = uuid4()
-    detection_time: datetime = datetime.now()
+    id: UUID = field(default_factory=uuid4)
+    detection_time: datetime = field(default_factory=datetime.now)
+    market_key: Optional[Tuple[Hashable, MarketType, Optional[Tuple], str]] = None  # (matched event, market type, line, market name)
+    start_time: Optional[datetime] = None  # When the event starts
     
     @property
     def is_profitable(self) -> bool:
@@ -110,11 +133,48 @@ class ArbitrageOpportunity:
         """Calculate the expected return from the arbitrage opportunity"""
         return self.required_investment * (1 + self.profit_percentage / 100)
 
-
-@dataclass
+    def get_stake_ceiling(self) -> float:
+        """Largest total investment the bookmakers' maximum stakes allow at this stake split"""
+        scale = 1.0
+        for name, _, bookmaker in self.selections:
+            stake = self.stakes.get(name, 0.0)
+            if bookmaker.max_stake is not None and stake > 0:
+                scale = min(scale, bookmaker.max_stake / stake)
+        return self.required_investment * scale
+
+    def fingerprint(self, profit_step: float) -> str:
+        """
+        Identity of the opportunity across cycles and restarts, for de-duplicating alerts.
+
+        The same event, market, line, selections and bookmakers give the same
+        fingerprint for as long as the profit stays within one profit_step bucket.
+        Matched event ids are only valid within a process, so the event is
+        identified by its description.
+
+        Args:
+            profit_step: Width of the profit buckets, in percentage points
+
+        Returns:
+            A hex digest
+        """
+        if self.market_key is not None:
+            _, market_type, line, name = self.market_key
+            market = (market_type.name, tuple(line) if line is not None else None, name)
+        else:
+            market = (self.market_description,)
+        parts = (
+            self.event_description.lower(),
+            market,
+            tuple(sorted((name.lower(), bookmaker.id) for name, _, bookmaker in self.selections)),
+            math.floor(self.profit_percentage / profit_step),
+        )
+        return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+@dataclass(slots=True)
 class ScrapingResult:
     bookmaker: Bookmaker
     events: List[Event]
-    timestamp: datetime = datetime.now()
+    timestamp: datetime = field(default_factory=datetime.now)
     success: bool = True
     error_message: Optional[str] = None
@@ -0,0 +1,91 @@
+"""
+Token bucket pacing.
+
+A bucket holds up to capacity tokens and refills at rate tokens per second.
+Every request takes its tokens first, so bursts up to the capacity go out at
+once and longer runs are spread at the refill rate instead of hitting a server
+limit and backing off. Servers that report their own limits can drain or pause
+the bucket to match.
+"""
+
+import asyncio
+import time
+from typing import Callable, Optional
+
+
+class TokenBucket:
+    """
+    Paces requests to a rate with bursts up to a capacity.
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize a full bucket.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Most tokens held, the largest burst
+            clock: Monotonic time in seconds
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._clock = clock
+        self._updated = clock()
+        self._lock: Optional[asyncio.Lock] = None
+
+    def delay(self, tokens: float = 1.0) -> float:
+        """
+        Seconds until tokens can be taken, 0 when they can be now.
+
+        Requests larger than the capacity wait for a full bucket and leave it in debt.
+        """
+        self._refill()
+        missing = min(tokens, self.capacity) - self.tokens
+        return max(0.0, missing / self.rate)
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Take tokens if they are available now."""
+        if self.delay(tokens) > 0:
+            return False
+        self.tokens -= tokens
+        return True
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """Wait until tokens are available and take them. Waiters are served in order."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while not self.try_acquire(tokens):
+                await asyncio.sleep(self.delay(tokens))
+
+    def consume(self, tokens: float) -> None:
+        """Take tokens without waiting, going into debt if needed, for costs only known afterwards."""
+        self._refill()
+        self.tokens -= tokens
+
+    def pause(self, seconds: float) -> None:
+        """Hand out nothing for a while, e.g. after the server answered 429."""
+        self._refill()
+        # In debt by exactly as much as refills in that time, so one token is back when it ends
+        self.tokens = min(self.tokens, 1.0 - seconds * self.rate)
+
+    def limit(self, remaining: int, reset_after: float) -> None:
+        """
+        Follow a limit reported by the server.
+
+        Args:
+            remaining: Requests the server still allows in its current window
+            reset_after: Seconds until the server's window resets
+        """
+        if remaining <= 0:
+            self.pause(reset_after)
+        else:
+            self._refill()
+            self.tokens = min(self.tokens, float(remaining))
+
+    def _refill(self) -> float:
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        return now
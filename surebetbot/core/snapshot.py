@@ -0,0 +1,247 @@
+"""
+Columnar snapshot of a whole scrape cycle.
+
+A cycle's odds normally live as ScrapingResult -> Event -> Market -> Outcome
+lists. A snapshot lays every price out as parallel arrays instead (event index,
+market key, outcome key, bookmaker, float64 price), with repeated strings and
+keys stored once in dictionaries and referenced by int32 codes. Arbitrage
+detection and snapshot diffs then work on contiguous arrays rather than walking
+Python object graphs.
+"""
+
+import logging
+import math
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from typing import Dict, Generic, Hashable, Iterable, List, Optional, TypeVar
+
+import numpy as np
+
+from surebetbot.core.market_keys import event_key, line_outcomes, market_key
+from surebetbot.core.matching import EventMatcher
+from surebetbot.core.models import Bookmaker, Event, Market, MarketType, Outcome, ScrapingResult
+
+logger = logging.getLogger(__name__)
+
+# Code of a price that can not be keyed, e.g. a handicap outcome that names no team
+NO_KEY = -1
+
+K = TypeVar("K", bound=Hashable)
+
+
+class Dictionary(Generic[K]):
+    """
+    Values stored once and referenced by int code, in order of first appearance.
+    """
+
+    def __init__(self, values: Iterable[K] = ()):
+        """
+        Initialize the dictionary.
+
+        Args:
+            values: Initial values, coded 0, 1, ...
+        """
+        self.values: List[K] = []
+        self._codes: Dict[K, int] = {}
+        for value in values:
+            self.encode(value)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def encode(self, value: K) -> int:
+        """The code of a value, adding it when new."""
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def lookup(self, value: K) -> int:
+        """The code of a value, NO_KEY when it is not in the dictionary."""
+        return self._codes.get(value, NO_KEY)
+
+    def decode(self, code: int) -> K:
+        """The value of a code."""
+        return self.values[code]
+
+
+@dataclass
+class OddsSnapshot:
+    """
+    Every price of one cycle as parallel arrays.
+
+    Prices are rows; price i belongs to events[event[i]] and to the market row
+    market[i]. market_key and outcome are the cross-bookmaker keys of the price
+    (NO_KEY when it has none), so prices of matched events line up by integer
+    comparison.
+    """
+    timestamp: datetime
+    results: List[ScrapingResult]  # Headers of the scraping results, without events
+    bookmakers: List[Bookmaker]  # Indexed by bookmaker code
+    events: List[Event]  # Headers of the events, without markets
+    event_result: np.ndarray  # (events,) int32 index into results
+    event_group: np.ndarray  # (events,) int32 code in groups, the matched event
+    # Markets, one row per bookmaker market
+    market_event: np.ndarray  # (markets,) int32 index into events
+    market_id: np.ndarray  # (markets,) int32 code in strings
+    market_type: np.ndarray  # (markets,) int8 MarketType value
+    market_name: np.ndarray  # (markets,) int32 code in strings
+    market_live: np.ndarray  # (markets,) bool
+    market_line: np.ndarray  # (markets,) float64, nan without a line
+    # Prices, one row per outcome
+    event: np.ndarray  # (prices,) int32 index into events
+    market: np.ndarray  # (prices,) int32 market row
+    market_key: np.ndarray  # (prices,) int32 code in market_keys
+    outcome: np.ndarray  # (prices,) int32 code in outcome_keys
+    name: np.ndarray  # (prices,) int32 code in strings, the name the bookmaker shows
+    bookmaker: np.ndarray  # (prices,) int32 index into bookmakers
+    price: np.ndarray  # (prices,) float64 decimal odds
+    strings: Dictionary = field(default_factory=Dictionary)
+    groups: Dictionary = field(default_factory=Dictionary)
+    market_keys: Dictionary = field(default_factory=Dictionary)
+    outcome_keys: Dictionary = field(default_factory=Dictionary)
+
+    def __len__(self) -> int:
+        return len(self.price)
+
+    @classmethod
+    def from_results(
+        cls,
+        results: Iterable[ScrapingResult],
+        matcher: Optional[EventMatcher] = None,
+        timestamp: Optional[datetime] = None,
+    ) -> "OddsSnapshot":
+        """
+        Lay out a cycle's scraping results as a snapshot.
+
+        Args:
+            results: Scraping results of one cycle
+            matcher: Matches events across bookmakers, events are grouped by exact names without one
+            timestamp: When the cycle ran, defaults to now
+
+        Returns:
+            The snapshot
+        """
+        strings: Dictionary[str] = Dictionary()
+        groups: Dictionary[Hashable] = Dictionary()
+        market_keys: Dictionary[Hashable] = Dictionary()
+        outcome_keys: Dictionary[str] = Dictionary()
+        bookmakers: List[Bookmaker] = []
+        bookmaker_index: Dict[str, int] = {}
+        headers: List[ScrapingResult] = []
+        events: List[Event] = []
+        event_result: List[int] = []
+        event_group: List[int] = []
+        market_columns: Dict[str, list] = {
+            "event": [], "id": [], "type": [], "name": [], "live": [], "line": [],
+        }
+        price_columns: Dict[str, list] = {
+            "event": [], "market": [], "market_key": [], "outcome": [], "name": [], "bookmaker": [], "price": [],
+        }
+
+        for result in results:
+            headers.append(replace(result, events=[]))
+            for event in result.events:
+                bookmaker = event.bookmaker or result.bookmaker
+                if bookmaker.id not in bookmaker_index:
+                    bookmaker_index[bookmaker.id] = len(bookmakers)
+                    bookmakers.append(bookmaker)
+                b = bookmaker_index[bookmaker.id]
+                swapped = False
+                if matcher is not None:
+                    match = matcher.match(event)
+                    group, swapped = match.canonical.id, match.swapped
+                else:
+                    group = event_key(event)
+                e = len(events)
+                events.append(replace(event, markets=[]))
+                event_result.append(len(headers) - 1)
+                event_group.append(groups.encode(group))
+
+                for market in event.markets:
+                    m = len(market_columns["event"])
+                    market_columns["event"].append(e)
+                    market_columns["id"].append(strings.encode(market.id))
+                    market_columns["type"].append(market.type.value)
+                    market_columns["name"].append(strings.encode(market.name))
+                    market_columns["live"].append(market.is_live)
+                    market_columns["line"].append(math.nan if market.line is None else market.line)
+
+                    keyed = {id(outcome): (line, key) for line, key, outcome in line_outcomes(event, market, swapped)}
+                    for outcome in market.outcomes:
+                        line_key = keyed.get(id(outcome))
+                        price_columns["event"].append(e)
+                        price_columns["market"].append(m)
+                        if line_key is None:
+                            price_columns["market_key"].append(NO_KEY)
+                            price_columns["outcome"].append(NO_KEY)
+                        else:
+                            price_columns["market_key"].append(market_keys.encode(market_key(market, line_key[0])))
+                            price_columns["outcome"].append(outcome_keys.encode(line_key[1]))
+                        price_columns["name"].append(strings.encode(outcome.name))
+                        price_columns["bookmaker"].append(b)
+                        price_columns["price"].append(outcome.odds)
+
+        return cls(
+            timestamp=timestamp or datetime.now(),
+            results=headers,
+            bookmakers=bookmakers,
+            events=events,
+            event_result=np.asarray(event_result, dtype=np.int32),
+            event_group=np.asarray(event_group, dtype=np.int32),
+            market_event=np.asarray(market_columns["event"], dtype=np.int32),
+            market_id=np.asarray(market_columns["id"], dtype=np.int32),
+            market_type=np.asarray(market_columns["type"], dtype=np.int8),
+            market_name=np.asarray(market_columns["name"], dtype=np.int32),
+            market_live=np.asarray(market_columns["live"], dtype=bool),
+            market_line=np.asarray(market_columns["line"], dtype=np.float64),
+            event=np.asarray(price_columns["event"], dtype=np.int32),
+            market=np.asarray(price_columns["market"], dtype=np.int32),
+            market_key=np.asarray(price_columns["market_key"], dtype=np.int32),
+            outcome=np.asarray(price_columns["outcome"], dtype=np.int32),
+            name=np.asarray(price_columns["name"], dtype=np.int32),
+            bookmaker=np.asarray(price_columns["bookmaker"], dtype=np.int32),
+            price=np.asarray(price_columns["price"], dtype=np.float64),
+            strings=strings,
+            groups=groups,
+            market_keys=market_keys,
+            outcome_keys=outcome_keys,
+        )
+
+    def market_header(self, market: int) -> Market:
+        """A market row as a Market without outcomes."""
+        line = float(self.market_line[market])
+        return Market(
+            id=self.strings.decode(self.market_id[market]),
+            type=MarketType(int(self.market_type[market])),
+            name=self.strings.decode(self.market_name[market]),
+            outcomes=[],
+            is_live=bool(self.market_live[market]),
+            line=None if math.isnan(line) else line,
+        )
+
+    def to_results(self) -> List[ScrapingResult]:
+        """
+        Rebuild the scraping results the snapshot was made from.
+
+        Returns:
+            New ScrapingResult -> Event -> Market -> Outcome trees
+        """
+        results = [replace(header, events=[]) for header in self.results]
+        events = []
+        for index, header in enumerate(self.events):
+            event = replace(header, markets=[])
+            results[self.event_result[index]].events.append(event)
+            events.append(event)
+
+        markets = []
+        for index in range(len(self.market_event)):
+            market = self.market_header(index)
+            events[self.market_event[index]].markets.append(market)
+            markets.append(market)
+
+        names = self.strings.values
+        for market, name, price in zip(self.market.tolist(), self.name.tolist(), self.price.tolist()):
+            markets[market].outcomes.append(Outcome(name=names[name], odds=price))
+        return results
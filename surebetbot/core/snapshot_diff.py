@@ -0,0 +1,202 @@
+"""
+Differences between consecutive odds snapshots.
+
+Prices are identified across snapshots by (bookmaker, bookmaker's event id,
+market id, outcome name). Each snapshot's keys are turned into int64 codes in
+one shared space and joined with sorted-array set operations, so a diff costs
+O(n log n) array work on the snapshot size. Nothing is walked per price in
+Python unless something changed. The diff is what notifications, storage
+writes and incremental arbitrage detection consume, so an unchanged board costs
+almost nothing downstream.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from surebetbot.core.market_keys import describe_market
+from surebetbot.core.snapshot import NO_KEY, Dictionary, OddsSnapshot
+from surebetbot.storage.in_memory import OddsDelta
+
+logger = logging.getLogger(__name__)
+
+# Multiplier that packs two int32 codes into one int64 key
+CODE_RADIX = np.int64(1) << np.int64(31)
+
+
+@dataclass
+class SnapshotDiff:
+    """
+    What changed from one snapshot to the next.
+
+    Price and market arrays hold row indices into the snapshot named in their comment.
+    """
+    old: OddsSnapshot
+    new: OddsSnapshot
+    moved: np.ndarray  # new prices whose odds changed
+    moved_from: np.ndarray  # The same prices in old, aligned with moved
+    added: np.ndarray  # new prices that appeared or resumed in a market already listed
+    suspended: np.ndarray  # old prices that disappeared or were suspended in a market still listed
+    new_markets: np.ndarray  # new market rows not listed before
+    removed_markets: np.ndarray  # old market rows no longer listed
+
+    def __bool__(self) -> bool:
+        return bool(
+            len(self.moved) or len(self.added) or len(self.suspended)
+            or len(self.new_markets) or len(self.removed_markets)
+        )
+
+    def summary(self) -> Dict[str, int]:
+        """Number of changes of each kind."""
+        return {
+            "moved": len(self.moved),
+            "added": len(self.added),
+            "suspended": len(self.suspended),
+            "new_markets": len(self.new_markets),
+            "removed_markets": len(self.removed_markets),
+        }
+
+    def deltas(self) -> List[OddsDelta]:
+        """
+        The diff as order book deltas, for the incremental arbitrage detector.
+
+        Prices of new markets are set and prices of removed markets withdrawn along
+        with the moved, added and suspended ones. Prices without a cross-bookmaker
+        key are left out.
+
+        Returns:
+            One delta per changed price
+        """
+        new, old = self.new, self.old
+        priced_new = np.concatenate([
+            self.moved, self.added, np.flatnonzero(np.isin(new.market, self.new_markets) & (new.price > 1.0)),
+        ])
+        withdrawn_old = np.concatenate([
+            self.suspended, np.flatnonzero(np.isin(old.market, self.removed_markets) & (old.price > 1.0)),
+        ])
+
+        descriptions: Dict[Tuple[int, int], Tuple[str, str]] = {}
+        deltas = []
+        # Withdrawals first, so an outcome renamed within a market keeps its new price
+        for snapshot, indices, withdrawn in ((old, withdrawn_old, True), (new, priced_new, False)):
+            for index in indices.tolist():
+                if snapshot.market_key[index] == NO_KEY:
+                    continue
+                deltas.append(_delta(snapshot, index, withdrawn, self.new.timestamp, descriptions))
+        return deltas
+
+
+def diff_snapshots(old: OddsSnapshot, new: OddsSnapshot) -> SnapshotDiff:
+    """
+    Compare two snapshots of the same bookmakers.
+
+    Args:
+        old: The earlier snapshot
+        new: The later snapshot
+
+    Returns:
+        The prices and markets that changed
+    """
+    # One code space for both snapshots: events by (bookmaker, event id), strings by value
+    events: Dictionary = Dictionary()
+    strings: Dictionary = Dictionary()
+    old_market, old_names = _codes(old, events, strings)
+    new_market, new_names = _codes(new, events, strings)
+    # Markets are renumbered densely so a price key (market, outcome name) fits in int64
+    _, dense = np.unique(np.concatenate([old_market, new_market]), return_inverse=True)
+    dense = dense.reshape(-1).astype(np.int64)
+    old_market, new_market = dense[:len(old_market)], dense[len(old_market):]
+    old_price = old_market[old.market] * CODE_RADIX + old_names
+    new_price = new_market[new.market] * CODE_RADIX + new_names
+
+    # Markets
+    old_listed = np.isin(old_market, new_market)
+    new_listed = np.isin(new_market, old_market)
+    removed_markets = np.flatnonzero(~old_listed)
+    new_markets = np.flatnonzero(~new_listed)
+
+    # Prices in both snapshots
+    _, old_common, new_common = np.intersect1d(old_price, new_price, return_indices=True)
+    old_live = old.price[old_common] > 1.0
+    new_live = new.price[new_common] > 1.0
+    moved_mask = old_live & new_live & (old.price[old_common] != new.price[new_common])
+
+    # Prices in one snapshot only, within markets listed in both
+    old_only = np.ones(len(old_price), dtype=bool)
+    old_only[old_common] = False
+    new_only = np.ones(len(new_price), dtype=bool)
+    new_only[new_common] = False
+
+    suspended = np.concatenate([
+        old_common[old_live & ~new_live],
+        np.flatnonzero(old_only & old_listed[old.market] & (old.price > 1.0)),
+    ])
+    added = np.concatenate([
+        new_common[~old_live & new_live],
+        np.flatnonzero(new_only & new_listed[new.market] & (new.price > 1.0)),
+    ])
+
+    diff = SnapshotDiff(
+        old=old,
+        new=new,
+        moved=new_common[moved_mask],
+        moved_from=old_common[moved_mask],
+        added=np.sort(added),
+        suspended=np.sort(suspended),
+        new_markets=new_markets,
+        removed_markets=removed_markets,
+    )
+    if diff:
+        logger.info(f"Snapshot diff: {diff.summary()}")
+    return diff
+
+
+def _codes(snapshot: OddsSnapshot, events: Dictionary, strings: Dictionary) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Identity codes of a snapshot in a code space shared with another snapshot.
+
+    Returns:
+        (int64 code per market row, int64 outcome name code per price)
+    """
+    event_codes = np.array(
+        [events.encode((event.bookmaker.id, event.id)) for event in snapshot.events], dtype=np.int64
+    )
+    string_codes = np.array([strings.encode(value) for value in snapshot.strings.values], dtype=np.int64)
+    market = event_codes[snapshot.market_event] * CODE_RADIX + string_codes[snapshot.market_id]
+    return market, string_codes[snapshot.name]
+
+
+def _delta(
+    snapshot: OddsSnapshot,
+    index: int,
+    withdrawn: bool,
+    timestamp: datetime,
+    descriptions: Dict[Tuple[int, int], Tuple[str, str]],
+) -> OddsDelta:
+    """An order book delta for one price of a snapshot."""
+    market_row = int(snapshot.market[index])
+    key = snapshot.market_keys.decode(snapshot.market_key[index])
+    line = key[1]
+    event = snapshot.events[snapshot.event[index]]
+
+    description = descriptions.get((id(snapshot), market_row))
+    if description is None:
+        description = descriptions[(id(snapshot), market_row)] = (
+            f"{event.home_team} vs {event.away_team}" if event.away_team else event.home_team,
+            describe_market(snapshot.market_header(market_row), line),
+        )
+
+    return OddsDelta(
+        bookmaker=snapshot.bookmakers[snapshot.bookmaker[index]],
+        market_key=(snapshot.groups.decode(snapshot.event_group[snapshot.event[index]]), *key),
+        outcome=snapshot.outcome_keys.decode(snapshot.outcome[index]),
+        odds=None if withdrawn else float(snapshot.price[index]),
+        outcome_name=snapshot.strings.decode(snapshot.name[index]),
+        timestamp=timestamp,
+        event_description=description[0],
+        market_description=description[1],
+        start_time=event.start_time if event.start_time_known else None,
+    )
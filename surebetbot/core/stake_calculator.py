@@ -0,0 +1,383 @@
+"""
+Batch stake allocation for arbitrage opportunities.
+
+All opportunities of a cycle are sized at once: their odds, commissions and
+stake limits are padded into (opportunities, outcomes) arrays and every step
+(split, limits, profit check) is a NumPy operation over the batch. Rounded
+stakes come from a bounded, vectorized search per opportunity.
+"""
+
+import logging
+import math
+from dataclasses import dataclass
+from enum import Enum
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from surebetbot.config import settings
+from surebetbot.core.models import ArbitrageOpportunity
+
+logger = logging.getLogger(__name__)
+
+# Rounding repairs tried before an opportunity is given up as unroundable
+MAX_ROUNDING_STEPS = 20
+
+# Candidate stake levels evaluated per NumPy step of the rounded stake search
+SOLVER_CHUNK = 256
+
+
+def solve_rounded_stakes(
+    odds: Sequence[float],
+    min_stakes: Sequence[float],
+    max_stakes: Sequence[Optional[float]],
+    bankroll: float,
+    unit: float = 1.0,
+) -> Optional[Tuple[List[float], float]]:
+    """
+    Find the stakes, in whole rounding units, that maximize the guaranteed profit.
+
+    The best vector always has one binding outcome j whose return s_j * e_j is the
+    worst case, with every other stake the smallest multiple of the unit that
+    returns at least as much. So only the stake levels of each binding outcome are
+    searched. A return T costs at least T * Σ 1/e, and rounding the other stakes up
+    loses less than one unit each, so the floored continuous optimum of every binding
+    outcome already makes nearly T_max * (1 - Σ 1/e); only returns whose bound
+    T * (1 - Σ 1/e) beats the best vector found can do better. That neighbourhood
+    below the largest affordable return is evaluated in descending chunks, a chunk
+    of levels at a time as one array operation, until the bound rules the rest out.
+
+    Args:
+        odds: Effective decimal odds of each outcome, after commission
+        min_stakes: Smallest stake each outcome's bookmaker accepts
+        max_stakes: Largest stake each outcome's bookmaker accepts, None for no limit
+        bankroll: Largest total investment
+        unit: Stakes are multiples of this amount
+
+    Returns:
+        (stakes, guaranteed profit), or None when no rounded stakes make a profit
+    """
+    n = len(odds)
+    budget = math.floor(bankroll / unit + 1e-9)
+    lower = [max(0, math.ceil(minimum / unit - 1e-9)) for minimum in min_stakes]
+    upper = [
+        budget if maximum is None or math.isinf(maximum) else min(budget, math.floor(maximum / unit + 1e-9))
+        for maximum in max_stakes
+    ]
+    if n < 2 or any(low > high for low, high in zip(lower, upper)):
+        return None
+    prices = np.asarray(odds, dtype=np.float64)
+    inverse_sum = float((1.0 / prices).sum())
+    margin = 1.0 - inverse_sum
+    if margin <= 0:
+        return None
+    lower_units = np.asarray(lower, dtype=np.float64)
+    upper_units = np.asarray(upper, dtype=np.float64)
+
+    def evaluate(binding: np.ndarray, levels: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Stakes, cost and profit of each (binding outcome, level) candidate, -inf profit when infeasible."""
+        targets = levels * prices[binding]
+        stakes = np.maximum(lower_units, np.ceil(targets[:, None] / prices - 1e-9))
+        stakes[np.arange(len(levels)), binding] = levels
+        cost = stakes.sum(axis=1)
+        feasible = (stakes <= upper_units).all(axis=1) & (cost <= budget)
+        return stakes, cost, np.where(feasible, targets - cost, -np.inf)
+
+    # A level above the continuous optimum of the whole budget can not be afforded
+    tops = [min(upper[j], math.floor(budget / (odds[j] * inverse_sum))) for j in range(n)]
+    best_stakes: Optional[np.ndarray] = None
+    best_profit = 1e-9  # Profit in units; the stakes must make some
+    best_cost = 0.0
+
+    def keep_best(stakes: np.ndarray, cost: np.ndarray, profit: np.ndarray) -> None:
+        nonlocal best_stakes, best_profit, best_cost
+        top = profit.max(initial=-np.inf)
+        if top <= best_profit - 1e-9:
+            return
+        # The cheapest of the equally profitable vectors
+        candidates = np.flatnonzero(profit > top - 1e-9)
+        pick = candidates[np.argmin(cost[candidates])]
+        if top > best_profit + 1e-9 or cost[pick] < best_cost:
+            best_stakes, best_profit, best_cost = stakes[pick], float(profit[pick]), float(cost[pick])
+
+    # The floored continuous optimum of each binding outcome sets the first bound
+    binding = np.asarray([j for j in range(n) if tops[j] >= lower[j]], dtype=np.int64)
+    if len(binding):
+        keep_best(*evaluate(binding, np.asarray([tops[j] for j in binding], dtype=np.float64)))
+
+    # The rest of the neighbourhood: every level whose return could still beat the bound
+    floor_target = best_profit / margin
+    binding_parts, level_parts = [], []
+    for j in range(n):
+        first = max(lower[j], math.ceil(floor_target / odds[j] - 1e-9))
+        if tops[j] - 1 >= first:
+            levels = np.arange(tops[j] - 1, first - 1, -1, dtype=np.float64)
+            level_parts.append(levels)
+            binding_parts.append(np.full(len(levels), j, dtype=np.int64))
+    if level_parts:
+        levels = np.concatenate(level_parts)
+        binding = np.concatenate(binding_parts)
+        order = np.argsort(-levels * prices[binding], kind="stable")
+        levels, binding = levels[order], binding[order]
+        for start in range(0, len(levels), SOLVER_CHUNK):
+            if levels[start] * odds[binding[start]] * margin <= best_profit:
+                break
+            chunk = slice(start, start + SOLVER_CHUNK)
+            keep_best(*evaluate(binding[chunk], levels[chunk]))
+
+    if best_stakes is None:
+        return None
+    stakes = [float(stake) * unit for stake in best_stakes]
+    profit = min(stake * price for stake, price in zip(stakes, odds)) - sum(stakes)
+    return stakes, profit
+
+
+class StakeStrategy(Enum):
+    PROPORTIONAL = "proportional"  # Stakes ∝ 1/odds, the classic split that ignores commission
+    EQUAL_PROFIT = "equal_profit"  # Same net return whichever outcome wins, after commission
+    PROFIT_BIASED = "profit_biased"  # Other outcomes break even, all profit on one outcome
+
+
+@dataclass
+class StakeAllocation:
+    """Stakes of a batch of opportunities. Row i belongs to opportunity i; padding columns hold 0."""
+    stakes: np.ndarray  # (opportunities, outcomes)
+    returns: np.ndarray  # (opportunities, outcomes) net return if that outcome wins
+    totals: np.ndarray  # (opportunities,) total investment
+    guaranteed_profit: np.ndarray  # (opportunities,) worst-case profit
+    feasible: np.ndarray  # (opportunities,) bool, stake limits can be met with every outcome profitable
+
+    @property
+    def profit_percentages(self) -> np.ndarray:
+        """Worst-case profit as a percentage of the investment."""
+        totals = np.where(self.totals > 0, self.totals, 1.0)
+        return np.where(self.totals > 0, self.guaranteed_profit / totals * 100, 0.0)
+
+
+class StakeCalculator:
+    """
+    Sizes the stakes of many arbitrage opportunities at once.
+    """
+
+    def __init__(
+        self,
+        total_stake: float = settings.DEFAULT_TOTAL_STAKE,
+        strategy: StakeStrategy = StakeStrategy(settings.STAKE_STRATEGY),
+        rounding: float = settings.STAKE_ROUNDING,
+    ):
+        """
+        Initialize the calculator.
+
+        Args:
+            total_stake: Investment per opportunity before limits and rounding
+            strategy: How the investment is split across outcomes
+            rounding: Stakes are multiples of this amount, 0 to keep cents
+        """
+        self.total_stake = total_stake
+        self.strategy = strategy
+        self.rounding = rounding
+
+    def allocate(
+        self,
+        opportunities: Sequence[ArbitrageOpportunity],
+        bias_outcomes: Optional[Sequence[int]] = None,
+    ) -> StakeAllocation:
+        """
+        Compute the stakes of a batch of opportunities.
+
+        Args:
+            opportunities: The opportunities to size
+            bias_outcomes: Per opportunity, the outcome that takes the profit under PROFIT_BIASED;
+                defaults to the longest price
+
+        Returns:
+            The stakes and their outcomes
+        """
+        n = len(opportunities)
+        width = max((len(opportunity.selections) for opportunity in opportunities), default=0)
+        odds = np.ones((n, width))
+        commission = np.zeros((n, width))
+        min_stake = np.zeros((n, width))
+        max_stake = np.full((n, width), np.inf)
+        mask = np.zeros((n, width), dtype=bool)
+
+        for i, opportunity in enumerate(opportunities):
+            for j, (_, price, bookmaker) in enumerate(opportunity.selections):
+                odds[i, j] = price
+                commission[i, j] = bookmaker.commission
+                min_stake[i, j] = bookmaker.min_stake
+                if bookmaker.max_stake is not None:
+                    max_stake[i, j] = bookmaker.max_stake
+                mask[i, j] = True
+
+        # Commission is charged on winnings
+        effective = np.where(mask, 1.0 + (odds - 1.0) * (1.0 - commission), 1.0)
+        weights = self._weights(odds, effective, mask, bias_outcomes)
+        stakes = weights * self.total_stake
+        # A negative share means the favoured outcome can not carry the others
+        feasible = ~(mask & (weights < 0)).any(axis=1)
+
+        # One common factor keeps the split while meeting every outcome's limits
+        with np.errstate(divide="ignore", invalid="ignore"):
+            lower = np.where(mask & (stakes > 0), min_stake / stakes, 0.0).max(axis=1, initial=0.0)
+            upper = np.where(mask & (stakes > 0), max_stake / stakes, np.inf).min(axis=1, initial=np.inf)
+        feasible &= lower <= upper
+        scale = np.clip(1.0, lower, np.where(feasible, upper, lower))
+        stakes = stakes * scale[:, None]
+
+        if self.rounding > 0 and self.strategy == StakeStrategy.PROFIT_BIASED:
+            stakes, rounded_ok = self._round(stakes, effective, mask, min_stake, max_stake)
+            feasible &= rounded_ok
+        elif self.rounding > 0:
+            stakes, rounded_ok = self._solve(stakes, effective, mask, min_stake, max_stake)
+            feasible &= rounded_ok
+
+        returns = np.where(mask, stakes * effective, 0.0)
+        totals = stakes.sum(axis=1)
+        worst = np.where(mask, returns, np.inf).min(axis=1, initial=np.inf)
+        guaranteed_profit = np.where(np.isfinite(worst), worst - totals, 0.0)
+        if self.strategy == StakeStrategy.PROFIT_BIASED:
+            # The other outcomes break even by design
+            feasible &= guaranteed_profit >= -1e-9
+        else:
+            feasible &= guaranteed_profit > 0
+
+        return StakeAllocation(
+            stakes=stakes,
+            returns=returns,
+            totals=totals,
+            guaranteed_profit=guaranteed_profit,
+            feasible=feasible,
+        )
+
+    def apply(self, opportunities: Sequence[ArbitrageOpportunity]) -> List[ArbitrageOpportunity]:
+        """
+        Fill in the stakes, investment and guaranteed profit of a batch of opportunities.
+
+        Args:
+            opportunities: The opportunities to size, updated in place
+
+        Returns:
+            The opportunities that stay profitable within their bookmakers' limits
+        """
+        allocation = self.allocate(opportunities)
+        profit_percentages = allocation.profit_percentages
+        sized = []
+
+        for i, opportunity in enumerate(opportunities):
+            if not allocation.feasible[i]:
+                logger.info(
+                    f"Dropping {opportunity.event_description} {opportunity.market_description}: "
+                    f"no profitable stakes within the bookmakers' limits"
+                )
+                continue
+            opportunity.stakes = {
+                name: round(float(allocation.stakes[i, j]), 2)
+                for j, (name, _, _) in enumerate(opportunity.selections)
+            }
+            opportunity.required_investment = round(float(allocation.totals[i]), 2)
+            opportunity.profit_percentage = round(float(profit_percentages[i]), 4)
+            sized.append(opportunity)
+
+        return sized
+
+    def _weights(
+        self,
+        odds: np.ndarray,
+        effective: np.ndarray,
+        mask: np.ndarray,
+        bias_outcomes: Optional[Sequence[int]],
+    ) -> np.ndarray:
+        """Share of the investment per outcome, each row summing to 1."""
+        if self.strategy == StakeStrategy.PROPORTIONAL:
+            inverse = np.where(mask, 1.0 / odds, 0.0)
+            return inverse / inverse.sum(axis=1, keepdims=True)
+
+        inverse = np.where(mask, 1.0 / effective, 0.0)
+        if self.strategy == StakeStrategy.EQUAL_PROFIT:
+            return inverse / inverse.sum(axis=1, keepdims=True)
+
+        # Profit-biased: every other outcome returns exactly the investment (weight 1/e),
+        # the favoured outcome takes whatever is left
+        rows = np.arange(len(odds))
+        if bias_outcomes is None:
+            favoured = np.where(mask, odds, -np.inf).argmax(axis=1)
+        else:
+            favoured = np.asarray(bias_outcomes, dtype=np.int64)
+        weights = inverse.copy()
+        weights[rows, favoured] = 0.0
+        weights[rows, favoured] = 1.0 - weights.sum(axis=1)
+        return weights
+
+    def _round(
+        self,
+        stakes: np.ndarray,
+        effective: np.ndarray,
+        mask: np.ndarray,
+        min_stake: np.ndarray,
+        max_stake: np.ndarray,
+    ):
+        """
+        Round stakes to the rounding unit, then step up any outcome that stopped covering the total.
+
+        Returns:
+            (rounded stakes, bool per row whether every outcome ended up profitable within limits)
+        """
+        unit = self.rounding
+        rounded = np.where(mask, np.round(stakes / unit) * unit, 0.0)
+        # Rounding must not cross a limit
+        rounded = np.where(mask, np.maximum(rounded, np.ceil(min_stake / unit) * unit), 0.0)
+        rounded = np.where(mask & np.isfinite(max_stake), np.minimum(rounded, np.floor(max_stake / unit) * unit), rounded)
+
+        for _ in range(MAX_ROUNDING_STEPS):
+            short = self._short(rounded, effective, mask)
+            if not short.any():
+                break
+            # Only the worst-covered outcome of each row moves, so the total grows slowly
+            coverage = np.where(short, rounded * effective - rounded.sum(axis=1, keepdims=True), np.inf)
+            worst = coverage.argmin(axis=1)
+            rows = np.flatnonzero(short.any(axis=1))
+            rounded[rows, worst[rows]] += unit
+
+        within_limits = ~(mask & (rounded > max_stake + 1e-9)).any(axis=1)
+        covered = ~self._short(rounded, effective, mask).any(axis=1)
+        return rounded, within_limits & covered
+
+    def _solve(
+        self,
+        stakes: np.ndarray,
+        effective: np.ndarray,
+        mask: np.ndarray,
+        min_stake: np.ndarray,
+        max_stake: np.ndarray,
+    ):
+        """
+        Replace each row's stakes with the rounded vector of highest guaranteed profit
+        that fits the row's investment.
+
+        Returns:
+            (rounded stakes, bool per row whether a profitable vector exists)
+        """
+        rounded = np.zeros_like(stakes)
+        solved = np.zeros(len(stakes), dtype=bool)
+        for i in range(len(stakes)):
+            columns = np.flatnonzero(mask[i])
+            solution = solve_rounded_stakes(
+                effective[i, columns].tolist(),
+                min_stake[i, columns].tolist(),
+                max_stake[i, columns].tolist(),
+                float(stakes[i, columns].sum()),
+                self.rounding,
+            )
+            if solution is not None:
+                rounded[i, columns] = solution[0]
+                solved[i] = True
+        return rounded, solved
+
+    def _short(self, stakes: np.ndarray, effective: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        """Outcomes whose return does not beat the total investment (or match it, for PROFIT_BIASED)."""
+        returns = stakes * effective
+        totals = stakes.sum(axis=1, keepdims=True)
+        if self.strategy == StakeStrategy.PROFIT_BIASED:
+            return mask & (returns < totals - 1e-9)
+        return mask & (returns <= totals + 1e-9)
@@ -0,0 +1,122 @@
+"""
+Helper functions shared by scrapers and the arbitrage core.
+"""
+
+import re
+from typing import Optional
+
+from surebetbot.core.models import MarketType
+
+# Markets priced around a line: the handicap given to a team, or the total to go over or under
+LINE_MARKET_TYPES = {MarketType.HANDICAP, MarketType.TOTAL_OVER_UNDER}
+
+# A signed number that is not part of a score ("1-0") or an ordinal ("1st"), optionally
+# followed by the second half of a split Asian line ("-0.5/-1")
+LINE_PATTERN = re.compile(
+    r"(?<![\w.\-])([+-]?\d+(?:\.\d+)?)(?:\s*[/,]\s*([+-]?\d+(?:\.\d+)?))?(?![\w.\-])"
+)
+
+
+# Names of a game's or race's main result market, after lowercasing and dropping punctuation
+MAIN_RESULT_MARKETS = {
+    "win", "winner", "to win", "match winner", "game winner", "race winner", "fight winner",
+    "match result", "full time result", "result", "1x2", "win draw win",
+    "head to head", "h2h", "match betting", "match odds", "moneyline", "money line",
+}
+
+# Winner markets settled on something other than the whole game: a period, the margin, a clean sheet
+WINNER_VARIANT_PATTERN = re.compile(
+    r"\b(half|1st|2nd|first|second|third|quarter|period|set|map|innings?|margin|nil|both|either|double)\b"
+)
+WINNER_PATTERN = re.compile(r"\b(winner|win|head to head|h2h|match result|match betting)\b")
+TOTAL_PATTERN = re.compile(r"over/under|o/u|\btotals?\b")
+HANDICAP_PATTERN = re.compile(r"\b(handicap|spread)\b")
+LINE_NAME_PATTERN = re.compile(r"\blines?\b")
+
+
+def normalize_market_name(market_name: str) -> str:
+    """Lowercase a market name and collapse its punctuation and spacing."""
+    return " ".join(re.sub(r"[^\w\s]", " ", market_name.lower()).split())
+
+
+def is_main_result_market(market_name: str) -> bool:
+    """Whether a market name is the main result of the game or race ("Match Result", "Head to Head", "Win")."""
+    return normalize_market_name(market_name) in MAIN_RESULT_MARKETS
+
+
+def determine_market_type(market_name: str) -> MarketType:
+    """
+    Determine the market type from a market name.
+
+    Args:
+        market_name: Human-readable market name (e.g. "Match Result", "Total Goals Over/Under")
+
+    Returns:
+        The matching MarketType, MarketType.OTHER if none matches
+    """
+    name = market_name.lower()
+
+    # Racing market names are checked first, "win" also appears in "each way win"
+    if "each way" in name or "e/w" in name:
+        return MarketType.EACH_WAY
+    if "quinella" in name:
+        return MarketType.QUINELLA
+    if "exacta" in name or "forecast" in name:
+        return MarketType.EXACTA
+    if "trifecta" in name or "tricast" in name:
+        return MarketType.TRIFECTA
+    if name.strip() == "place" or "to place" in name:
+        return MarketType.PLACE
+
+    # "First Half Winner", "Winning Margin" and "To Win To Nil" settle on something else than the result
+    if is_main_result_market(name) or (WINNER_PATTERN.search(name) and not WINNER_VARIANT_PATTERN.search(name)):
+        return MarketType.WIN
+    if HANDICAP_PATTERN.search(name):
+        return MarketType.HANDICAP
+    # "Total Goals Line" is a total, a bare "Line" a handicap
+    if TOTAL_PATTERN.search(name):
+        return MarketType.TOTAL_OVER_UNDER
+    if LINE_NAME_PATTERN.search(name):
+        return MarketType.HANDICAP
+    if "correct score" in name:
+        return MarketType.CORRECT_SCORE
+    if "player" in name:
+        return MarketType.PLAYER_PROPS
+    return MarketType.OTHER
+
+
+def parse_line(text: str) -> Optional[float]:
+    """
+    Parse the handicap or total line out of a market or outcome name.
+
+    Args:
+        text: e.g. "Over 2.5", "Arsenal (-1.5)", "Over/Under 2.5 Goals", "Chelsea +0.5/+1"
+
+    Returns:
+        The last line in the text, split Asian lines averaged ("-0.5/-1" is -0.75), None if there is none
+    """
+    matches = LINE_PATTERN.findall(text)
+    if not matches:
+        return None
+    first, second = matches[-1]
+    if not second:
+        return float(first)
+    # The sign of a split line is usually only written once
+    sign = -1.0 if first.startswith("-") else 1.0
+    return (float(first) + sign * abs(float(second))) / 2
+
+
+def determine_market_line(market_type: MarketType, market_name: str) -> Optional[float]:
+    """
+    The line of a handicap or total market named after it ("Over/Under 2.5 Goals").
+
+    Args:
+        market_type: The market type
+        market_name: Human-readable market name
+
+    Returns:
+        The line, None for other market types or when each outcome names its own line
+    """
+    if market_type not in LINE_MARKET_TYPES:
+        return None
+    return parse_line(market_name)
@@ -0,0 +1,409 @@
+"""
+Notifier framework built around an outbox.
+
+Detection hands opportunities to notify(), which only puts them in the outbox
+and returns, so a slow or rate-limited channel never holds up a cycle. A
+dispatcher task drains the outbox: it coalesces alerts that arrive close
+together into one message, paces messages with a token bucket that follows the
+limits the channel reports, retries failed sends with jittered backoff and
+drops alerts that went stale before they could be sent.
+
+When the outbox backs up, the most valuable and most urgent alerts go first:
+it is a heap on expected profit weighted by how soon the event starts. An
+opportunity detected again while its alert is still waiting replaces that
+alert in place, so a stale price never takes a send slot.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Hashable, Iterable, List, Optional
+
+from surebetbot.config import settings
+from surebetbot.core.models import ArbitrageOpportunity
+from surebetbot.core.rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationError(Exception):
+    """A message could not be delivered."""
+
+    def __init__(self, message: str, retryable: bool = True, retry_after: Optional[float] = None):
+        """
+        Args:
+            message: What went wrong
+            retryable: Whether sending the same message again may work
+            retry_after: Seconds the channel asked to wait before sending anything
+        """
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+@dataclass
+class Alert:
+    """An opportunity waiting in the outbox."""
+    opportunity: ArbitrageOpportunity
+    queued_at: float  # Monotonic time it was queued
+    expires_at: float  # Monotonic time after which it is not worth sending
+    attempts: int = 0
+    priority: float = 0.0  # Higher goes first
+    key: Hashable = None  # Alerts with the same key supersede each other
+
+
+def alert_priority(
+    opportunity: ArbitrageOpportunity,
+    now: Optional[datetime] = None,
+    horizon: float = settings.NOTIFY_URGENCY_HORIZON,
+) -> float:
+    """
+    Send priority of an opportunity: expected profit, weighted up as the event's start nears.
+
+    Args:
+        opportunity: The opportunity
+        now: Current time, defaults to now
+        horizon: Seconds to start at which the weight is 2, growing to 1 + horizon / 60 a minute out
+
+    Returns:
+        The priority, in currency units of expected profit times the urgency weight
+    """
+    expected_profit = opportunity.profit_percentage / 100 * opportunity.get_stake_ceiling()
+    if opportunity.start_time is None:
+        return expected_profit
+    start = opportunity.start_time
+    to_start = (start - (now or datetime.now(start.tzinfo))).total_seconds()
+    return expected_profit * (1.0 + horizon / max(to_start, 60.0))
+
+
+def supersede_key(opportunity: ArbitrageOpportunity) -> Hashable:
+    """The market an opportunity is in; a newer opportunity in the same market replaces a waiting one."""
+    if opportunity.market_key is not None:
+        return opportunity.market_key
+    return opportunity.event_description, opportunity.market_description
+
+
+class Outbox:
+    """
+    Alerts waiting to be sent, highest priority first, at most one per key.
+
+    A heap of [-priority, sequence, alert] entries; superseded and dropped entries
+    are blanked and skipped when they surface, so puts and gets are O(log n).
+    Only dropping the lowest priority alert from a full outbox scans it.
+    """
+
+    def __init__(self, max_size: int):
+        """
+        Initialize an empty outbox.
+
+        Args:
+            max_size: Alerts held before the lowest priority one is dropped
+        """
+        self.max_size = max_size
+        self._heap: List[list] = []
+        self._entries: Dict[Hashable, list] = {}
+        self._sequence = itertools.count()
+        self._ready = asyncio.Event()
+        self._pushed = asyncio.Event()
+        # Alerts put and not yet marked done, as in asyncio.Queue
+        self._unfinished = 0
+        self._finished = asyncio.Event()
+        self._finished.set()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def put(self, alert: Alert) -> Optional[Alert]:
+        """
+        Add an alert, replacing a waiting one with the same key.
+
+        Returns:
+            The alert it replaced or, when the outbox was full, the one dropped to make room
+        """
+        removed = self._remove(alert.key)
+        if removed is None:
+            if len(self._entries) >= self.max_size:
+                lowest = max((entry for entry in self._heap if entry[2] is not None), key=lambda entry: entry[:2])
+                if -lowest[0] >= alert.priority:
+                    # Less valuable than anything waiting: the new alert is the one dropped
+                    return alert
+                removed = self._remove(lowest[2].key)
+            else:
+                self._unfinished += 1
+                self._finished.clear()
+        self._push(alert)
+        return removed
+
+    def requeue(self, alert: Alert) -> None:
+        """Put back an alert taken with get() and not sent, unless a newer one with its key arrived meanwhile."""
+        if alert.key in self._entries:
+            self.task_done()
+        else:
+            self._push(alert)
+
+    def get_nowait(self) -> Optional[Alert]:
+        """Take the highest priority alert, None when the outbox is empty."""
+        while self._heap:
+            _, _, alert = heapq.heappop(self._heap)
+            if alert is not None:
+                del self._entries[alert.key]
+                if not self._entries:
+                    self._ready.clear()
+                return alert
+        return None
+
+    async def get(self) -> Alert:
+        """Wait for an alert and take the highest priority one."""
+        while True:
+            alert = self.get_nowait()
+            if alert is not None:
+                return alert
+            await self._ready.wait()
+
+    async def wait(self) -> None:
+        """Wait until an alert is waiting."""
+        await self._ready.wait()
+
+    async def fill(self, size: int, timeout: float) -> None:
+        """Wait until size alerts are waiting, or for timeout seconds at most."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while len(self._entries) < size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            self._pushed.clear()
+            try:
+                await asyncio.wait_for(self._pushed.wait(), remaining)
+            except asyncio.TimeoutError:
+                return
+
+    def task_done(self) -> None:
+        """Mark an alert taken with get() as handled."""
+        self._unfinished -= 1
+        if self._unfinished <= 0:
+            self._finished.set()
+
+    async def join(self) -> None:
+        """Wait until every alert put is handled."""
+        await self._finished.wait()
+
+    def _push(self, alert: Alert) -> None:
+        entry = [-alert.priority, next(self._sequence), alert]
+        self._entries[alert.key] = entry
+        heapq.heappush(self._heap, entry)
+        self._ready.set()
+        self._pushed.set()
+
+    def _remove(self, key: Hashable) -> Optional[Alert]:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        alert, entry[2] = entry[2], None
+        if not self._entries:
+            self._ready.clear()
+        return alert
+
+
+class BaseNotifier(ABC):
+    """
+    Sends opportunities to a channel through a priority outbox and a dispatcher task.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = settings.NOTIFY_BATCH_SIZE,
+        batch_window: float = settings.NOTIFY_BATCH_WINDOW,
+        rate: float = settings.NOTIFY_RATE,
+        burst: int = settings.NOTIFY_BURST,
+        max_retries: int = settings.NOTIFY_MAX_RETRIES,
+        backoff: float = settings.NOTIFY_BACKOFF,
+        expiry: float = settings.ALERT_EXPIRY,
+        queue_size: int = settings.NOTIFY_QUEUE_SIZE,
+    ):
+        """
+        Initialize the notifier. The dispatcher is started by start().
+
+        Args:
+            batch_size: Most alerts in one message
+            batch_window: Seconds to wait for more alerts before sending a message that is not full
+            rate: Messages per second, sustained
+            burst: Messages sent back to back before pacing kicks in
+            max_retries: Retries of a failed message after the first attempt
+            backoff: Base retry delay in seconds, doubled on every retry
+            expiry: Seconds after queuing that an unsent alert is dropped
+            queue_size: Alerts waiting before the least valuable is dropped
+        """
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.expiry = expiry
+        self.queue_size = queue_size
+        self.bucket = TokenBucket(rate, burst)
+        self._outbox: Optional[Outbox] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.dropped = 0
+        self.superseded = 0
+        self.expired = 0
+        self.failed = 0
+
+    @abstractmethod
+    async def send(self, alerts: List[Alert]) -> None:
+        """
+        Deliver alerts as one message.
+
+        Args:
+            alerts: The alerts of the message, as many as fits() allowed
+
+        Raises:
+            NotificationError: When the message was not delivered
+        """
+
+    def fits(self, alerts: List[Alert], alert: Alert) -> bool:
+        """Whether another alert can join a message. Channels with size limits narrow this."""
+        return len(alerts) < self.batch_size
+
+    async def start(self) -> None:
+        """Start the dispatcher."""
+        if self._dispatcher is None:
+            self._outbox = Outbox(self.queue_size)
+            self._dispatcher = asyncio.create_task(self._dispatch_loop())
+
+    def notify(self, opportunity: ArbitrageOpportunity) -> None:
+        """
+        Queue an opportunity for sending, without waiting.
+
+        An alert still waiting for the same market is replaced by this one.
+
+        Args:
+            opportunity: The opportunity to alert
+        """
+        if self._outbox is None:
+            raise RuntimeError(f"{type(self).__name__}.start() has not been awaited")
+        now = time.monotonic()
+        alert = Alert(
+            opportunity,
+            queued_at=now,
+            expires_at=now + self.expiry,
+            priority=alert_priority(opportunity),
+            key=supersede_key(opportunity),
+        )
+        removed = self._outbox.put(alert)
+        if removed is None:
+            return
+        if removed.key == alert.key and removed is not alert:
+            self.superseded += 1
+        else:
+            self.dropped += 1
+            logger.warning(f"Notification outbox is full, dropped the least valuable alert ({self.dropped} so far)")
+
+    def notify_many(self, opportunities: Iterable[ArbitrageOpportunity]) -> None:
+        """Queue several opportunities for sending, without waiting."""
+        for opportunity in opportunities:
+            self.notify(opportunity)
+
+    async def flush(self) -> None:
+        """Wait until every queued alert is sent, dropped or given up on."""
+        if self._outbox is not None:
+            await self._outbox.join()
+
+    async def close(self, timeout: float = 10.0) -> None:
+        """
+        Send what is queued, then stop the dispatcher.
+
+        Args:
+            timeout: Seconds to wait for the outbox to drain before giving up on it
+        """
+        if self._dispatcher is None:
+            return
+        try:
+            await asyncio.wait_for(self.flush(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Closing {type(self).__name__} with {len(self._outbox)} alerts unsent")
+        self._dispatcher.cancel()
+        try:
+            await self._dispatcher
+        except asyncio.CancelledError:
+            pass
+        self._dispatcher = None
+        self._outbox = None
+
+    async def _dispatch_loop(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._deliver(batch)
+            except Exception as e:
+                # A notifier bug must not stop the dispatcher
+                logger.error(f"Error dispatching notifications: {str(e)}")
+                self.failed += len(batch)
+            finally:
+                for _ in batch:
+                    self._outbox.task_done()
+
+    async def _next_batch(self) -> List[Alert]:
+        """The alerts of the next message: the most valuable that arrive within the batch window, as many as fit."""
+        outbox = self._outbox
+        await outbox.wait()
+        # Pick only once the window is over and the message may go out, so alerts
+        # arriving meanwhile that are worth more go first
+        await outbox.fill(self.batch_size, self.batch_window)
+        await self.bucket.acquire()
+        batch = [await outbox.get()]
+        while True:
+            alert = outbox.get_nowait()
+            if alert is None:
+                break
+            if not self.fits(batch, alert):
+                outbox.requeue(alert)
+                break
+            batch.append(alert)
+        return batch
+
+    def _unexpired(self, batch: List[Alert]) -> List[Alert]:
+        now = time.monotonic()
+        live = [alert for alert in batch if alert.expires_at > now]
+        if len(live) < len(batch):
+            self.expired += len(batch) - len(live)
+            logger.info(f"Dropped {len(batch) - len(live)} stale alerts")
+        return live
+
+    async def _deliver(self, batch: List[Alert]) -> None:
+        """Send a message, retrying with jittered backoff until it goes through, expires or runs out of retries."""
+        for attempt in range(self.max_retries + 1):
+            # Alerts re-detected while this message was failing go out with their newer prices
+            batch = [alert for alert in self._unexpired(batch) if alert.key not in self._outbox]
+            if not batch:
+                return
+            if attempt:
+                await self.bucket.acquire()
+            for alert in batch:
+                alert.attempts += 1
+            try:
+                await self.send(batch)
+                self.sent += len(batch)
+                return
+            except NotificationError as e:
+                if not e.retryable or attempt == self.max_retries:
+                    logger.error(f"Giving up on {len(batch)} alerts: {str(e)}")
+                    self.failed += len(batch)
+                    return
+                if e.retry_after is not None:
+                    # The channel said when; the bucket holds back every message until then
+                    self.bucket.pause(e.retry_after)
+                    delay = 0.0
+                else:
+                    delay = self.backoff * (2 ** attempt) * (0.5 + random.random())
+                logger.warning(f"Sending {len(batch)} alerts failed (attempt {attempt + 1}): {str(e)}")
+            await asyncio.sleep(delay)
@@ -0,0 +1,153 @@
+"""
+Discord webhook notifier.
+
+Alerts are sent as embeds, up to ten per webhook message within Discord's
+6000 character limit, so a burst of opportunities costs a handful of requests.
+The webhook's X-RateLimit headers and 429 answers drive the notifier's token
+bucket, so messages are paced to what Discord allows rather than retried into
+a longer ban.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import aiohttp
+
+from surebetbot.config import settings
+from surebetbot.core.models import ArbitrageOpportunity
+from surebetbot.notifications.base_notifier import Alert, BaseNotifier, NotificationError
+
+logger = logging.getLogger(__name__)
+
+# Discord limits
+MAX_EMBEDS = 10
+MAX_MESSAGE_CHARS = 6000
+MAX_TITLE_CHARS = 256
+MAX_DESCRIPTION_CHARS = 4096
+
+EMBED_COLOR = 0x2ECC71
+
+
+def opportunity_embed(opportunity: ArbitrageOpportunity) -> Dict[str, Any]:
+    """
+    Discord embed of an opportunity.
+
+    Args:
+        opportunity: The opportunity
+
+    Returns:
+        The embed, with one line per selection and the total return in the footer
+    """
+    lines = [
+        f"**{name}** {odds:.2f} @ {bookmaker.name}: stake ${opportunity.get_stake_for_selection(name):.2f}"
+        for name, odds, bookmaker in opportunity.selections
+    ]
+    description = f"{opportunity.market_description}\n" + "\n".join(lines)
+    if len(description) > MAX_DESCRIPTION_CHARS:
+        description = description[:MAX_DESCRIPTION_CHARS - 1] + "…"
+    return {
+        "title": f"{opportunity.profit_percentage:.2f}% | {opportunity.event_description}"[:MAX_TITLE_CHARS],
+        "description": description,
+        "color": EMBED_COLOR,
+        "footer": {
+            "text": f"Invest ${opportunity.required_investment:.2f}, return ${opportunity.get_expected_return():.2f}"
+        },
+        "timestamp": opportunity.detection_time.astimezone().isoformat(),
+    }
+
+
+def embed_chars(embed: Dict[str, Any]) -> int:
+    """Characters of an embed that count towards Discord's per-message limit."""
+    return len(embed.get("title", "")) + len(embed.get("description", "")) + len(embed.get("footer", {}).get("text", ""))
+
+
+class DiscordNotifier(BaseNotifier):
+    """
+    Sends opportunities to a Discord channel through a webhook.
+    """
+
+    def __init__(self, webhook_url: str = settings.DISCORD_WEBHOOK_URL, username: str = "SureBetBot", **kwargs):
+        """
+        Initialize the notifier.
+
+        Args:
+            webhook_url: The channel's webhook URL
+            username: Name the messages are posted under
+            **kwargs: Outbox settings, see BaseNotifier
+        """
+        kwargs.setdefault("batch_size", MAX_EMBEDS)
+        super().__init__(**kwargs)
+        self.batch_size = min(self.batch_size, MAX_EMBEDS)
+        self.webhook_url = webhook_url
+        self.username = username
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def fits(self, alerts: List[Alert], alert: Alert) -> bool:
+        if not super().fits(alerts, alert):
+            return False
+        chars = sum(embed_chars(opportunity_embed(queued.opportunity)) for queued in alerts)
+        return chars + embed_chars(opportunity_embed(alert.opportunity)) <= MAX_MESSAGE_CHARS
+
+    async def send(self, alerts: List[Alert]) -> None:
+        payload = {
+            "username": self.username,
+            "embeds": [opportunity_embed(alert.opportunity) for alert in alerts],
+        }
+        try:
+            status, headers, body = await self._post(payload)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise NotificationError(f"Webhook request failed: {str(e)}") from e
+
+        self._follow_rate_limit(headers)
+        if status in (200, 204):
+            logger.info(f"Sent {len(alerts)} alerts to Discord")
+            return
+        if status == 429:
+            retry_after = _retry_after(headers, body)
+            raise NotificationError(f"Rate limited for {retry_after:.2f}s", retry_after=retry_after)
+        # A bad payload or a deleted webhook will not get better by retrying
+        raise NotificationError(f"Webhook returned {status}: {body}", retryable=status >= 500)
+
+    async def close(self, timeout: float = 10.0) -> None:
+        """Send what is queued, stop the dispatcher and close the HTTP session."""
+        await super().close(timeout)
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _post(self, payload: Dict[str, Any]) -> Tuple[int, Mapping[str, str], Optional[Any]]:
+        """POST a message to the webhook, returning (status, headers, decoded body)."""
+        if not self.webhook_url:
+            raise NotificationError("DISCORD_WEBHOOK_URL is not set", retryable=False)
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=settings.HTTP_TIMEOUT))
+        async with self._session.post(self.webhook_url, json=payload) as response:
+            text = await response.text()
+            try:
+                body = json.loads(text) if text else None
+            except ValueError:
+                body = text
+            return response.status, response.headers, body
+
+    def _follow_rate_limit(self, headers: Mapping[str, str]) -> None:
+        """Narrow the token bucket to the requests Discord still allows in its current window."""
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset_after = headers.get("X-RateLimit-Reset-After")
+        if remaining is None or reset_after is None:
+            return
+        try:
+            self.bucket.limit(int(remaining), float(reset_after))
+        except ValueError:
+            logger.debug(f"Unreadable rate limit headers: {remaining!r}, {reset_after!r}")
+
+
+def _retry_after(headers: Mapping[str, str], body: Optional[Any]) -> float:
+    """Seconds Discord asked to wait, from the 429 body or the Retry-After header."""
+    if isinstance(body, dict) and "retry_after" in body:
+        return float(body["retry_after"])
+    try:
+        return float(headers.get("Retry-After", "1"))
+    except ValueError:
+        return 1.0
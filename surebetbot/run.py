@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""
+Run SureBetBot: scrape on the adaptive schedule, detect arbitrage and alert Discord.
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from datetime import datetime, timedelta
+from typing import List
+
+from surebetbot.config import settings
+from surebetbot.core.incremental_arbitrage import IncrementalArbitrageDetector
+from surebetbot.core.models import ScrapingResult, SportType
+from surebetbot.notifications.discord_notifier import DiscordNotifier
+from surebetbot.scheduler import Scheduler
+from surebetbot.scrapers.base_scraper import BaseScraper
+from surebetbot.scrapers.browser_pool import close_browser_pool
+from surebetbot.scrapers.http_client import close_http_client
+from surebetbot.scrapers.sportsbet_scraper import SportsbetScraper
+from surebetbot.storage.alert_history import close_alert_history, get_alert_history
+from surebetbot.storage.sqlite_handler import close_history_store, get_history_store
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)],
+)
+logger = logging.getLogger("surebetbot")
+
+
+async def main(sports: List[SportType]) -> None:
+    """Run until interrupted."""
+    scrapers: List[BaseScraper] = [SportsbetScraper()]
+    detector = IncrementalArbitrageDetector()
+    alerts = get_alert_history()
+    history = get_history_store()
+    notifier = DiscordNotifier()
+    last_pruned = datetime.now()
+
+    def prune(now: datetime) -> None:
+        # Bookmakers stop listing an event once it starts instead of withdrawing its prices
+        before = now - timedelta(seconds=settings.SCHEDULE_AFTER_START)
+        evicted = detector.prune(before, now - timedelta(seconds=settings.PRUNE_IDLE_AFTER))
+        if detector.index.matcher is not None:
+            detector.index.matcher.prune(before, evicted)
+
+    def on_result(result: ScrapingResult) -> None:
+        nonlocal last_pruned
+        if (result.timestamp - last_pruned).total_seconds() >= settings.PRUNE_INTERVAL:
+            last_pruned = result.timestamp
+            prune(result.timestamp)
+        history.write_results([result], result.timestamp)
+        update = detector.ingest_result(result)
+        new = alerts.filter_new(update.opened + update.changed)
+        if new:
+            notifier.notify_many(new)
+
+    try:
+        await history.start()
+        await notifier.start()
+        for scraper in scrapers:
+            await scraper.initialize()
+        await Scheduler(scrapers, on_result, sports).run()
+    finally:
+        for scraper in scrapers:
+            await scraper.cleanup()
+        await notifier.close()
+        await close_history_store()
+        close_alert_history()
+        await close_browser_pool()
+        await close_http_client()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--sports", nargs="+", default=["SOCCER"], choices=[sport.name for sport in SportType],
+        help="Sports to scrape",
+    )
+    args = parser.parse_args()
+    try:
+        asyncio.run(main([SportType[name] for name in args.sports]))
+    except KeyboardInterrupt:
+        logger.info("Stopped")
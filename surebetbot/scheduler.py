@@ -0,0 +1,355 @@
+"""
+Adaptive refresh scheduler.
+
+Rather than scraping every bookmaker's whole board every few minutes, each
+listed event is its own job in a heap ordered by when it is next due. An
+event's refresh interval is a share of its time to start, clamped between a
+floor and a ceiling, so a race three minutes from the jump is scraped again
+every few seconds while a match next week is looked at hourly. Listing jobs
+per (bookmaker, sport) find new events and re-time the known ones. Browser
+time goes where prices actually move.
+
+Every bookmaker has its own heap and scrape budget (requests per second,
+concurrent pages, bytes per minute; see config/bookmakers.py). Its scraper
+takes a request token before every fetch and page load and charges every
+response body to the byte budget, so the site's rate holds however far a
+scrape fans out. Worker slots are shared: a free slot takes the most overdue
+job of any bookmaker whose budget allows a scrape now, so a throttled site's
+slot is stolen by another site's backlog instead of idling, and each site
+runs at its own limit rather than at the slowest site's pace.
+"""
+
+import asyncio
+import heapq
+import inspect
+import itertools
+import logging
+import math
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from surebetbot.config import settings
+from surebetbot.config.bookmakers import ScrapeBudget, get_scrape_budget
+from surebetbot.core.models import Bookmaker, Event, ScrapingResult, SportType
+from surebetbot.core.rate_limit import TokenBucket
+from surebetbot.scrapers.base_scraper import BaseScraper
+
+logger = logging.getLogger(__name__)
+
+LISTING = "listing"
+EVENT = "event"
+
+# Consecutive failed refreshes after which an event is given up on
+MAX_FAILURES = 3
+
+JobKey = Tuple[str, str]  # (bookmaker id, event URL or sport name)
+
+
+def refresh_interval(
+    to_start: float,
+    min_interval: float = settings.SCHEDULE_MIN_INTERVAL,
+    max_interval: float = settings.SCHEDULE_MAX_INTERVAL,
+    fraction: float = settings.SCHEDULE_INTERVAL_FRACTION,
+) -> float:
+    """
+    Seconds until an event is refreshed again.
+
+    Args:
+        to_start: Seconds until the event starts, negative once it has
+        min_interval: Shortest interval, for events about to start
+        max_interval: Longest interval, for events days out
+        fraction: Interval as a share of the time to start in between
+
+    Returns:
+        The interval
+    """
+    return min(max_interval, max(min_interval, to_start * fraction))
+
+
+@dataclass(order=True)
+class Job:
+    """A scrape waiting in the schedule."""
+    due: float  # Event loop time it is due
+    sequence: int  # Ties go to the job scheduled first
+    kind: str = field(compare=False)  # LISTING or EVENT
+    bookmaker: Bookmaker = field(compare=False)
+    target: str = field(compare=False)  # Event URL, or the sport name of a listing
+    sport: Optional[SportType] = field(default=None, compare=False)
+    start_time: Optional[datetime] = field(default=None, compare=False)
+    failures: int = field(default=0, compare=False)
+    cancelled: bool = field(default=False, compare=False)
+
+    @property
+    def key(self) -> JobKey:
+        return self.bookmaker.id, self.target
+
+
+class BookmakerBudget:
+    """
+    A bookmaker's scrape budget as it is spent.
+
+    The buckets are shared with the bookmaker's scraper, which spends them
+    request by request; the scheduler only holds jobs back while they are empty.
+    """
+
+    def __init__(self, limits: ScrapeBudget):
+        """
+        Initialize an unspent budget.
+
+        Args:
+            limits: The bookmaker's configured budget
+        """
+        self.limits = limits
+        self.requests = TokenBucket(limits.requests_per_second, limits.burst)
+        self.bytes = TokenBucket(limits.bytes_per_minute / 60, limits.bytes_per_minute)
+        self.pages = 0
+
+    def pages_for(self, job: Job) -> int:
+        """Pages a job may hold: a listing may fan out over every page, an event uses one."""
+        return self.limits.concurrent_pages if job.kind == LISTING else 1
+
+    def delay(self, job: Job) -> float:
+        """Seconds until the budget allows the job, infinite while it waits for pages to free up."""
+        if self.pages and self.pages + self.pages_for(job) > self.limits.concurrent_pages:
+            return math.inf
+        # Bytes are charged as responses arrive; a bucket in debt holds the next request back
+        return max(self.requests.delay(), self.bytes.delay(0.0))
+
+    def start(self, job: Job) -> None:
+        """Take the job's pages."""
+        self.pages += self.pages_for(job)
+
+    def finish(self, job: Job) -> None:
+        """Give back the job's pages."""
+        self.pages -= self.pages_for(job)
+
+
+class Scheduler:
+    """
+    Runs listing and event scrapes when they are due, a few at a time.
+    """
+
+    def __init__(
+        self,
+        scrapers: Iterable[BaseScraper],
+        on_result: Callable[[ScrapingResult], Union[None, Awaitable[None]]],
+        sports: Optional[List[SportType]] = None,
+        concurrency: int = settings.SCHEDULE_CONCURRENCY,
+        min_interval: float = settings.SCHEDULE_MIN_INTERVAL,
+        max_interval: float = settings.SCHEDULE_MAX_INTERVAL,
+        fraction: float = settings.SCHEDULE_INTERVAL_FRACTION,
+        discovery_interval: float = settings.SCHEDULE_DISCOVERY_INTERVAL,
+        after_start: float = settings.SCHEDULE_AFTER_START,
+        clock: Callable[[], datetime] = datetime.now,
+        budgets: Callable[[str], ScrapeBudget] = get_scrape_budget,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            scrapers: One initialized scraper per bookmaker
+            on_result: Called, and awaited if it returns an awaitable, with the events of every scrape
+            sports: Sports listed on every bookmaker, defaults to soccer
+            concurrency: Scrapes run at once across bookmakers, on top of each bookmaker's page limit
+            min_interval: Shortest refresh interval, for events about to start
+            max_interval: Longest refresh interval, for events days out
+            fraction: Refresh interval as a share of the time to start
+            discovery_interval: Seconds between listing scrapes
+            after_start: Seconds after the start during which an event is still refreshed
+            clock: Current time, compared with event start times
+            budgets: Scrape budget of a bookmaker id
+        """
+        self.scrapers: Dict[str, BaseScraper] = {scraper.bookmaker.id: scraper for scraper in scrapers}
+        self.budgets: Dict[str, BookmakerBudget] = {
+            bookmaker_id: BookmakerBudget(budgets(bookmaker_id)) for bookmaker_id in self.scrapers
+        }
+        for bookmaker_id, scraper in self.scrapers.items():
+            budget = self.budgets[bookmaker_id]
+            # A listing fans out over no more pages than the budget allows
+            scraper.max_concurrent_pages = budget.limits.concurrent_pages
+            scraper.request_bucket = budget.requests
+            scraper.byte_bucket = budget.bytes
+        self.on_result = on_result
+        self.sports = sports or [SportType.SOCCER]
+        self.concurrency = concurrency
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.fraction = fraction
+        self.discovery_interval = discovery_interval
+        self.after_start = after_start
+        self.clock = clock
+        self._heaps: Dict[str, List[Job]] = {bookmaker_id: [] for bookmaker_id in self.scrapers}
+        self._jobs: Dict[JobKey, Job] = {}
+        self._running: Set[JobKey] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._sequence = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.completed = 0
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    async def run(self) -> None:
+        """Scrape every bookmaker's listings, then keep every job running when due, until cancelled."""
+        self._wakeup = asyncio.Event()
+        self._slots = asyncio.Semaphore(self.concurrency)
+        for scraper in self.scrapers.values():
+            for sport in self.sports:
+                self.schedule_listing(scraper.bookmaker, sport)
+        try:
+            while True:
+                await self._slots.acquire()
+                job = await self._next_due()
+                self._running.add(job.key)
+                task = asyncio.create_task(self._run_job(job))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+        finally:
+            for task in list(self._tasks):
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def schedule_listing(self, bookmaker: Bookmaker, sport: SportType, delay: float = 0.0) -> None:
+        """
+        Schedule a listing scrape of a sport.
+
+        Args:
+            bookmaker: The bookmaker
+            sport: The sport
+            delay: Seconds from now
+        """
+        self._push(Job(self._now() + delay, next(self._sequence), LISTING, bookmaker, sport.name, sport=sport))
+
+    def track(self, event: Event, failures: int = 0) -> None:
+        """
+        Schedule the next refresh of an event from its time to start, replacing a waiting one.
+
+        Events past their start are forgotten, events whose bookmaker showed no start time
+        are refreshed at the longest interval. Events being scraped are rescheduled
+        when their scrape finishes.
+
+        Args:
+            event: A freshly scraped event
+            failures: Consecutive failed refreshes so far
+        """
+        # A start time the bookmaker did not show is the parse time, already past by now
+        start_time = event.start_time if event.start_time_known else None
+        self._schedule_event(event.bookmaker, event.url or event.id, event.sport, start_time, failures)
+
+    def _schedule_event(
+        self,
+        bookmaker: Bookmaker,
+        target: str,
+        sport: Optional[SportType],
+        start_time: Optional[datetime],
+        failures: int = 0,
+    ) -> None:
+        key = (bookmaker.id, target)
+        if key in self._running:
+            return
+        if start_time is None:
+            interval = self.max_interval
+        else:
+            to_start = (start_time - self.clock()).total_seconds()
+            if to_start < -self.after_start:
+                self._cancel(key)
+                return
+            interval = refresh_interval(to_start, self.min_interval, self.max_interval, self.fraction)
+        self._push(Job(
+            self._now() + interval, next(self._sequence), EVENT, bookmaker, target,
+            sport=sport, start_time=start_time, failures=failures,
+        ))
+
+    async def _next_due(self) -> Job:
+        """
+        Wait until some bookmaker's earliest job is due and within its budget, and take it.
+
+        Only the head of each bookmaker's heap is considered, so a listing waiting for
+        pages to free up is not overtaken by that bookmaker's event refreshes.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            self._wakeup.clear()
+            now = loop.time()
+            best: Optional[Job] = None
+            wait = math.inf
+            for bookmaker_id, heap in self._heaps.items():
+                while heap and heap[0].cancelled:
+                    heapq.heappop(heap)
+                if not heap:
+                    continue
+                ready_in = max(heap[0].due - now, self.budgets[bookmaker_id].delay(heap[0]))
+                if ready_in <= 0:
+                    if best is None or heap[0] < best:
+                        best = heap[0]
+                else:
+                    wait = min(wait, ready_in)
+
+            if best is not None:
+                job = heapq.heappop(self._heaps[best.bookmaker.id])
+                del self._jobs[job.key]
+                self.budgets[job.bookmaker.id].start(job)
+                return job
+            # Woken early when an earlier job is pushed or pages are given back
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), None if math.isinf(wait) else wait)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _run_job(self, job: Job) -> None:
+        scraper = self.scrapers[job.bookmaker.id]
+        events: List[Event] = []
+        try:
+            if job.kind == LISTING:
+                events = await scraper.scrape_sport_http(job.sport)
+                if events is None:
+                    events = await scraper.scrape_sport(job.sport)
+            else:
+                event = await scraper.scrape_event(job.target)
+                events = [event] if event else []
+            if events:
+                await self._emit(ScrapingResult(bookmaker=job.bookmaker, events=events, timestamp=self.clock()))
+        except Exception as e:
+            logger.error(f"Error scraping {job.target} from {job.bookmaker.name}: {str(e)}")
+        finally:
+            self._running.discard(job.key)
+            self.completed += 1
+            self.budgets[job.bookmaker.id].finish(job)
+            self._reschedule(job, events or [])
+            self._slots.release()
+            self._wakeup.set()
+
+    def _reschedule(self, job: Job, events: List[Event]) -> None:
+        if job.kind == LISTING:
+            for event in events:
+                self.track(event)
+            self.schedule_listing(job.bookmaker, job.sport, self.discovery_interval)
+        elif events:
+            self.track(events[0])
+        elif job.failures + 1 < MAX_FAILURES:
+            self._schedule_event(job.bookmaker, job.target, job.sport, job.start_time, job.failures + 1)
+        else:
+            logger.info(f"Stopped refreshing {job.target} after {MAX_FAILURES} failed scrapes")
+
+    async def _emit(self, result: ScrapingResult) -> None:
+        outcome = self.on_result(result)
+        if inspect.isawaitable(outcome):
+            await outcome
+
+    def _push(self, job: Job) -> None:
+        self._cancel(job.key)
+        self._jobs[job.key] = job
+        heap = self._heaps[job.bookmaker.id]
+        heapq.heappush(heap, job)
+        if self._wakeup is not None and heap[0] is job:
+            self._wakeup.set()
+
+    def _cancel(self, key: JobKey) -> None:
+        waiting = self._jobs.pop(key, None)
+        if waiting is not None:
+            waiting.cancelled = True
+
+    def _now(self) -> float:
+        return asyncio.get_running_loop().time()
@@ -1,13 +1,23 @@
 from abc import ABC, abstractmethod
+import asyncio
+from contextlib import aclosing
 from datetime import datetime
 import logging
-from typing import Dict, List, Optional, Union
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Union
 
-import aiohttp
 from bs4 import BeautifulSoup
-from playwright.async_api import async_playwright
 
+from surebetbot.config import settings
+from surebetbot.config.bookmakers import API_ENDPOINTS, ODDS_API_PATTERNS
+from surebetbot.core.matching import normalize_team
 from surebetbot.core.models import Bookmaker, Event, ScrapingResult, SportType
+from surebetbot.core.rate_limit import TokenBucket
+from surebetbot.scrapers.browser_pool import BrowserLease, get_browser_pool
+from surebetbot.scrapers.event_index import EventIndex, get_event_index
+from surebetbot.scrapers.http_client import HttpClient, get_http_client
+from surebetbot.scrapers.network_capture import JsonResponseCapture, parse_events
+from surebetbot.scrapers.page_pool import PagePool
+from surebetbot.scrapers.resource_filter import ResourceFilter, get_resource_filter
 
 
 class BaseScraper(ABC):
@@ -25,41 +35,176 @@ class BaseScraper(ABC):
         """
         self.bookmaker = bookmaker
         self.logger = logging.getLogger(f"scraper.{bookmaker.name.lower()}")
-        self.session = None
+        self.http: Optional[HttpClient] = None
         self.browser = None
         self.context = None
         self.page = None
+        self._lease: Optional[BrowserLease] = None
+        self.max_concurrent_pages = settings.MAX_CONCURRENT_PAGES
+        # The bookmaker's request and byte budgets, shared by every scrape of it; set by the scheduler
+        self.request_bucket: Optional[TokenBucket] = None
+        self.byte_bucket: Optional[TokenBucket] = None
+        self.requests_made = 0
+        self.bytes_received = 0
+        self.event_index: Optional[EventIndex] = (
+            get_event_index(bookmaker.id) if settings.INCREMENTAL_SCRAPE else None
+        )
     
     async def initialize(self) -> None:
         """
         Initialize resources needed for scraping.
         """
-        self.session = aiohttp.ClientSession()
+        self.http = get_http_client()
         
-        # Set up playwright if needed
+        # Borrow a warm browser context from the shared pool if needed
         if self.uses_browser():
-            playwright = await async_playwright().start()
-            self.browser = await playwright.chromium.launch(headless=True)
-            self.context = await self.browser.new_context(
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/94.0.4606.81 Safari/537.36"
-            )
+            self.context = await self.acquire_browser_context()
             self.page = await self.context.new_page()
     
     async def cleanup(self) -> None:
         """
         Clean up resources after scraping.
+        The browser and HTTP connections stay warm in the shared pools for the next cycle.
         """
-        if self.session and not self.session.closed:
-            await self.session.close()
-        
         if self.page:
-            await self.page.close()
+            try:
+                await self.page.close()
+            except Exception as e:
+                self.logger.warning(f"Error closing page: {str(e)}")
+            self.page = None
+        
+        await self.release_browser_context()
+        self.context = None
+        
+        resource_filter = self.get_resource_filter()
+        if resource_filter:
+            resource_filter.log_stats()
+    
+    def get_browser_type(self) -> str:
+        """
+        The Playwright browser type this scraper needs.
+        Override in subclasses if needed.
+        
+        Returns:
+            A browser type name ("firefox", "chromium" or "webkit")
+        """
+        return "chromium"
+    
+    def get_context_options(self) -> Dict:
+        """
+        Options passed to browser.new_context() for this scraper.
+        Contexts with equal options are shared between scrapers through the pool.
+        
+        Returns:
+            A dictionary of context options
+        """
+        return {
+            "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/94.0.4606.81 Safari/537.36"
+        }
+    
+    def get_resource_filter(self) -> Optional[ResourceFilter]:
+        """
+        The request filter installed on this scraper's browser contexts.
+        Allow/deny lists are configured per bookmaker in config/bookmakers.py.
+        
+        Returns:
+            The bookmaker's ResourceFilter, or None to load every resource
+        """
+        return get_resource_filter(self.bookmaker.id)
+    
+    def create_response_capture(self) -> Optional[JsonResponseCapture]:
+        """
+        Create a recorder for the JSON odds API responses of a page.
+        Endpoints are configured per bookmaker in config/bookmakers.py.
+        
+        Returns:
+            A JsonResponseCapture, or None if capture is disabled or no endpoints are known
+        """
+        patterns = ODDS_API_PATTERNS.get(self.bookmaker.id)
+        if not settings.NETWORK_CAPTURE or not patterns:
+            return None
+        return JsonResponseCapture(patterns, on_response=self._count_bytes)
+    
+    async def acquire_browser_context(self):
+        """
+        Lease a browser context from the shared browser pool.
+        
+        Returns:
+            The leased Playwright browser context
+        """
+        if self._lease is None or self._lease.released:
+            self._lease = await get_browser_pool().acquire(
+                browser_type=self.get_browser_type(),
+                context_options=self.get_context_options(),
+                context_setup=self.get_resource_filter()
+            )
+            self.browser = self._lease.browser
+        return self._lease.context
+    
+    async def release_browser_context(self, crashed: bool = False) -> None:
+        """
+        Return the leased browser context to the shared pool.
+        
+        Args:
+            crashed: Set when the browser misbehaved so the pool recycles it
+        """
+        if self._lease is not None:
+            await get_browser_pool().release(self._lease, crashed=crashed)
+            self._lease = None
+        self.browser = None
+    
+    async def scrape_concurrently(
+        self,
+        items: Iterable,
+        handler: Callable[..., Awaitable[Optional[Event]]],
+        context=None
+    ) -> AsyncIterator[Tuple[object, Optional[Event]]]:
+        """
+        Scrape many pages at once over a bounded pool of pages.
         
-        if self.context:
-            await self.context.close()
+        Wrap the iteration in contextlib.aclosing() when it may be left early,
+        so pending pages are cancelled straight away.
+        
+        Args:
+            items: Work items (usually event URLs) passed to the handler
+            handler: Coroutine function handler(page, item) returning an Event or None
+            context: Browser context to open pages in, defaults to the leased context
+            
+        Yields:
+            (item, event) tuples as soon as each page finishes
+        """
+        page_pool = PagePool(context or self.context, self.max_concurrent_pages)
+        try:
+            async with aclosing(page_pool.map(items, handler)) as results:
+                async for item, event in results:
+                    yield item, event
+        finally:
+            await page_pool.close()
+    
+    def select_changed_events(self, listings: List[Dict[str, str]]) -> Tuple[List[Dict[str, str]], List[Event]]:
+        """
+        Pick the listed events whose pages have to be parsed this cycle.
+        
+        Args:
+            listings: Listing entries with a "url" and an optional "odds_hash" of the listed odds
+            
+        Returns:
+            (listings to parse, cached events of the unchanged rest)
+        """
+        if self.event_index is None:
+            return list(listings), []
+        return self.event_index.select(listings)
+    
+    def record_event(self, listing: Dict[str, str], event: Event) -> None:
+        """
+        Remember a parsed event so the next cycle can skip it while it is unchanged.
         
-        if self.browser:
-            await self.browser.close()
+        Args:
+            listing: The listing entry the event was parsed for
+            event: The parsed event
+        """
+        if self.event_index is not None:
+            self.event_index.record(listing["url"], event, listing.get("odds_hash"))
     
     def uses_browser(self) -> bool:
         """
@@ -110,9 +255,27 @@ class BaseScraper(ABC):
         """
         pass
     
+    async def goto(self, page, url: str, **kwargs):
+        """
+        Navigate a page once the bookmaker's budget allows another request.
+        
+        Args:
+            page: The Playwright page
+            url: The URL to open
+            **kwargs: Passed on to page.goto()
+            
+        Returns:
+            The main resource response of the navigation
+        """
+        await self._wait_for_bytes()
+        if self.request_bucket is not None:
+            await self.request_bucket.acquire()
+        self.requests_made += 1
+        return await page.goto(url, **kwargs)
+    
     async def make_request(self, url: str, headers: Optional[Dict[str, str]] = None) -> Optional[str]:
         """
-        Make an HTTP request to the specified URL.
+        Make an HTTP request to the specified URL over the shared connection pool.
         
         Args:
             url: The URL to request
@@ -121,20 +284,101 @@ class BaseScraper(ABC):
         Returns:
             The response text if successful, None otherwise
         """
-        if not headers:
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/94.0.4606.81 Safari/537.36"
-            }
+        await self._wait_for_bytes()
+        return await (self.http or get_http_client()).get_text(
+            url, headers=headers, on_response=self._count_response, bucket=self.request_bucket
+        )
+    
+    async def fetch_json(self, url: str, headers: Optional[Dict[str, str]] = None) -> Optional[object]:
+        """
+        Fetch and decode a JSON endpoint over the shared connection pool.
         
-        try:
-            async with self.session.get(url, headers=headers) as response:
-                if response.status == 200:
-                    return await response.text()
-                self.logger.warning(f"Request to {url} failed with status {response.status}")
-                return None
-        except Exception as e:
-            self.logger.error(f"Error making request to {url}: {str(e)}")
+        Args:
+            url: The URL to request
+            headers: Optional headers to include in the request
+            
+        Returns:
+            The decoded JSON if successful, None otherwise
+        """
+        await self._wait_for_bytes()
+        return await (self.http or get_http_client()).get_json(
+            url, headers=headers, on_response=self._count_response, bucket=self.request_bucket
+        )
+    
+    async def _wait_for_bytes(self) -> None:
+        """Hold the next request back while the byte budget is in debt."""
+        if self.byte_bucket is not None:
+            await self.byte_bucket.acquire(0.0)
+    
+    def _count_response(self, size: int) -> None:
+        self.requests_made += 1
+        self._count_bytes(size)
+    
+    def _count_bytes(self, size: int) -> None:
+        self.bytes_received += size
+        if self.byte_bucket is not None:
+            self.byte_bucket.consume(size)
+    
+    def get_api_urls(self, sport_type: SportType) -> List[str]:
+        """
+        JSON endpoints listing the events and odds of a sport that can be fetched without a browser.
+        Endpoints are configured per bookmaker in config/bookmakers.py.
+        
+        Args:
+            sport_type: The sport type
+            
+        Returns:
+            The endpoint URLs, empty if the sport needs a browser
+        """
+        return API_ENDPOINTS.get(self.bookmaker.id, {}).get(sport_type, [])
+    
+    def parse_api_response(self, sport_type: SportType, url: str, payload: object) -> List[Event]:
+        """
+        Parse events from the JSON of one API endpoint.
+        Override in subclasses for bookmakers with an unusual document shape.
+        
+        Args:
+            sport_type: The sport the endpoint lists
+            url: The endpoint URL
+            payload: The decoded JSON
+            
+        Returns:
+            The parsed events
+        """
+        return parse_events(payload, self.bookmaker, sport_type, url)
+    
+    async def scrape_sport_http(self, sport_type: SportType) -> Optional[List[Event]]:
+        """
+        Scrape a sport over plain HTTP, without a browser.
+        
+        Args:
+            sport_type: The sport type to scrape
+            
+        Returns:
+            The events found, or None if the sport has no endpoints or none of them
+            returned usable data, in which case the browser path should be used
+        """
+        urls = self.get_api_urls(sport_type)
+        if not urls:
+            return None
+        
+        payloads = await asyncio.gather(*(self.fetch_json(url) for url in urls))
+        
+        events = []
+        for url, payload in zip(urls, payloads):
+            if payload is None:
+                continue
+            try:
+                events.extend(self.parse_api_response(sport_type, url, payload))
+            except Exception as e:
+                self.logger.warning(f"Error parsing API response from {url}: {str(e)}")
+        
+        if not events:
+            self.logger.info(f"No events from the HTTP endpoints for {sport_type.name}, the browser is needed")
             return None
+        
+        self.logger.info(f"Scraped {len(events)} {sport_type.name.lower()} events over HTTP")
+        return events
     
     def parse_html(self, html: str) -> BeautifulSoup:
         """
@@ -181,7 +425,7 @@ class BaseScraper(ABC):
         Returns:
             Normalized team name
         """
-        return name.strip().lower().replace(" fc", "").replace("fc ", "")
+        return normalize_team(name)
     
     def extract_odds(self, text: str) -> Optional[float]:
         """
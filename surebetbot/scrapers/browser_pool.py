@@ -0,0 +1,317 @@
+"""
+Shared Playwright browser pool.
+
+Launching a browser is the largest fixed cost of a scrape cycle, so instead of
+every scraper starting (and tearing down) its own browser, the process keeps a
+few warm browsers alive and hands out browser contexts from them. Browsers and
+contexts are recycled after a number of pages, or as soon as one crashes.
+"""
+
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from playwright.async_api import Browser, BrowserContext, Playwright, async_playwright
+
+from surebetbot.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _PooledContext:
+    context: BrowserContext
+    browser: Browser  # The browser the context was created on
+    pages_opened: int = 0
+
+
+@dataclass
+class _BrowserSlot:
+    browser_type: str
+    browser: Optional[Browser] = None
+    pages_opened: int = 0
+    active_leases: int = 0
+    crashed: bool = False
+    idle_contexts: Dict[str, List[_PooledContext]] = field(default_factory=dict)
+
+    @property
+    def is_alive(self) -> bool:
+        return self.browser is not None and not self.crashed and self.browser.is_connected()
+
+
+class BrowserLease:
+    """A browser context borrowed from the pool. Return it with BrowserPool.release()."""
+
+    def __init__(self, slot: _BrowserSlot, pooled: _PooledContext, options_key: str):
+        self._slot = slot
+        self._pooled = pooled
+        self._options_key = options_key
+        self.released = False
+
+    @property
+    def browser(self) -> Browser:
+        return self._pooled.browser
+
+    @property
+    def context(self) -> BrowserContext:
+        return self._pooled.context
+
+
+class BrowserPool:
+    """
+    Process-wide pool of warm Playwright browsers.
+
+    Each browser type gets up to `size` browsers. A lease hands out a context
+    from the least busy browser; released contexts are kept warm (cookies,
+    consent banners and caches survive) and reused by the next lease with the
+    same context options.
+    """
+
+    def __init__(
+        self,
+        size: int = settings.BROWSER_POOL_SIZE,
+        max_pages_per_browser: int = settings.BROWSER_MAX_PAGES,
+        max_pages_per_context: int = settings.CONTEXT_MAX_PAGES,
+        headless: bool = settings.BROWSER_HEADLESS,
+    ):
+        """
+        Initialize the pool. Browsers are launched lazily on first use.
+
+        Args:
+            size: Maximum number of browsers kept per browser type
+            max_pages_per_browser: Pages a browser may open before it is recycled
+            max_pages_per_context: Pages a context may open before it is recycled
+            headless: Whether browsers are launched headless
+        """
+        self.size = max(1, size)
+        self.max_pages_per_browser = max_pages_per_browser
+        self.max_pages_per_context = max_pages_per_context
+        self.headless = headless
+
+        self._playwright: Optional[Playwright] = None
+        self._slots: Dict[str, List[_BrowserSlot]] = {}
+        self._lock = asyncio.Lock()
+
+    async def acquire(
+        self,
+        browser_type: Optional[str] = None,
+        context_options: Optional[Dict[str, Any]] = None,
+        context_setup: Optional[Any] = None,
+    ) -> BrowserLease:
+        """
+        Lease a browser context.
+
+        Args:
+            browser_type: Playwright browser type ("firefox", "chromium", "webkit")
+            context_options: Keyword arguments for browser.new_context()
+            context_setup: Optional object with a `key` and an async `install(context)`
+                           (e.g. a ResourceFilter), run once on every new context
+
+        Returns:
+            A BrowserLease holding a ready-to-use context
+        """
+        browser_type = browser_type or settings.BROWSER_TYPE
+        context_options = context_options or {}
+        options_key = json.dumps(context_options, sort_keys=True, default=str)
+        if context_setup is not None:
+            options_key = f"{options_key}|{context_setup.key}"
+
+        async with self._lock:
+            slot = self._pick_slot(browser_type)
+
+            if not slot.is_alive or (self._is_exhausted(slot) and slot.active_leases == 0):
+                await self._restart(slot)
+
+            pooled = await self._take_context(slot, options_key, context_options, context_setup)
+            slot.active_leases += 1
+
+        return BrowserLease(slot, pooled, options_key)
+
+    async def release(self, lease: BrowserLease, crashed: bool = False) -> None:
+        """
+        Return a leased context to the pool.
+
+        Args:
+            lease: The lease to return
+            crashed: Set when the browser or context misbehaved; it will be recycled
+        """
+        if lease.released:
+            return
+        lease.released = True
+
+        slot = lease._slot
+        pooled = lease._pooled
+
+        async with self._lock:
+            slot.active_leases -= 1
+            # The slot may have been restarted on a new browser while the lease was out
+            current = pooled.browser is slot.browser
+            if crashed and current:
+                slot.crashed = True
+
+            keep = current and slot.is_alive and pooled.pages_opened < self.max_pages_per_context
+            if keep:
+                # Pages belong to the previous user; the context itself stays warm
+                try:
+                    for page in list(pooled.context.pages):
+                        await page.close()
+                except Exception as e:
+                    logger.warning(f"Error closing pages of a pooled context: {str(e)}")
+                    keep = False
+
+            if keep:
+                slot.idle_contexts.setdefault(lease._options_key, []).append(pooled)
+            else:
+                await self._close_context(pooled)
+
+            if slot.active_leases == 0 and (not slot.is_alive or self._is_exhausted(slot)):
+                await self._shutdown(slot)
+
+    @asynccontextmanager
+    async def lease(
+        self,
+        browser_type: Optional[str] = None,
+        context_options: Optional[Dict[str, Any]] = None,
+        context_setup: Optional[Any] = None,
+    ) -> AsyncIterator[BrowserLease]:
+        """Lease a context for the duration of an `async with` block."""
+        lease = await self.acquire(browser_type, context_options, context_setup)
+        crashed = False
+        try:
+            yield lease
+        except Exception:
+            crashed = not lease.browser or not lease.browser.is_connected()
+            raise
+        finally:
+            await self.release(lease, crashed=crashed)
+
+    async def warm_up(self, browser_type: Optional[str] = None) -> None:
+        """Launch all browsers of a type up front so the first cycle does not pay the cold start."""
+        browser_type = browser_type or settings.BROWSER_TYPE
+        async with self._lock:
+            slots = self._slots.setdefault(browser_type, [])
+            while len(slots) < self.size:
+                slots.append(_BrowserSlot(browser_type=browser_type))
+            for slot in slots:
+                if not slot.is_alive:
+                    await self._restart(slot)
+
+    async def close(self) -> None:
+        """Close every browser and stop Playwright."""
+        async with self._lock:
+            for slots in self._slots.values():
+                for slot in slots:
+                    await self._shutdown(slot)
+            self._slots.clear()
+
+            if self._playwright:
+                await self._playwright.stop()
+                self._playwright = None
+
+    def _pick_slot(self, browser_type: str) -> _BrowserSlot:
+        """Pick the least busy browser, growing the pool while it is below its size."""
+        slots = self._slots.setdefault(browser_type, [])
+
+        for slot in slots:
+            if slot.active_leases == 0 and slot.is_alive:
+                return slot
+
+        if len(slots) < self.size:
+            slot = _BrowserSlot(browser_type=browser_type)
+            slots.append(slot)
+            return slot
+
+        return min(slots, key=lambda s: (s.active_leases, s.pages_opened))
+
+    def _is_exhausted(self, slot: _BrowserSlot) -> bool:
+        return slot.pages_opened >= self.max_pages_per_browser
+
+    async def _restart(self, slot: _BrowserSlot) -> None:
+        """(Re)launch the browser of a slot."""
+        await self._shutdown(slot)
+
+        if not self._playwright:
+            self._playwright = await async_playwright().start()
+
+        logger.info(f"Launching pooled {slot.browser_type} browser")
+        launcher = getattr(self._playwright, slot.browser_type)
+        browser = await launcher.launch(headless=self.headless)
+
+        def on_disconnected(_browser: Browser) -> None:
+            slot.crashed = True
+
+        browser.on("disconnected", on_disconnected)
+
+        slot.browser = browser
+        slot.crashed = False
+        slot.pages_opened = 0
+
+    async def _shutdown(self, slot: _BrowserSlot) -> None:
+        """Close the browser of a slot and drop its idle contexts."""
+        for contexts in slot.idle_contexts.values():
+            for pooled in contexts:
+                await self._close_context(pooled)
+        slot.idle_contexts.clear()
+
+        if slot.browser:
+            try:
+                if slot.browser.is_connected():
+                    await slot.browser.close()
+            except Exception as e:
+                logger.warning(f"Error closing pooled browser: {str(e)}")
+            slot.browser = None
+
+    async def _take_context(
+        self,
+        slot: _BrowserSlot,
+        options_key: str,
+        context_options: Dict[str, Any],
+        context_setup: Optional[Any],
+    ) -> _PooledContext:
+        """Reuse a warm context with matching options or create a new one."""
+        idle = slot.idle_contexts.get(options_key, [])
+        while idle:
+            pooled = idle.pop()
+            if pooled.pages_opened < self.max_pages_per_context:
+                return pooled
+            await self._close_context(pooled)
+
+        context = await slot.browser.new_context(**context_options)
+        pooled = _PooledContext(context=context, browser=slot.browser)
+
+        def on_page(_page) -> None:
+            pooled.pages_opened += 1
+            slot.pages_opened += 1
+
+        context.on("page", on_page)
+        if context_setup is not None:
+            await context_setup.install(context)
+        return pooled
+
+    async def _close_context(self, pooled: _PooledContext) -> None:
+        try:
+            await pooled.context.close()
+        except Exception as e:
+            logger.warning(f"Error closing pooled context: {str(e)}")
+
+
+_pool: Optional[BrowserPool] = None
+
+
+def get_browser_pool() -> BrowserPool:
+    """Get the process-wide browser pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        _pool = BrowserPool()
+    return _pool
+
+
+async def close_browser_pool() -> None:
+    """Close the process-wide browser pool, if one was created."""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
@@ -0,0 +1,183 @@
+"""
+Index of the events seen in previous scrape cycles.
+
+Most prices on a pre-match card barely move between cycles. The index keeps,
+per event URL, a hash of the odds shown on the listing page, the start time and
+the last parsed Event, so a cycle only re-parses event pages whose listing odds
+changed, that start soon or that have not been parsed for longer than a TTL.
+"""
+
+import hashlib
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from surebetbot.config import settings
+from surebetbot.core.models import Event
+
+logger = logging.getLogger(__name__)
+
+
+def hash_listing_odds(prices: Iterable[str]) -> Optional[str]:
+    """
+    Hash the odds an event shows on a listing page.
+
+    Args:
+        prices: Price texts in page order
+
+    Returns:
+        A short hex digest, None when there were no prices to hash
+    """
+    cleaned = [price.strip() for price in prices if price and price.strip()]
+    if not cleaned:
+        return None
+    return hashlib.blake2b("|".join(cleaned).encode(), digest_size=8).hexdigest()
+
+
+@dataclass
+class IndexEntry:
+    """What the previous cycles know about one event page."""
+    url: str
+    odds_hash: Optional[str]  # Hash of the listing-page odds when the page was last parsed
+    start_time: Optional[datetime]  # None when the bookmaker showed no start time
+    last_seen: datetime  # Last time the event was on a listing page
+    last_parsed: datetime  # Last time the event page was parsed
+    event: Optional[Event] = None  # Last parsed event
+
+
+class EventIndex:
+    """
+    Decides which listed events need their page parsed again.
+    """
+
+    def __init__(
+        self,
+        stale_after: timedelta = timedelta(seconds=settings.EVENT_STALE_TTL),
+        near_start: timedelta = timedelta(seconds=settings.EVENT_NEAR_START),
+        retention: timedelta = timedelta(hours=24),
+    ):
+        """
+        Initialize the index.
+
+        Args:
+            stale_after: Re-parse an event that has not been parsed for this long
+            near_start: Always re-parse events starting within this window
+            retention: Forget events that have not been listed for this long
+        """
+        self.stale_after = stale_after
+        self.near_start = near_start
+        self.retention = retention
+        self._entries: Dict[str, IndexEntry] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, url: str) -> Optional[IndexEntry]:
+        """Get the entry of an event URL."""
+        return self._entries.get(url)
+
+    def needs_refresh(self, url: str, odds_hash: Optional[str] = None, now: Optional[datetime] = None) -> bool:
+        """
+        Whether an event page has to be parsed again.
+
+        Args:
+            url: The event URL
+            odds_hash: Hash of the odds the listing page shows now, None if unknown
+            now: The current time
+
+        Returns:
+            True for new, changed, near-start and stale events
+        """
+        now = now or datetime.now()
+        entry = self._entries.get(url)
+        if entry is None or entry.event is None:
+            return True
+        if odds_hash is not None and odds_hash != entry.odds_hash:
+            return True
+        if entry.start_time is not None and entry.start_time - now <= self.near_start:
+            return True
+        return now - entry.last_parsed >= self.stale_after
+
+    def record(self, url: str, event: Event, odds_hash: Optional[str] = None, now: Optional[datetime] = None) -> None:
+        """
+        Record a freshly parsed event.
+
+        Args:
+            url: The event URL
+            event: The parsed event
+            odds_hash: Hash of the listing-page odds the event was parsed for
+            now: The current time
+        """
+        now = now or datetime.now()
+        self._entries[url] = IndexEntry(
+            url=url,
+            odds_hash=odds_hash,
+            start_time=event.start_time if event.start_time_known else None,
+            last_seen=now,
+            last_parsed=now,
+            event=event
+        )
+
+    def mark_seen(self, url: str, now: Optional[datetime] = None) -> None:
+        """Record that an unchanged event is still listed."""
+        entry = self._entries.get(url)
+        if entry:
+            entry.last_seen = now or datetime.now()
+
+    def select(
+        self,
+        listings: List[Dict[str, str]],
+        now: Optional[datetime] = None
+    ) -> Tuple[List[Dict[str, str]], List[Event]]:
+        """
+        Split listing entries into the ones to parse and the cached events of the rest.
+
+        Args:
+            listings: Listing entries with a "url" and an optional "odds_hash"
+            now: The current time
+
+        Returns:
+            (listings to parse, cached events that are still fresh)
+        """
+        now = now or datetime.now()
+        self.prune(now)
+
+        to_parse = []
+        unchanged = []
+        for listing in listings:
+            url = listing["url"]
+            if self.needs_refresh(url, listing.get("odds_hash"), now):
+                to_parse.append(listing)
+            else:
+                self.mark_seen(url, now)
+                unchanged.append(self._entries[url].event)
+
+        logger.info(f"Event index: {len(to_parse)} events to parse, {len(unchanged)} unchanged")
+        return to_parse, unchanged
+
+    def prune(self, now: Optional[datetime] = None) -> None:
+        """Forget events that have not been listed within the retention window."""
+        now = now or datetime.now()
+        expired = [url for url, entry in self._entries.items() if now - entry.last_seen > self.retention]
+        for url in expired:
+            del self._entries[url]
+
+
+_indexes: Dict[str, EventIndex] = {}
+
+
+def get_event_index(bookmaker_id: str) -> EventIndex:
+    """
+    Get the process-wide event index of a bookmaker.
+    Indexes outlive scraper instances so every cycle can use the previous one.
+
+    Args:
+        bookmaker_id: The bookmaker's id
+
+    Returns:
+        The bookmaker's EventIndex
+    """
+    if bookmaker_id not in _indexes:
+        _indexes[bookmaker_id] = EventIndex()
+    return _indexes[bookmaker_id]
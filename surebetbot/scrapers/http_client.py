@@ -0,0 +1,204 @@
+"""
+Pooled HTTP client for the browserless scraping path.
+
+A warm keep-alive connection costs a small fraction of a browser tab, so
+endpoints that do not need JavaScript are fetched with one shared aiohttp
+session: per-host connection limits, DNS caching, compressed transfers and
+retries with exponential backoff.
+"""
+
+import asyncio
+import logging
+import random
+from typing import Any, Callable, Dict, Optional
+
+import aiohttp
+
+from surebetbot.config import settings
+from surebetbot.core.rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# aiohttp only decodes brotli when a brotli package is installed
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/94.0.4606.81 Safari/537.36",
+    "Accept-Encoding": ACCEPT_ENCODING,
+    "Accept": "application/json, text/html;q=0.9, */*;q=0.8",
+}
+
+# Statuses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class HttpClient:
+    """
+    Shared aiohttp session with connection pooling and retries.
+    """
+
+    def __init__(
+        self,
+        limit: int = settings.HTTP_CONNECTION_LIMIT,
+        limit_per_host: int = settings.HTTP_LIMIT_PER_HOST,
+        dns_cache_ttl: int = settings.HTTP_DNS_CACHE_TTL,
+        timeout: float = settings.HTTP_TIMEOUT,
+        max_retries: int = settings.HTTP_MAX_RETRIES,
+        backoff: float = settings.HTTP_BACKOFF,
+        max_retry_after: float = settings.HTTP_MAX_RETRY_AFTER,
+    ):
+        """
+        Initialize the client. The session is created lazily inside the running event loop.
+
+        Args:
+            limit: Maximum number of open connections
+            limit_per_host: Maximum number of open connections per host
+            dns_cache_ttl: Seconds resolved host names are cached
+            timeout: Total timeout of one attempt in seconds
+            max_retries: Retries after the first attempt
+            backoff: Base delay in seconds, doubled on every retry
+            max_retry_after: Longest Retry-After in seconds that is waited for
+        """
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_retry_after = max_retry_after
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """The pooled session, created on first use."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.dns_cache_ttl,
+                keepalive_timeout=30,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=DEFAULT_HEADERS,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def get_text(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        on_response: Optional[Callable[[int], None]] = None,
+        bucket: Optional[TokenBucket] = None,
+    ) -> Optional[str]:
+        """
+        GET a URL and return the body as text.
+
+        Args:
+            on_response: Called with the body size in bytes of every response received
+            bucket: The site's request budget, a token is taken before every attempt
+
+        Returns:
+            The response text, None if every attempt failed
+        """
+        return await self._get(url, headers, params, as_json=False, on_response=on_response, bucket=bucket)
+
+    async def get_json(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        on_response: Optional[Callable[[int], None]] = None,
+        bucket: Optional[TokenBucket] = None,
+    ) -> Optional[Any]:
+        """
+        GET a URL and decode the body as JSON.
+
+        Args:
+            on_response: Called with the body size in bytes of every response received
+            bucket: The site's request budget, a token is taken before every attempt
+
+        Returns:
+            The decoded JSON, None if every attempt failed
+        """
+        return await self._get(url, headers, params, as_json=True, on_response=on_response, bucket=bucket)
+
+    def _retry_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Exponential backoff with jitter, or the server's Retry-After when it sent one, capped."""
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.max_retry_after)
+        return self.backoff * (2 ** attempt) * (0.5 + random.random())
+
+    async def _get(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]],
+        params: Optional[Dict[str, Any]],
+        as_json: bool,
+        on_response: Optional[Callable[[int], None]] = None,
+        bucket: Optional[TokenBucket] = None,
+    ) -> Optional[Any]:
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            if bucket is not None:
+                await bucket.acquire()
+            try:
+                async with self.session.get(url, headers=headers, params=params) as response:
+                    if on_response is not None:
+                        # The body is cached, so decoding it below does not read it again
+                        on_response(len(await response.read()))
+                    if response.status == 200:
+                        try:
+                            if as_json:
+                                return await response.json(content_type=None)
+                            return await response.text()
+                        except ValueError as e:
+                            # The same body would fail to decode again
+                            logger.warning(f"Could not decode the response from {url}: {str(e)}")
+                            return None
+
+                    if response.status not in RETRY_STATUSES:
+                        logger.warning(f"Request to {url} failed with status {response.status}")
+                        return None
+
+                    retry_after = response.headers.get("Retry-After")
+                    logger.warning(f"Request to {url} returned {response.status} (attempt {attempt + 1})")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(f"Error requesting {url} (attempt {attempt + 1}): {str(e)}")
+
+            if attempt < self.max_retries:
+                await asyncio.sleep(self._retry_delay(attempt, retry_after))
+
+        logger.error(f"Giving up on {url} after {self.max_retries + 1} attempts")
+        return None
+
+    async def close(self) -> None:
+        """Close the pooled session."""
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+_client: Optional[HttpClient] = None
+
+
+def get_http_client() -> HttpClient:
+    """Get the process-wide HTTP client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = HttpClient()
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the process-wide HTTP client, if one was created."""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
@@ -0,0 +1,320 @@
+"""
+Network capture of a bookmaker's internal JSON odds API.
+
+Bookmaker frontends render their odds from XHR/JSON responses. Recording those
+responses while a page loads and parsing markets straight from them is much
+cheaper and more reliable than walking the DOM with lists of guessed selectors.
+"""
+
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from playwright.async_api import Page, Response
+
+from surebetbot.core.models import Bookmaker, Event, Market, MarketType, Outcome, SportType
+from surebetbot.core.utils import determine_market_line, determine_market_type
+
+logger = logging.getLogger(__name__)
+
+# Keys under which bookmaker APIs list the selections of a market
+SELECTION_LIST_KEYS = ("selections", "outcomes", "runners", "participants")
+# Keys holding a selection's decimal win price, directly or inside a price object
+WIN_PRICE_KEYS = ("winPrice", "decimalPrice", "decimalOdds", "price", "odds", "win")
+PLACE_PRICE_KEYS = ("placePrice", "place")
+# Keys under which bookmaker APIs list the markets of an event
+MARKET_LIST_KEYS = ("markets", "marketList", "primaryMarket")
+# Separators between the home and away team in an event name
+TEAM_SEPARATORS = (" v ", " vs ", " vs. ", " - ")
+# Selection status codes that mean the selection can not be backed
+INACTIVE_STATUSES = {"S", "SUSPENDED", "SCRATCHED", "LATE_SCRATCHED", "CLOSED", "R", "REMOVED"}
+
+
+class JsonResponseCapture:
+    """
+    Records the JSON responses of a page whose URL matches one of the patterns.
+    """
+
+    def __init__(self, url_patterns: List[str], on_response: Optional[Callable[[int], None]] = None):
+        """
+        Initialize the capture.
+
+        Args:
+            url_patterns: URL substrings of the odds API endpoints
+            on_response: Called with the body size in bytes of every recorded response
+        """
+        self.url_patterns = url_patterns
+        self.on_response = on_response
+        self.payloads: List[Tuple[str, Any]] = []
+        self._pending: Set[asyncio.Task] = set()
+        self._page: Optional[Page] = None
+
+    def attach(self, page: Page) -> None:
+        """Start recording the responses of a page."""
+        self.payloads = []
+        self._page = page
+        page.on("response", self._on_response)
+
+    def detach(self) -> None:
+        """Stop recording."""
+        if self._page:
+            self._page.remove_listener("response", self._on_response)
+            self._page = None
+
+    async def wait_idle(self, timeout: float = 2.0) -> None:
+        """Wait until the bodies of all matched responses have been read."""
+        if self._pending:
+            await asyncio.wait(list(self._pending), timeout=timeout)
+
+    def matches(self, url: str, content_type: str) -> bool:
+        """Whether a response should be recorded."""
+        return "json" in content_type and any(pattern in url for pattern in self.url_patterns)
+
+    def _on_response(self, response: Response) -> None:
+        if not self.matches(response.url, response.headers.get("content-type", "")):
+            return
+        task = asyncio.ensure_future(self._read(response))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _read(self, response: Response) -> None:
+        try:
+            body = await response.body()
+            if self.on_response is not None:
+                self.on_response(len(body))
+            self.payloads.append((response.url, json.loads(body)))
+        except Exception as e:
+            logger.debug(f"Could not read JSON from {response.url}: {str(e)}")
+
+
+def _walk(node: Any) -> Iterator[Dict[str, Any]]:
+    """Yield every dictionary in a JSON document."""
+    if isinstance(node, dict):
+        yield node
+        for value in node.values():
+            yield from _walk(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _walk(item)
+
+
+def _to_price(value: Any) -> Optional[float]:
+    """Read a decimal price from a number, numeric string or nested price object."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) if value > 1.0 else None
+    if isinstance(value, str):
+        try:
+            price = float(value)
+        except ValueError:
+            return None
+        return price if price > 1.0 else None
+    if isinstance(value, dict):
+        return _find_price(value, WIN_PRICE_KEYS)
+    return None
+
+
+def _find_price(selection: Dict[str, Any], keys: Tuple[str, ...]) -> Optional[float]:
+    for key in keys:
+        if key in selection:
+            price = _to_price(selection[key])
+            if price:
+                return price
+    # Sportsbet style "prices": [{"priceCode": "L", "winPrice": 3.5, "placePrice": 1.6}]
+    prices = selection.get("prices")
+    if isinstance(prices, list) and prices and isinstance(prices[0], dict):
+        return _find_price(prices[0], keys)
+    return None
+
+
+def _selection_name(selection: Dict[str, Any]) -> Optional[str]:
+    name = selection.get("name") or selection.get("displayName") or selection.get("runnerName")
+    if not name:
+        return None
+    number = selection.get("runnerNumber") or selection.get("number")
+    return f"{number}. {name}" if number else str(name)
+
+
+def _is_active(selection: Dict[str, Any]) -> bool:
+    status = str(selection.get("statusCode") or selection.get("status") or "").upper()
+    return status not in INACTIVE_STATUSES
+
+
+def parse_markets(payloads: List[Tuple[str, Any]]) -> List[Market]:
+    """
+    Parse markets from captured JSON payloads.
+
+    Any dictionary with a list of selections that carry a name and a decimal
+    price is taken as a market. Selections with a place price also produce a
+    Place market for racing.
+
+    Args:
+        payloads: (url, json) pairs recorded by JsonResponseCapture
+
+    Returns:
+        The markets found, deduplicated by market id
+    """
+    markets: Dict[str, Market] = {}
+
+    for _, payload in payloads:
+        for node in _walk(payload):
+            selections = next(
+                (node[key] for key in SELECTION_LIST_KEYS if isinstance(node.get(key), list)),
+                None
+            )
+            if not selections:
+                continue
+
+            market_name = str(node.get("name") or node.get("marketName") or node.get("displayName") or "Win")
+            market_id = str(node.get("id") or node.get("marketId") or market_name.lower().replace(" ", "_"))
+
+            win_outcomes = []
+            place_outcomes = []
+            for selection in selections:
+                if not isinstance(selection, dict) or not _is_active(selection):
+                    continue
+                name = _selection_name(selection)
+                if not name:
+                    continue
+                win_price = _find_price(selection, WIN_PRICE_KEYS)
+                if win_price:
+                    win_outcomes.append(Outcome(name=name, odds=win_price))
+                place_price = _find_price(selection, PLACE_PRICE_KEYS)
+                if place_price:
+                    place_outcomes.append(Outcome(name=name, odds=place_price))
+
+            if not win_outcomes:
+                continue
+
+            market_type = determine_market_type(market_name)
+            if market_type == MarketType.OTHER and place_outcomes:
+                # Only a racing win market carries place prices next to its win prices
+                market_name = "Win"
+                market_type = MarketType.WIN
+            markets[market_id] = Market(
+                id=market_id,
+                type=market_type,
+                name=market_name,
+                outcomes=win_outcomes,
+                line=determine_market_line(market_type, market_name)
+            )
+            if place_outcomes and market_type == MarketType.WIN:
+                markets[f"{market_id}_place"] = Market(
+                    id=f"{market_id}_place",
+                    type=MarketType.PLACE,
+                    name="Place",
+                    outcomes=place_outcomes
+                )
+
+    return list(markets.values())
+
+
+def parse_start_time(payloads: List[Tuple[str, Any]]) -> Optional[datetime]:
+    """
+    Find the event start time in captured JSON payloads.
+
+    Args:
+        payloads: (url, json) pairs recorded by JsonResponseCapture
+
+    Returns:
+        The start time as a naive local datetime, None if not present
+    """
+    for _, payload in payloads:
+        for node in _walk(payload):
+            start_time = _start_time_of(node)
+            if start_time:
+                return start_time
+    return None
+
+
+def _start_time_of(node: Dict[str, Any]) -> Optional[datetime]:
+    """Read the start time stored directly on a JSON object."""
+    for key in ("startTime", "advertisedStartTime", "startDateTime", "eventStartTime"):
+        value = node.get(key)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            # Epoch seconds or milliseconds
+            seconds = value / 1000 if value > 1e11 else value
+            return datetime.fromtimestamp(seconds)
+        if isinstance(value, str):
+            try:
+                parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+            except ValueError:
+                continue
+            if parsed.tzinfo:
+                parsed = parsed.astimezone().replace(tzinfo=None)
+            return parsed
+    return None
+
+
+def _split_teams(event_name: str) -> Tuple[str, str]:
+    for separator in TEAM_SEPARATORS:
+        if separator in event_name:
+            home_team, away_team = event_name.split(separator, 1)
+            return home_team.strip(), away_team.strip()
+    return event_name.strip(), ""
+
+
+def parse_events(
+    payload: Any,
+    bookmaker: Bookmaker,
+    sport: SportType,
+    source_url: str = "",
+) -> List[Event]:
+    """
+    Parse whole events from a JSON document that lists events with their markets.
+
+    Args:
+        payload: Decoded JSON of an event listing endpoint
+        bookmaker: The bookmaker the document came from
+        sport: The sport the endpoint lists
+        source_url: URL the document was fetched from
+
+    Returns:
+        Events that have at least one priced market
+    """
+    events = []
+
+    for node in _walk(payload):
+        market_list = next((node[key] for key in MARKET_LIST_KEYS if key in node), None)
+        if isinstance(market_list, dict):
+            market_list = [market_list]
+        if not isinstance(market_list, list) or not market_list:
+            continue
+
+        event_name = node.get("displayName") or node.get("name") or node.get("eventName")
+        event_id = node.get("id") or node.get("eventId")
+        if not event_name or event_id is None:
+            continue
+
+        markets = parse_markets([(source_url, market_list)])
+        if not markets:
+            continue
+
+        home_team = node.get("homeTeam") or node.get("participant1")
+        away_team = node.get("awayTeam") or node.get("participant2")
+        if not home_team:
+            home_team, away_team = _split_teams(str(event_name))
+
+        competition = node.get("competitionName") or node.get("className") or node.get("typeName") or "Unknown"
+        start_time = _start_time_of(node)
+        url = node.get("url") or node.get("httpLink") or ""
+        if url.startswith("/"):
+            url = f"{bookmaker.base_url}{url}"
+
+        events.append(Event(
+            id=f"{bookmaker.id}_{event_id}",
+            sport=sport,
+            home_team=str(home_team),
+            away_team=str(away_team or ""),
+            competition=str(competition),
+            start_time=start_time or datetime.now(),
+            markets=markets,
+            bookmaker=bookmaker,
+            url=url or source_url,
+            start_time_known=start_time is not None
+        ))
+
+    return events
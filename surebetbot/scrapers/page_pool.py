@@ -0,0 +1,104 @@
+"""
+Bounded page pool for fetching many pages concurrently in one browser context.
+"""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Iterable, List, Optional, Tuple, TypeVar
+
+from playwright.async_api import BrowserContext, Page
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class PagePool:
+    """
+    A fixed number of reusable pages in one browser context.
+
+    An asyncio.Semaphore bounds how many pages are in use at once; pages are
+    opened lazily and handed back to the pool after each job instead of being
+    closed, so a page is only created once per slot.
+    """
+
+    def __init__(self, context: BrowserContext, size: int):
+        """
+        Initialize the page pool.
+
+        Args:
+            context: The browser context pages are opened in
+            size: Maximum number of pages used concurrently
+        """
+        self.context = context
+        self.size = max(1, size)
+        self._semaphore = asyncio.Semaphore(self.size)
+        self._idle: List[Page] = []
+        self._pages: List[Page] = []
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Page]:
+        """Borrow a page for the duration of an `async with` block."""
+        async with self._semaphore:
+            page = self._idle.pop() if self._idle else await self._new_page()
+            try:
+                yield page
+            finally:
+                if page.is_closed():
+                    self._pages.remove(page)
+                else:
+                    self._idle.append(page)
+
+    async def map(
+        self,
+        items: Iterable[T],
+        handler: Callable[[Page, T], Awaitable[Optional[R]]],
+    ) -> AsyncIterator[Tuple[T, Optional[R]]]:
+        """
+        Run handler(page, item) for every item concurrently and yield results as they finish.
+
+        A failing item yields None instead of aborting the others. Leaving the
+        iteration early cancels the items that are still pending.
+
+        Args:
+            items: The work items, e.g. event URLs
+            handler: Coroutine function that scrapes one item with the given page
+
+        Yields:
+            (item, result) tuples in completion order
+        """
+        async def run(item: T) -> Tuple[T, Optional[R]]:
+            async with self.page() as page:
+                try:
+                    return item, await handler(page, item)
+                except Exception as e:
+                    logger.warning(f"Error processing {item}: {str(e)}")
+                    return item, None
+
+        tasks = [asyncio.create_task(run(item)) for item in items]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def close(self) -> None:
+        """Close every page opened by the pool."""
+        for page in self._pages:
+            try:
+                if not page.is_closed():
+                    await page.close()
+            except Exception as e:
+                logger.warning(f"Error closing pooled page: {str(e)}")
+        self._pages.clear()
+        self._idle.clear()
+
+    async def _new_page(self) -> Page:
+        page = await self.context.new_page()
+        self._pages.append(page)
+        return page
@@ -0,0 +1,216 @@
+"""
+Readiness-based waits for bookmaker pages.
+
+Instead of sleeping a fixed time after each navigation, a page is released as
+soon as it is ready: its content selectors are present, its odds nodes show
+prices and the network has been quiet for a short while. Every page type has a
+timeout budget shared by all of its conditions.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import List, Optional, Set
+
+from playwright.async_api import Page, Request
+
+from surebetbot.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Streaming requests never finish and would keep the network from ever looking quiet
+IGNORED_RESOURCE_TYPES = {"eventsource", "websocket"}
+
+# True once at least `minCount` elements matching the selectors show a decimal price
+ODDS_PRESENT_JS = """
+([selectors, minCount]) => {
+    let found = 0;
+    for (const el of document.querySelectorAll(selectors)) {
+        if (/\\d+\\.\\d{1,2}/.test(el.textContent || "")) {
+            found++;
+            if (found >= minCount) {
+                return true;
+            }
+        }
+    }
+    return false;
+}
+"""
+
+
+@dataclass
+class ReadinessCondition:
+    """What a page of one type must show before it is considered ready."""
+    content_selectors: List[str] = field(default_factory=list)  # Any of them present
+    odds_selectors: List[str] = field(default_factory=list)  # Nodes that carry prices
+    min_odds: int = 0  # Priced nodes required, 0 to skip the check
+    network_quiet_ms: int = settings.NETWORK_QUIET_MS
+    timeout_ms: int = settings.READINESS_TIMEOUT_MS
+
+
+PAGE_READINESS = {
+    "sport_listing": ReadinessCondition(
+        content_selectors=[
+            ".competition-container",
+            "[data-automation-id*='competition']",
+            ".classified-list",
+            ".event-card",
+            "[data-automation-id*='event']",
+        ],
+    ),
+    "racing_listing": ReadinessCondition(
+        content_selectors=[
+            ".meeting-item",
+            "[data-automation-id*='meeting']",
+            ".race-meeting",
+            ".classified-list",
+            ".race-card",
+        ],
+    ),
+    "event": ReadinessCondition(
+        content_selectors=[
+            "[data-automation-id*='market']",
+            ".market-container",
+            ".market-group",
+            ".betting-option",
+            ".betting-market",
+        ],
+        odds_selectors=[
+            "[data-automation-id*='price']",
+            "[data-automation-id*='outcome']",
+            ".price-text",
+            ".odds-text",
+            ".price-button",
+            ".outcome-button",
+            ".price",
+        ],
+        min_odds=2,
+    ),
+    "race": ReadinessCondition(
+        content_selectors=[
+            "[data-automation-id*='runner']",
+            ".runner-row",
+            ".runner-item",
+            ".betting-option-table tr",
+        ],
+        odds_selectors=[
+            "[data-automation-id*='win-price']",
+            "[data-automation-id*='fixed-price']",
+            ".win-price",
+            ".fixed-price",
+            ".price-button",
+        ],
+        min_odds=2,
+    ),
+}
+
+
+class PageReadiness:
+    """
+    Waits for a page to become ready.
+
+    Create it before navigating so requests started by the navigation are
+    tracked, then call wait() (or its parts) after page.goto().
+    """
+
+    def __init__(self, page: Page, page_type: str):
+        """
+        Initialize the readiness tracker.
+
+        Args:
+            page: The page to watch
+            page_type: Key of PAGE_READINESS ("event", "race", ...)
+        """
+        self.page = page
+        self.page_type = page_type
+        self.condition = PAGE_READINESS[page_type]
+        self._in_flight: Set[Request] = set()
+        self._last_activity = asyncio.get_running_loop().time()
+        self._deadline: Optional[float] = None
+        self._attached = True
+
+        page.on("request", self._on_request)
+        page.on("requestfinished", self._on_request_done)
+        page.on("requestfailed", self._on_request_done)
+
+    def detach(self) -> None:
+        """Stop tracking the page's requests. Safe to call more than once."""
+        if not self._attached:
+            return
+        self._attached = False
+        self.page.remove_listener("request", self._on_request)
+        self.page.remove_listener("requestfinished", self._on_request_done)
+        self.page.remove_listener("requestfailed", self._on_request_done)
+
+    async def wait(self, check_dom: bool = True) -> bool:
+        """
+        Wait until the network is quiet and, optionally, the page content is ready.
+
+        Args:
+            check_dom: Also wait for the content selectors and priced odds nodes
+
+        Returns:
+            True if the page became ready within its budget, False if the budget ran out
+        """
+        ready = await self.wait_for_network_quiet()
+        if check_dom:
+            ready = await self.wait_for_content() and ready
+        if not ready:
+            logger.info(f"{self.page_type} page not ready within {self.condition.timeout_ms} ms, continuing")
+        return ready
+
+    async def wait_for_network_quiet(self) -> bool:
+        """Wait until no request has been in flight for network_quiet_ms."""
+        loop = asyncio.get_running_loop()
+        quiet_for = self.condition.network_quiet_ms / 1000
+
+        while True:
+            now = loop.time()
+            if not self._in_flight and now - self._last_activity >= quiet_for:
+                return True
+            remaining = self._remaining()
+            if remaining <= 0:
+                return False
+            await asyncio.sleep(min(0.05, remaining))
+
+    async def wait_for_content(self) -> bool:
+        """Wait for the content selectors and, if configured, for enough priced odds nodes."""
+        condition = self.condition
+        try:
+            if condition.content_selectors:
+                await self.page.wait_for_selector(
+                    ", ".join(condition.content_selectors),
+                    state="attached",
+                    timeout=self._remaining_ms()
+                )
+            if condition.min_odds and condition.odds_selectors:
+                await self.page.wait_for_function(
+                    ODDS_PRESENT_JS,
+                    arg=[", ".join(condition.odds_selectors), condition.min_odds],
+                    timeout=self._remaining_ms()
+                )
+            return True
+        except Exception:
+            # Playwright raises TimeoutError when the budget runs out
+            return False
+
+    def _remaining(self) -> float:
+        loop = asyncio.get_running_loop()
+        if self._deadline is None:
+            self._deadline = loop.time() + self.condition.timeout_ms / 1000
+        return self._deadline - loop.time()
+
+    def _remaining_ms(self) -> float:
+        # Playwright treats a timeout of 0 as "no timeout"
+        return max(1.0, self._remaining() * 1000)
+
+    def _on_request(self, request: Request) -> None:
+        if request.resource_type in IGNORED_RESOURCE_TYPES:
+            return
+        self._in_flight.add(request)
+        self._last_activity = asyncio.get_running_loop().time()
+
+    def _on_request_done(self, request: Request) -> None:
+        if request in self._in_flight:
+            self._in_flight.discard(request)
+            self._last_activity = asyncio.get_running_loop().time()
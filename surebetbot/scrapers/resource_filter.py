@@ -0,0 +1,153 @@
+"""
+Request interception that keeps bookmaker pages from downloading resources
+the odds extraction never looks at (images, fonts, media, trackers).
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Dict
+
+from playwright.async_api import BrowserContext, Response, Route
+
+from surebetbot.config.bookmakers import ResourceFilterConfig, get_resource_filter_config
+
+logger = logging.getLogger(__name__)
+
+# Typical transfer size per resource type, used until real responses have been seen
+DEFAULT_RESOURCE_SIZES = {
+    "image": 25_000,
+    "media": 250_000,
+    "font": 40_000,
+    "script": 60_000,
+    "stylesheet": 30_000,
+    "xhr": 5_000,
+    "fetch": 5_000,
+}
+FALLBACK_RESOURCE_SIZE = 10_000
+
+
+@dataclass
+class ResourceFilterStats:
+    """Counters for a resource filter."""
+    allowed: int = 0
+    blocked: int = 0
+    bytes_loaded: int = 0
+    estimated_bytes_saved: int = 0
+    blocked_by_type: Dict[str, int] = field(default_factory=dict)
+
+
+class ResourceFilter:
+    """
+    Route handler that aborts unwanted requests of a bookmaker's pages.
+
+    The bytes a blocked request would have cost are estimated from the average
+    size of responses of the same resource type that were let through.
+    """
+
+    def __init__(self, bookmaker_id: str, config: ResourceFilterConfig):
+        """
+        Initialize the filter.
+
+        Args:
+            bookmaker_id: The bookmaker the filter belongs to
+            config: Allow/deny lists for the bookmaker
+        """
+        self.key = f"resource-filter:{bookmaker_id}"
+        self.bookmaker_id = bookmaker_id
+        self.config = config
+        self.stats = ResourceFilterStats()
+        self._size_totals: Dict[str, int] = {}
+        self._size_counts: Dict[str, int] = {}
+
+    def should_block(self, url: str, resource_type: str) -> bool:
+        """
+        Decide whether a request should be aborted.
+
+        Args:
+            url: The request URL
+            resource_type: Playwright resource type ("image", "script", ...)
+
+        Returns:
+            True if the request should be blocked
+        """
+        if not self.config.enabled:
+            return False
+
+        if any(pattern in url for pattern in self.config.allowed_url_patterns):
+            return False
+
+        if resource_type in self.config.blocked_resource_types:
+            return True
+
+        return any(pattern in url for pattern in self.config.blocked_url_patterns)
+
+    def estimate_size(self, resource_type: str) -> int:
+        """Estimate the transfer size of a resource of the given type."""
+        count = self._size_counts.get(resource_type)
+        if count:
+            return self._size_totals[resource_type] // count
+        return DEFAULT_RESOURCE_SIZES.get(resource_type, FALLBACK_RESOURCE_SIZE)
+
+    async def install(self, context: BrowserContext) -> None:
+        """
+        Attach the filter to a browser context.
+
+        Args:
+            context: The context whose requests should be filtered
+        """
+        if not self.config.enabled:
+            return
+        await context.route("**/*", self._handle_route)
+        context.on("response", self._record_response)
+
+    async def _handle_route(self, route: Route) -> None:
+        request = route.request
+        resource_type = request.resource_type
+
+        if self.should_block(request.url, resource_type):
+            self.stats.blocked += 1
+            self.stats.blocked_by_type[resource_type] = self.stats.blocked_by_type.get(resource_type, 0) + 1
+            self.stats.estimated_bytes_saved += self.estimate_size(resource_type)
+            await route.abort("blockedbyclient")
+        else:
+            self.stats.allowed += 1
+            await route.continue_()
+
+    def _record_response(self, response: Response) -> None:
+        content_length = response.headers.get("content-length")
+        if not content_length or not content_length.isdigit():
+            return
+
+        size = int(content_length)
+        resource_type = response.request.resource_type
+        self.stats.bytes_loaded += size
+        self._size_totals[resource_type] = self._size_totals.get(resource_type, 0) + size
+        self._size_counts[resource_type] = self._size_counts.get(resource_type, 0) + 1
+
+    def log_stats(self) -> None:
+        """Log the counters of this filter."""
+        stats = self.stats
+        logger.info(
+            f"Resource filter {self.bookmaker_id}: allowed {stats.allowed}, blocked {stats.blocked} "
+            f"{stats.blocked_by_type}, loaded {stats.bytes_loaded // 1024} KB, "
+            f"saved ~{stats.estimated_bytes_saved // 1024} KB"
+        )
+
+
+_filters: Dict[str, ResourceFilter] = {}
+
+
+def get_resource_filter(bookmaker_id: str) -> ResourceFilter:
+    """
+    Get the process-wide resource filter of a bookmaker.
+    Filters outlive scrape cycles because pooled contexts keep their route handlers.
+
+    Args:
+        bookmaker_id: The bookmaker's id
+
+    Returns:
+        The bookmaker's ResourceFilter
+    """
+    if bookmaker_id not in _filters:
+        _filters[bookmaker_id] = ResourceFilter(bookmaker_id, get_resource_filter_config(bookmaker_id))
+    return _filters[bookmaker_id]
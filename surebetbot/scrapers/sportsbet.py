@@ -1,9 +1,12 @@
+from contextlib import aclosing
 from datetime import datetime
 from typing import Dict, List, Optional
 import os
 
-from surebetbot.core.models import Bookmaker, Event, Market, MarketType, Outcome, ScrapingResult, SportType
+from surebetbot.core.models import Bookmaker, Event, Market, Outcome, ScrapingResult, SportType
+from surebetbot.core.utils import determine_market_line, determine_market_type
 from surebetbot.scrapers.base_scraper import BaseScraper
+from surebetbot.scrapers.readiness import PageReadiness
 
 
 class SportsbetScraper(BaseScraper):
@@ -75,9 +78,10 @@ class SportsbetScraper(BaseScraper):
         
         # Navigate to the sport page with reduced timeout
         self.logger.info(f"Navigating to {sport_url}")
+        readiness = PageReadiness(self.page, "sport_listing")
         try:
             # Use domcontentloaded instead of networkidle, since our test showed the site loads quickly
-            await self.page.goto(sport_url, wait_until="domcontentloaded", timeout=10000)
+            await self.goto(self.page, sport_url, wait_until="domcontentloaded", timeout=10000)
             
             # Save a debug screenshot
             debug_dir = "debug_screenshots"
@@ -91,7 +95,7 @@ class SportsbetScraper(BaseScraper):
             self.logger.info(f"Page title: {title}")
             
             # Let the page finish loading JavaScript content
-            await self.page.wait_for_timeout(2000)  # Wait 2 seconds for any JS to run
+            await readiness.wait()
             
             # For soccer, we need to be more specific since the structure is different
             if sport_type == SportType.SOCCER:
@@ -148,34 +152,23 @@ class SportsbetScraper(BaseScraper):
                         except Exception as e:
                             self.logger.warning(f"Error processing competition {i+1}: {str(e)}")
                     
-                    # Now process all match links we found
-                    for i, match in enumerate(match_links[:10]):  # Limit to 10 matches for testing
-                        try:
-                            href = match["href"]
-                            comp_name = match["competition"]
-                            
-                            # Make sure we have a full URL
-                            if href.startswith("/"):
-                                full_url = f"{self.bookmaker.base_url}{href}"
-                            else:
-                                full_url = href
-                            
-                            self.logger.info(f"Scraping match {i+1}/{min(10, len(match_links))}: {full_url} (Competition: {comp_name})")
-                            
-                            # Create a fresh page for each event to avoid context issues
-                            event_page = await self.context.new_page()
-                            try:
-                                event = await self._scrape_event_with_page(event_page, full_url, comp_name)
-                                if event:
-                                    events.append(event)
-                                    # If we've found at least 3 events, we'll stop here for testing purposes
-                                    if len(events) >= 3:
-                                        self.logger.info("Found 3 events, stopping scraping for testing purposes")
-                                        break
-                            finally:
-                                await event_page.close()
-                        except Exception as e:
-                            self.logger.warning(f"Error processing match link: {str(e)}")
+                    # Now process the match links we found, several pages at a time
+                    matches = match_links[:10]  # Limit to 10 matches for testing
+                    self.logger.info(f"Scraping {len(matches)} matches over {self.max_concurrent_pages} pages")
+                    
+                    async def scrape_match(event_page, match):
+                        full_url = self._full_url(match["href"])
+                        self.logger.info(f"Scraping match: {full_url} (Competition: {match['competition']})")
+                        return await self._scrape_event_with_page(event_page, full_url, match["competition"])
+                    
+                    async with aclosing(self.scrape_concurrently(matches, scrape_match)) as results:
+                        async for _, event in results:
+                            if event:
+                                events.append(event)
+                                # If we've found at least 3 events, we'll stop here for testing purposes
+                                if len(events) >= 3:
+                                    self.logger.info("Found 3 events, stopping scraping for testing purposes")
+                                    break
                 else:
                     self.logger.warning("No soccer competitions found, falling back to general approach")
             
@@ -230,37 +223,30 @@ class SportsbetScraper(BaseScraper):
                     
                     self.logger.info(f"Found {len(event_links)} potential event links by href pattern")
                 
-                # Process event links
-                self.logger.info(f"Processing {len(event_links)} event links")
-                for i, href in enumerate(event_links[:10]):  # Limit to 10 events for testing
-                    try:
-                        # Make sure we have a full URL
-                        if href.startswith("/"):
-                            full_url = f"{self.bookmaker.base_url}{href}"
-                        else:
-                            full_url = href
-                        
-                        self.logger.info(f"Scraping event {i+1}/{min(10, len(event_links))}: {full_url}")
-                        
-                        # Create a fresh page for each event to avoid context issues
-                        event_page = await self.context.new_page()
-                        try:
-                            event = await self._scrape_event_with_page(event_page, full_url)
-                            if event:
-                                events.append(event)
-                                # If we've found at least 3 events, we'll stop here for testing purposes
-                                if len(events) >= 3:
-                                    self.logger.info(f"Found {len(events)} events, stopping scraping for testing purposes")
-                                    break
-                        finally:
-                            await event_page.close()
-                    except Exception as e:
-                        self.logger.warning(f"Error processing event link: {str(e)}")
+                # Process event links, several pages at a time
+                event_links = event_links[:10]  # Limit to 10 events for testing
+                self.logger.info(f"Processing {len(event_links)} event links over {self.max_concurrent_pages} pages")
+                
+                async def scrape_link(event_page, href):
+                    full_url = self._full_url(href)
+                    self.logger.info(f"Scraping event: {full_url}")
+                    return await self._scrape_event_with_page(event_page, full_url)
+                
+                async with aclosing(self.scrape_concurrently(event_links, scrape_link)) as results:
+                    async for _, event in results:
+                        if event:
+                            events.append(event)
+                            # If we've found at least 3 events, we'll stop here for testing purposes
+                            if len(events) >= 3:
+                                self.logger.info(f"Found {len(events)} events, stopping scraping for testing purposes")
+                                break
             
             return events
         except Exception as e:
             self.logger.error(f"Error scraping sport {sport_type.name}: {str(e)}")
             return []
+        finally:
+            readiness.detach()
     
     async def _scrape_event_with_page(self, page, event_url: str, competition_override: str = None) -> Optional[Event]:
         """
@@ -274,12 +260,13 @@ class SportsbetScraper(BaseScraper):
         Returns:
             An Event object if successful, None otherwise
         """
+        readiness = PageReadiness(page, "event")
         try:
             # Navigate to the event page with reduced timeout
             self.logger.info(f"Navigating to event: {event_url}")
             
             # Use domcontentloaded instead of networkidle and shorter timeout
-            await page.goto(event_url, wait_until="domcontentloaded", timeout=10000)
+            await self.goto(page, event_url, wait_until="domcontentloaded", timeout=10000)
             
             # Take screenshot for debugging
             debug_dir = "debug_screenshots"
@@ -293,7 +280,7 @@ class SportsbetScraper(BaseScraper):
             self.logger.info(f"Event page title: {title}")
             
             # Let the page finish loading JavaScript content
-            await page.wait_for_timeout(1000)  # Wait 1 second for any JS to run
+            await readiness.wait()
             
             # Try various selectors for event name
             event_name = None
@@ -386,7 +373,7 @@ class SportsbetScraper(BaseScraper):
                                         break
                             
                             # Determine market type
-                            market_type = self._determine_market_type(market_name)
+                            market_type = determine_market_type(market_name)
                             
                             # Get outcomes
                             outcomes = []
@@ -438,7 +425,8 @@ class SportsbetScraper(BaseScraper):
                                     id=market_id,
                                     type=market_type,
                                     name=market_name,
-                                    outcomes=outcomes
+                                    outcomes=outcomes,
+                                    line=determine_market_line(market_type, market_name)
                                 ))
                         except Exception as e:
                             self.logger.warning(f"Error processing market {i+1}: {str(e)}")
@@ -459,7 +447,7 @@ class SportsbetScraper(BaseScraper):
             if not event_id:
                 event_id = event_url.split("/")[-2]
             
-            # Default start time to now if we can't find it
+            # The page shows no start time, so it is the time the event was parsed
             start_time = datetime.now()
             
             # Create and return the Event object
@@ -472,12 +460,23 @@ class SportsbetScraper(BaseScraper):
                 start_time=start_time,
                 markets=markets,
                 bookmaker=self.bookmaker,
-                url=event_url
+                url=event_url,
+                start_time_known=False
             )
         except Exception as e:
             self.logger.error(f"Error scraping event {event_url}: {str(e)}")
             return None
+        finally:
+            readiness.detach()
 
+    def _full_url(self, href: str) -> str:
+        """
+        Make sure we have a full URL for a link found on the page.
+        """
+        if href.startswith("/"):
+            return f"{self.bookmaker.base_url}{href}"
+        return href
+    
     async def scrape_event(self, event_url: str) -> Optional[Event]:
         """
         Scrape a specific event from Sportsbet.
@@ -489,25 +488,6 @@ class SportsbetScraper(BaseScraper):
         finally:
             await event_page.close()
     
-    def _determine_market_type(self, market_name: str) -> MarketType:
-        """
-        Determine the market type from the market name.
-        """
-        market_name_lower = market_name.lower()
-        
-        if any(term in market_name_lower for term in ["winner", "win", "head to head", "h2h", "match result"]):
-            return MarketType.WIN
-        elif any(term in market_name_lower for term in ["handicap", "line", "spread"]):
-            return MarketType.HANDICAP
-        elif any(term in market_name_lower for term in ["over/under", "total", "o/u"]):
-            return MarketType.TOTAL_OVER_UNDER
-        elif "correct score" in market_name_lower:
-            return MarketType.CORRECT_SCORE
-        elif "player" in market_name_lower:
-            return MarketType.PLAYER_PROPS
-        else:
-            return MarketType.OTHER
-    
     def _determine_sport_type(self, url: str) -> SportType:
         """
         Determine the sport type from the URL.
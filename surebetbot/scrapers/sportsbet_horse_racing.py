@@ -5,7 +5,7 @@ This module contains a specialized scraper for horse racing events
 from Sportsbet.com.au bookmaker.
 """
 
-import asyncio
+from contextlib import aclosing
 import json
 import logging
 import os
@@ -13,10 +13,13 @@ import re
 from datetime import datetime
 from typing import Dict, List, Optional, Union
 
-from playwright.async_api import Browser, BrowserContext, Page, async_playwright
+from playwright.async_api import Browser, BrowserContext, Page
 
+from surebetbot.config.bookmakers import SPORTSBET
 from surebetbot.core.models import Bookmaker, Event, Market, Outcome, ScrapingResult, SportType, MarketType
 from surebetbot.scrapers.base_scraper import BaseScraper
+from surebetbot.scrapers.network_capture import parse_markets, parse_start_time
+from surebetbot.scrapers.readiness import PageReadiness
 
 logger = logging.getLogger(__name__)
 
@@ -26,12 +29,7 @@ class SportsbetHorseRacingScraper(BaseScraper):
 
     def __init__(self):
         """Initialize the Sportsbet horse racing scraper."""
-        bookmaker = Bookmaker(
-            id="sportsbet",
-            name="Sportsbet",
-            base_url="https://www.sportsbet.com.au"
-        )
-        super().__init__(bookmaker)
+        super().__init__(SPORTSBET)
         self.name = "Sportsbet Horse Racing"
         self.base_url = "https://www.sportsbet.com.au"
         self.horse_racing_url = f"{self.base_url}/horse-racing"
@@ -76,23 +74,23 @@ class SportsbetHorseRacingScraper(BaseScraper):
             timestamp=datetime.now()
         )
 
+    def get_browser_type(self) -> str:
+        """Use Firefox as it works better with Sportsbet."""
+        return "firefox"
+
+    def get_context_options(self) -> Dict:
+        """Browser context options for Sportsbet."""
+        return {
+            "viewport": {"width": 1280, "height": 800},
+            "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Firefox/124.0",
+        }
+
     async def initialize(self) -> None:
-        """Initialize the browser and context."""
+        """Lease a warm browser context from the shared pool."""
         logger.info(f"Initializing {self.name} scraper")
         
-        # Launch playwright and browser
-        playwright = await async_playwright().start()
-        
-        # Use Firefox as it works better with Sportsbet
-        self._browser = await playwright.firefox.launch(
-            headless=False,  # Set to True in production
-        )
-        
-        # Create a browser context with extended timeout
-        self._context = await self._browser.new_context(
-            viewport={"width": 1280, "height": 800},
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) Firefox/124.0",
-        )
+        self._context = await self.acquire_browser_context()
+        self._browser = self.browser
         self._context.set_default_timeout(30000)  # 30 seconds
         
         logger.info(f"{self.name} scraper initialized successfully")
@@ -131,13 +129,12 @@ class SportsbetHorseRacingScraper(BaseScraper):
         try:
             # Create a new page
             page = await self._context.new_page()
+            readiness = PageReadiness(page, "racing_listing")
             
             # Navigate to horse racing page
             logger.info(f"Navigating to horse racing: {self.horse_racing_url}")
             try:
-                await page.goto(self.horse_racing_url, wait_until="domcontentloaded", timeout=60000)
-                # Add additional waiting to ensure content is loaded
-                await page.wait_for_load_state("load", timeout=30000)
+                await self.goto(page, self.horse_racing_url, wait_until="domcontentloaded", timeout=60000)
             except Exception as e:
                 logger.warning(f"Navigation timed out, but continuing: {e}")
                 
@@ -156,13 +153,14 @@ class SportsbetHorseRacingScraper(BaseScraper):
                     if await consent.count() > 0:
                         logger.info(f"Accepting cookies with selector: {consent_selector}")
                         await consent.click()
-                        await page.wait_for_timeout(1000)
+                        await consent.first.wait_for(state="hidden", timeout=2000)
                         break
                 except Exception:
                     pass
             
-            # Wait for page to load
-            await page.wait_for_timeout(2000)
+            # Wait for the meetings to render
+            await readiness.wait()
+            readiness.detach()
             
             # Find all race meetings
             race_meetings = []
@@ -262,33 +260,32 @@ class SportsbetHorseRacingScraper(BaseScraper):
             
             # Limit the number of races to process to avoid overloading
             max_races = min(len(race_meetings), 10)
-            
-            # Process each race by navigating to its page
-            for i in range(max_races):
-                race = race_meetings[i]
-                race_url = race["url"]
-                
-                logger.info(f"Processing race {i+1}/{max_races}: {race['race_name']} at {race['meeting']}")
-                event = await self._parse_horse_race(page, race_url, race["meeting"], race["race_name"])
-                
-                if event:
-                    events.append(event)
+            to_parse, unchanged = self.select_changed_events(race_meetings[:max_races])
+            events.extend(unchanged)
+            
+            # Process the race pages concurrently, each race on its own pooled page
+            async def parse_race(race_page: Page, race: Dict[str, str]) -> Optional[Event]:
+                logger.info(f"Processing race: {race['race_name']} at {race['meeting']}")
+                return await self._parse_horse_race(race_page, race["url"], race["meeting"], race["race_name"])
+            
+            async with aclosing(self.scrape_concurrently(to_parse, parse_race, self._context)) as results:
+                async for race, event in results:
+                    if event:
+                        self.record_event(race, event)
+                        events.append(event)
                     
-                    # Save debug info
-                    debug_file = os.path.join(self.debug_dir, f"race_{event.id}.json")
-                    with open(debug_file, "w") as f:
-                        # Create a simplified dict representation for debugging
-                        event_debug = {
-                            "id": event.id,
-                            "name": event.home_team,
-                            "meeting": event.competition,
-                            "url": event.url,
-                            "market_count": len(event.markets)
-                        }
-                        json.dump(event_debug, f, indent=2, default=str)
-                
-                # Small delay between requests
-                await asyncio.sleep(1)
+                        # Save debug info
+                        debug_file = os.path.join(self.debug_dir, f"race_{event.id}.json")
+                        with open(debug_file, "w") as f:
+                            # Create a simplified dict representation for debugging
+                            event_debug = {
+                                "id": event.id,
+                                "name": event.home_team,
+                                "meeting": event.competition,
+                                "url": event.url,
+                                "market_count": len(event.markets)
+                            }
+                            json.dump(event_debug, f, indent=2, default=str)
             
             # Close the page
             await page.close()
@@ -312,222 +309,242 @@ class SportsbetHorseRacingScraper(BaseScraper):
         Returns:
             Event object if successful, None otherwise
         """
+        # Record the odds API responses while the page loads
+        capture = self.create_response_capture()
+        if capture:
+            capture.attach(page)
+        readiness = PageReadiness(page, "race")
+        
         try:
             logger.info(f"Navigating to race: {race_url}")
             try:
-                await page.goto(race_url, wait_until="domcontentloaded", timeout=30000)
+                await self.goto(page, race_url, wait_until="domcontentloaded", timeout=30000)
             except Exception as e:
                 logger.warning(f"Navigation timed out, but continuing: {e}")
             
-            # Wait for page to load
-            await page.wait_for_timeout(2000)
+            # Wait until the page has settled; the DOM only has to be ready without captured odds
+            await readiness.wait_for_network_quiet()
+            if capture:
+                await capture.wait_idle()
+            if not (capture and capture.payloads):
+                await readiness.wait_for_content()
             
             # Take screenshot for debugging
             race_name_file = re.sub(r'[^\w\-_]', '_', race_name[:30])
             await self._save_screenshot(page, f"race_{race_name_file}")
             
-            # Extract detailed race information using JavaScript
-            race_data = await page.evaluate("""
-                () => {
-                    const data = {
-                        raceName: document.title.split(" - ")[0] || document.title,
-                        raceNumber: null,
-                        raceTime: null,
-                        venue: null,
-                        runnerCount: 0,
-                        runners: [],
-                        markets: []
-                    };
+            # Prefer the runners and prices the page loaded from the bookmaker's JSON API
+            captured_markets = []
+            if capture:
+                await capture.wait_idle()
+                captured_markets = parse_markets(capture.payloads)
+            
+            race_data = {}
+            if captured_markets:
+                logger.info(f"Parsed {len(captured_markets)} markets from captured odds API responses")
+            else:
+                # Extract detailed race information using JavaScript
+                race_data = await page.evaluate("""
+                    () => {
+                        const data = {
+                            raceName: document.title.split(" - ")[0] || document.title,
+                            raceNumber: null,
+                            raceTime: null,
+                            venue: null,
+                            runnerCount: 0,
+                            runners: [],
+                            markets: []
+                        };
                     
-                    // Try to get race number from title or content
-                    const raceNumberMatch = data.raceName.match(/Race (\\d+)/i);
-                    if (raceNumberMatch) {
-                        data.raceNumber = raceNumberMatch[1];
-                    }
+                        // Try to get race number from title or content
+                        const raceNumberMatch = data.raceName.match(/Race (\\d+)/i);
+                        if (raceNumberMatch) {
+                            data.raceNumber = raceNumberMatch[1];
+                        }
                     
-                    // Try to extract venue from URL or page content
-                    const pathParts = window.location.pathname.split('/');
-                    for (const part of pathParts) {
-                        if (part && !['horse-racing', 'race'].includes(part) && !part.startsWith('race-')) {
-                            data.venue = part.replace(/-/g, ' ').replace(/\\b\\w/g, c => c.toUpperCase());
-                            break;
+                        // Try to extract venue from URL or page content
+                        const pathParts = window.location.pathname.split('/');
+                        for (const part of pathParts) {
+                            if (part && !['horse-racing', 'race'].includes(part) && !part.startsWith('race-')) {
+                                data.venue = part.replace(/-/g, ' ').replace(/\\b\\w/g, c => c.toUpperCase());
+                                break;
+                            }
                         }
-                    }
                     
-                    // Try to get race time
-                    const timeElements = document.querySelectorAll('[data-automation-id*="time"], .race-time, time');
-                    if (timeElements.length > 0) {
-                        data.raceTime = timeElements[0].textContent.trim();
-                    }
+                        // Try to get race time
+                        const timeElements = document.querySelectorAll('[data-automation-id*="time"], .race-time, time');
+                        if (timeElements.length > 0) {
+                            data.raceTime = timeElements[0].textContent.trim();
+                        }
                     
-                    // Extract runners - find the table or list of runners
-                    const runnerElements = document.querySelectorAll('[data-automation-id*="runner"], .runner-row, .runner-item, .betting-option-table tr');
-                    data.runnerCount = runnerElements.length;
+                        // Extract runners - find the table or list of runners
+                        const runnerElements = document.querySelectorAll('[data-automation-id*="runner"], .runner-row, .runner-item, .betting-option-table tr');
+                        data.runnerCount = runnerElements.length;
                     
-                    runnerElements.forEach((runner, index) => {
-                        try {
-                            const runnerData = {
-                                number: index + 1,
-                                name: "Unknown Runner",
-                                jockey: null,
-                                trainer: null,
-                                barrier: null,
-                                weight: null,
-                                silkUrl: null,
-                                odds: {}
-                            };
+                        runnerElements.forEach((runner, index) => {
+                            try {
+                                const runnerData = {
+                                    number: index + 1,
+                                    name: "Unknown Runner",
+                                    jockey: null,
+                                    trainer: null,
+                                    barrier: null,
+                                    weight: null,
+                                    silkUrl: null,
+                                    odds: {}
+                                };
                             
-                            // Extract runner number if available
-                            const numberElements = runner.querySelectorAll('[data-automation-id*="number"], .runner-number');
-                            if (numberElements.length > 0) {
-                                const numberText = numberElements[0].textContent.trim();
-                                const numberMatch = numberText.match(/\\d+/);
-                                if (numberMatch) {
-                                    runnerData.number = parseInt(numberMatch[0]);
+                                // Extract runner number if available
+                                const numberElements = runner.querySelectorAll('[data-automation-id*="number"], .runner-number');
+                                if (numberElements.length > 0) {
+                                    const numberText = numberElements[0].textContent.trim();
+                                    const numberMatch = numberText.match(/\\d+/);
+                                    if (numberMatch) {
+                                        runnerData.number = parseInt(numberMatch[0]);
+                                    }
                                 }
-                            }
-                            
-                            // Extract runner name
-                            const nameElements = runner.querySelectorAll('[data-automation-id*="name"], .runner-name, .horse-name');
-                            if (nameElements.length > 0) {
-                                runnerData.name = nameElements[0].textContent.trim();
-                            }
                             
-                            // Extract jockey if available
-                            const jockeyElements = runner.querySelectorAll('[data-automation-id*="jockey"], .jockey-name');
-                            if (jockeyElements.length > 0) {
-                                runnerData.jockey = jockeyElements[0].textContent.trim();
-                            }
+                                // Extract runner name
+                                const nameElements = runner.querySelectorAll('[data-automation-id*="name"], .runner-name, .horse-name');
+                                if (nameElements.length > 0) {
+                                    runnerData.name = nameElements[0].textContent.trim();
+                                }
                             
-                            // Extract trainer if available
-                            const trainerElements = runner.querySelectorAll('[data-automation-id*="trainer"], .trainer-name');
-                            if (trainerElements.length > 0) {
-                                runnerData.trainer = trainerElements[0].textContent.trim();
-                            }
+                                // Extract jockey if available
+                                const jockeyElements = runner.querySelectorAll('[data-automation-id*="jockey"], .jockey-name');
+                                if (jockeyElements.length > 0) {
+                                    runnerData.jockey = jockeyElements[0].textContent.trim();
+                                }
                             
-                            // Extract barrier if available
-                            const barrierElements = runner.querySelectorAll('[data-automation-id*="barrier"], .barrier');
-                            if (barrierElements.length > 0) {
-                                const barrierText = barrierElements[0].textContent.trim();
-                                const barrierMatch = barrierText.match(/\\d+/);
-                                if (barrierMatch) {
-                                    runnerData.barrier = parseInt(barrierMatch[0]);
+                                // Extract trainer if available
+                                const trainerElements = runner.querySelectorAll('[data-automation-id*="trainer"], .trainer-name');
+                                if (trainerElements.length > 0) {
+                                    runnerData.trainer = trainerElements[0].textContent.trim();
                                 }
-                            }
                             
-                            // Extract weight if available
-                            const weightElements = runner.querySelectorAll('[data-automation-id*="weight"], .weight');
-                            if (weightElements.length > 0) {
-                                runnerData.weight = weightElements[0].textContent.trim();
-                            }
+                                // Extract barrier if available
+                                const barrierElements = runner.querySelectorAll('[data-automation-id*="barrier"], .barrier');
+                                if (barrierElements.length > 0) {
+                                    const barrierText = barrierElements[0].textContent.trim();
+                                    const barrierMatch = barrierText.match(/\\d+/);
+                                    if (barrierMatch) {
+                                        runnerData.barrier = parseInt(barrierMatch[0]);
+                                    }
+                                }
                             
-                            // Try to find silk/colors image
-                            const silkElements = runner.querySelectorAll('img[src*="silk"], img[src*="color"], .silk-image');
-                            if (silkElements.length > 0) {
-                                runnerData.silkUrl = silkElements[0].src;
-                            }
+                                // Extract weight if available
+                                const weightElements = runner.querySelectorAll('[data-automation-id*="weight"], .weight');
+                                if (weightElements.length > 0) {
+                                    runnerData.weight = weightElements[0].textContent.trim();
+                                }
                             
-                            // Extract Win odds
-                            const winOddsElements = runner.querySelectorAll('[data-automation-id*="win-price"], [data-automation-id*="fixed-price"], .win-price, .fixed-price, .price-button');
-                            if (winOddsElements.length > 0) {
-                                const priceText = winOddsElements[0].textContent.trim().replace('$', '');
-                                const price = parseFloat(priceText);
-                                if (!isNaN(price) && price > 1.0) {
-                                    runnerData.odds.win = price;
+                                // Try to find silk/colors image
+                                const silkElements = runner.querySelectorAll('img[src*="silk"], img[src*="color"], .silk-image');
+                                if (silkElements.length > 0) {
+                                    runnerData.silkUrl = silkElements[0].src;
                                 }
-                            }
                             
-                            // Extract Place odds if available
-                            const placeOddsElements = runner.querySelectorAll('[data-automation-id*="place-price"], .place-price');
-                            if (placeOddsElements.length > 0) {
-                                const priceText = placeOddsElements[0].textContent.trim().replace('$', '');
-                                const price = parseFloat(priceText);
-                                if (!isNaN(price) && price > 1.0) {
-                                    runnerData.odds.place = price;
+                                // Extract Win odds
+                                const winOddsElements = runner.querySelectorAll('[data-automation-id*="win-price"], [data-automation-id*="fixed-price"], .win-price, .fixed-price, .price-button');
+                                if (winOddsElements.length > 0) {
+                                    const priceText = winOddsElements[0].textContent.trim().replace('$', '');
+                                    const price = parseFloat(priceText);
+                                    if (!isNaN(price) && price > 1.0) {
+                                        runnerData.odds.win = price;
+                                    }
                                 }
-                            }
                             
-                            data.runners.push(runnerData);
-                        } catch (e) {
-                            console.error('Error parsing runner:', e);
-                        }
-                    });
-                    
-                    // Try to identify different market types
-                    const marketTypes = ['Win', 'Place', 'Each Way', 'Quinella', 'Exacta', 'Trifecta'];
-                    const marketContainers = document.querySelectorAll('[data-automation-id*="market"], .market-container, .market-group, .tab-content, .betting-category');
-                    
-                    if (marketContainers.length === 0) {
-                        // If we didn't find specific market containers, look for market tabs
-                        const marketTabs = document.querySelectorAll('.tab, .tab-item, [role="tab"]');
-                        marketTabs.forEach(tab => {
-                            const tabText = tab.textContent.trim();
-                            // Check if this tab corresponds to a known market type
-                            const matchedMarket = marketTypes.find(marketType => 
-                                tabText.toLowerCase().includes(marketType.toLowerCase()));
+                                // Extract Place odds if available
+                                const placeOddsElements = runner.querySelectorAll('[data-automation-id*="place-price"], .place-price');
+                                if (placeOddsElements.length > 0) {
+                                    const priceText = placeOddsElements[0].textContent.trim().replace('$', '');
+                                    const price = parseFloat(priceText);
+                                    if (!isNaN(price) && price > 1.0) {
+                                        runnerData.odds.place = price;
+                                    }
+                                }
                             
-                            if (matchedMarket) {
-                                data.markets.push({
-                                    name: matchedMarket,
-                                    available: true
-                                });
+                                data.runners.push(runnerData);
+                            } catch (e) {
+                                console.error('Error parsing runner:', e);
                             }
                         });
-                    } else {
-                        // Process market containers
-                        marketContainers.forEach(container => {
-                            try {
-                                // Get market name
-                                let marketName = "Unknown";
-                                const nameEls = container.querySelectorAll('h2, h3, h4, .market-name, .market-title');
-                                if (nameEls.length > 0) {
-                                    marketName = nameEls[0].textContent.trim();
-                                }
-                                
-                                // Check if this is a known market type
+                    
+                        // Try to identify different market types
+                        const marketTypes = ['Win', 'Place', 'Each Way', 'Quinella', 'Exacta', 'Trifecta'];
+                        const marketContainers = document.querySelectorAll('[data-automation-id*="market"], .market-container, .market-group, .tab-content, .betting-category');
+                    
+                        if (marketContainers.length === 0) {
+                            // If we didn't find specific market containers, look for market tabs
+                            const marketTabs = document.querySelectorAll('.tab, .tab-item, [role="tab"]');
+                            marketTabs.forEach(tab => {
+                                const tabText = tab.textContent.trim();
+                                // Check if this tab corresponds to a known market type
                                 const matchedMarket = marketTypes.find(marketType => 
-                                    marketName.toLowerCase().includes(marketType.toLowerCase()));
-                                
+                                    tabText.toLowerCase().includes(marketType.toLowerCase()));
+                            
                                 if (matchedMarket) {
                                     data.markets.push({
                                         name: matchedMarket,
                                         available: true
                                     });
-                                } else if (marketName && marketName !== "Unknown") {
-                                    // Add any other market we found
-                                    data.markets.push({
-                                        name: marketName,
-                                        available: true
-                                    });
                                 }
-                            } catch (e) {
-                                console.error('Error parsing market container:', e);
-                            }
-                        });
-                    }
+                            });
+                        } else {
+                            // Process market containers
+                            marketContainers.forEach(container => {
+                                try {
+                                    // Get market name
+                                    let marketName = "Unknown";
+                                    const nameEls = container.querySelectorAll('h2, h3, h4, .market-name, .market-title');
+                                    if (nameEls.length > 0) {
+                                        marketName = nameEls[0].textContent.trim();
+                                    }
+                                
+                                    // Check if this is a known market type
+                                    const matchedMarket = marketTypes.find(marketType => 
+                                        marketName.toLowerCase().includes(marketType.toLowerCase()));
+                                
+                                    if (matchedMarket) {
+                                        data.markets.push({
+                                            name: matchedMarket,
+                                            available: true
+                                        });
+                                    } else if (marketName && marketName !== "Unknown") {
+                                        // Add any other market we found
+                                        data.markets.push({
+                                            name: marketName,
+                                            available: true
+                                        });
+                                    }
+                                } catch (e) {
+                                    console.error('Error parsing market container:', e);
+                                }
+                            });
+                        }
                     
-                    // If we didn't find any markets, add win market based on odds
-                    if (data.markets.length === 0 && data.runners.some(r => r.odds.win)) {
-                        data.markets.push({
-                            name: 'Win',
-                            available: true
-                        });
-                    }
+                        // If we didn't find any markets, add win market based on odds
+                        if (data.markets.length === 0 && data.runners.some(r => r.odds.win)) {
+                            data.markets.push({
+                                name: 'Win',
+                                available: true
+                            });
+                        }
                     
-                    // Add place market if we found place odds
-                    if (!data.markets.some(m => m.name === 'Place') && 
-                        data.runners.some(r => r.odds.place)) {
-                        data.markets.push({
-                            name: 'Place',
-                            available: true
-                        });
-                    }
+                        // Add place market if we found place odds
+                        if (!data.markets.some(m => m.name === 'Place') && 
+                            data.runners.some(r => r.odds.place)) {
+                            data.markets.push({
+                                name: 'Place',
+                                available: true
+                            });
+                        }
                     
-                    return data;
-                }
-            """)
+                        return data;
+                    }
+                """)
             
-            logger.info(f"Extracted race data: {json.dumps(race_data, indent=2)}")
+                logger.info(f"Extracted race data: {json.dumps(race_data, indent=2)}")
             
             # Create markets based on the data we extracted
             markets = []
@@ -583,6 +600,12 @@ class SportsbetHorseRacingScraper(BaseScraper):
                 )
                 markets.append(place_market)
             
+            # Markets parsed from the odds API replace the ones built from the DOM
+            if captured_markets:
+                markets = captured_markets
+                win_outcomes = next((m.outcomes for m in markets if m.type == MarketType.WIN), [])
+                place_outcomes = next((m.outcomes for m in markets if m.type == MarketType.PLACE), [])
+            
             # Check if we have both win and place markets for Each Way
             if win_outcomes and place_outcomes:
                 # Create a separate Each Way market (for display only - not used in calculations)
@@ -605,6 +628,9 @@ class SportsbetHorseRacingScraper(BaseScraper):
             if race_data.get("raceNumber"):
                 race_name = f"Race {race_data.get('raceNumber')} - {race_name}"
             
+            # Use the advertised start time from the odds API, current time as fallback
+            start_time = parse_start_time(capture.payloads) if capture else None
+            
             # Create the event
             event = Event(
                 id=event_id,
@@ -612,10 +638,11 @@ class SportsbetHorseRacingScraper(BaseScraper):
                 home_team=race_name,
                 away_team="",  # No away team in horse racing
                 competition=meeting_name,
-                start_time=datetime.now(),  # Use current time as fallback
+                start_time=start_time or datetime.now(),
                 markets=markets,
                 bookmaker=self.bookmaker,
-                url=race_url
+                url=race_url,
+                start_time_known=start_time is not None
             )
             
             return event
@@ -623,18 +650,18 @@ class SportsbetHorseRacingScraper(BaseScraper):
         except Exception as e:
             logger.error(f"Error parsing horse race: {str(e)}")
             return None
+        
+        finally:
+            readiness.detach()
+            if capture:
+                capture.detach()
 
     async def cleanup(self) -> None:
-        """Close the browser and clean up resources."""
+        """Return the browser context to the shared pool and clean up resources."""
         logger.info(f"Closing {self.name} scraper")
         
-        if self._context:
-            await self._context.close()
-            self._context = None
-        
-        if self._browser:
-            await self._browser.close()
-            self._browser = None
+        self._context = None
+        self._browser = None
             
         # Call parent cleanup method if necessary
         await super().cleanup()
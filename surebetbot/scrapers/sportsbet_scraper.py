@@ -1,31 +1,34 @@
-import asyncio
+from contextlib import aclosing
 import json
 import logging
 import os
 import re
-import time
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple, Union
 
-from playwright.async_api import Browser, BrowserContext, Page, async_playwright
+from playwright.async_api import Browser, BrowserContext, Page
 
+from surebetbot.config.bookmakers import SPORTSBET
 from surebetbot.core.models import Bookmaker, Event, Market, Outcome, ScrapingResult, SportType, MarketType
+from surebetbot.core.utils import determine_market_line
 from surebetbot.scrapers.base_scraper import BaseScraper
+from surebetbot.scrapers.event_index import hash_listing_odds
+from surebetbot.scrapers.network_capture import parse_markets, parse_start_time
+from surebetbot.scrapers.readiness import PageReadiness
 
 logger = logging.getLogger(__name__)
 
 
+# Price nodes on a listing card
+LISTING_PRICE_SELECTOR = "[data-automation-id*='price'], .price-text, .odds-text, .price-button"
+
+
 class SportsbetScraper(BaseScraper):
     """Scraper for Sportsbet.com.au bookmaker."""
 
     def __init__(self):
         """Initialize the Sportsbet scraper."""
-        bookmaker = Bookmaker(
-            id="sportsbet",
-            name="Sportsbet",
-            base_url="https://www.sportsbet.com.au"
-        )
-        super().__init__(bookmaker)
+        super().__init__(SPORTSBET)
         self.name = "Sportsbet"
         self.base_url = "https://www.sportsbet.com.au"
         self.soccer_url = f"{self.base_url}/soccer"
@@ -72,14 +75,19 @@ class SportsbetScraper(BaseScraper):
         
         all_events = []
         
-        # Initialize browser if not already done
-        if not self._browser or not self._context:
-            await self.initialize()
-        
         try:
             for sport_type in sport_types:
                 logger.info(f"Scraping {sport_type.value} events from {self.name}")
-                events = await self.scrape_sport(sport_type)
+                
+                # Try the browserless HTTP path first
+                events = await self.scrape_sport_http(sport_type)
+                
+                if events is None:
+                    # Only start a browser for sports that really need JavaScript
+                    if not self._browser or not self._context:
+                        await self.initialize()
+                    events = await self.scrape_sport(sport_type)
+                
                 all_events.extend(events)
         
         except Exception as e:
@@ -107,23 +115,23 @@ class SportsbetScraper(BaseScraper):
         """
         return await self.scrape_url(event_url)
 
+    def get_browser_type(self) -> str:
+        """Use Firefox as it works better with Sportsbet."""
+        return "firefox"
+
+    def get_context_options(self) -> Dict:
+        """Browser context options for Sportsbet."""
+        return {
+            "viewport": {"width": 1280, "height": 800},
+            "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Firefox/124.0",
+        }
+
     async def initialize(self) -> None:
-        """Initialize the browser and context."""
+        """Lease a warm browser context from the shared pool."""
         logger.info(f"Initializing {self.name} scraper")
         
-        # Launch playwright and browser
-        playwright = await async_playwright().start()
-        
-        # Use Firefox as it works better with Sportsbet
-        self._browser = await playwright.firefox.launch(
-            headless=False,  # Set to True in production
-        )
-        
-        # Create a browser context with extended timeout
-        self._context = await self._browser.new_context(
-            viewport={"width": 1280, "height": 800},
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) Firefox/124.0",
-        )
+        self._context = await self.acquire_browser_context()
+        self._browser = self.browser
         self._context.set_default_timeout(30000)  # 30 seconds
         
         logger.info(f"{self.name} scraper initialized successfully")
@@ -159,9 +167,10 @@ class SportsbetScraper(BaseScraper):
         Returns:
             True if navigation was successful, False otherwise
         """
+        readiness = PageReadiness(page, "sport_listing")
         try:
             logger.info(f"Navigating to {self.soccer_url}")
-            await page.goto(self.soccer_url, wait_until="domcontentloaded", timeout=30000)
+            await self.goto(page, self.soccer_url, wait_until="domcontentloaded", timeout=30000)
             
             # Save screenshot
             await self._save_screenshot(page, "soccer")
@@ -183,19 +192,22 @@ class SportsbetScraper(BaseScraper):
                     if await consent.count() > 0:
                         logger.info(f"Accepting cookies with selector: {consent_selector}")
                         await consent.click()
-                        await page.wait_for_timeout(1000)
+                        await consent.first.wait_for(state="hidden", timeout=2000)
                         break
                 except Exception:
                     pass
             
-            # Wait for page to stabilize
-            await page.wait_for_timeout(2000)
+            # Wait for the competitions to render
+            await readiness.wait()
             
             return True
         
         except Exception as e:
             logger.error(f"Error navigating to soccer: {str(e)}")
             return False
+        
+        finally:
+            readiness.detach()
 
     async def _get_soccer_competitions(self, page: Page) -> List[Dict[str, str]]:
         """
@@ -235,9 +247,12 @@ class SportsbetScraper(BaseScraper):
                             comp_link = await comp_link_element.get_attribute("href") if comp_link_element else None
                             
                             if comp_link:
+                                # The prices shown on the card tell whether the event page has to be parsed again
+                                prices = await comp.locator(LISTING_PRICE_SELECTOR).all_inner_texts()
                                 competitions.append({
                                     "name": comp_name,
-                                    "url": comp_link if comp_link.startswith("http") else f"{self.base_url}{comp_link}"
+                                    "url": comp_link if comp_link.startswith("http") else f"{self.base_url}{comp_link}",
+                                    "odds_hash": hash_listing_odds(prices)
                                 })
                         
                         except Exception as e:
@@ -301,9 +316,15 @@ class SportsbetScraper(BaseScraper):
         Returns:
             Event object if successful, None otherwise
         """
+        # Record the odds API responses while the page loads
+        capture = self.create_response_capture()
+        if capture:
+            capture.attach(page)
+        readiness = PageReadiness(page, "event")
+        
         try:
             logger.info(f"Navigating to event: {url}")
-            await page.goto(url, wait_until="domcontentloaded", timeout=20000)
+            await self.goto(page, url, wait_until="domcontentloaded", timeout=20000)
             
             # Get page title
             title = await page.title()
@@ -313,8 +334,12 @@ class SportsbetScraper(BaseScraper):
             event_name_for_file = re.sub(r'[^\w\-_]', '_', title[:30])
             await self._save_screenshot(page, f"event_{event_name_for_file}")
             
-            # Wait for content to load
-            await page.wait_for_timeout(1000)
+            # Wait until the page has settled; the DOM only has to be ready without captured odds
+            await readiness.wait_for_network_quiet()
+            if capture:
+                await capture.wait_idle()
+            if not (capture and capture.payloads):
+                await readiness.wait_for_content()
             
             # Get event name from title
             event_name = title.split(" Betting Odds")[0] if " Betting Odds" in title else title
@@ -336,260 +361,277 @@ class SportsbetScraper(BaseScraper):
                 competition_name = "Unknown"
             logger.info(f"Extracted competition: {competition_name}")
             
-            # Get start time - for now just use current time
-            start_time = datetime.now()
+            # Get start time - use the odds API value when it was captured
+            start_time = None
             
-            # Get markets - simplified approach
+            # Get markets - prefer the odds the page loaded from the bookmaker's JSON API
             markets = []
+            if capture:
+                await capture.wait_idle()
+                markets = parse_markets(capture.payloads)
+                start_time = parse_start_time(capture.payloads)
+                if markets:
+                    logger.info(f"Parsed {len(markets)} markets from captured odds API responses")
             
-            # Extract markets using JavaScript evaluation
-            try:
-                # First, get all available elements for debugging
-                page_info = await page.evaluate("""
-                    () => {
-                        const info = {
-                            title: document.title,
-                            bodyText: document.body.textContent.substring(0, 500),
-                            selectors: {}
-                        };
+            # Fall back to the DOM when the API responses had nothing usable
+            if not markets:
+                logger.info("No captured odds API data, extracting markets from the DOM")
+                
+                # Extract markets using JavaScript evaluation
+                try:
+                    # First, get all available elements for debugging
+                    page_info = await page.evaluate("""
+                        () => {
+                            const info = {
+                                title: document.title,
+                                bodyText: document.body.textContent.substring(0, 500),
+                                selectors: {}
+                            };
                         
-                        // Check common selectors
-                        const selectors = [
-                            '[data-automation-id*="market"]',
-                            '.market-container',
-                            '.market-group',
-                            '[data-automation-id*="outcome"]',
-                            '.outcome-button',
-                            '.price-button'
-                        ];
+                            // Check common selectors
+                            const selectors = [
+                                '[data-automation-id*="market"]',
+                                '.market-container',
+                                '.market-group',
+                                '[data-automation-id*="outcome"]',
+                                '.outcome-button',
+                                '.price-button'
+                            ];
                         
-                        selectors.forEach(selector => {
-                            const elements = document.querySelectorAll(selector);
-                            info.selectors[selector] = elements.length;
-                        });
+                            selectors.forEach(selector => {
+                                const elements = document.querySelectorAll(selector);
+                                info.selectors[selector] = elements.length;
+                            });
                         
-                        // Get basic structure
-                        const mainElements = Array.from(document.body.children)
-                            .map(el => ({
-                                tag: el.tagName,
-                                id: el.id,
-                                className: el.className,
-                                childCount: el.children.length
-                            }));
+                            // Get basic structure
+                            const mainElements = Array.from(document.body.children)
+                                .map(el => ({
+                                    tag: el.tagName,
+                                    id: el.id,
+                                    className: el.className,
+                                    childCount: el.children.length
+                                }));
                         
-                        info.structure = mainElements;
+                            info.structure = mainElements;
                         
-                        return info;
-                    }
-                """)
+                            return info;
+                        }
+                    """)
                 
-                logger.info(f"Page structure info: {json.dumps(page_info, indent=2)}")
+                    logger.info(f"Page structure info: {json.dumps(page_info, indent=2)}")
                 
-                # Try to get market data with more generic selectors
-                market_data = await page.evaluate("""
-                    () => {
-                        const markets = [];
-                        // Find any element that might be a market
-                        // First try specific selectors
-                        let marketElements = document.querySelectorAll('[data-automation-id*="market"], .market-container, .market-group, .betting-option');
+                    # Try to get market data with more generic selectors
+                    market_data = await page.evaluate("""
+                        () => {
+                            const markets = [];
+                            // Find any element that might be a market
+                            // First try specific selectors
+                            let marketElements = document.querySelectorAll('[data-automation-id*="market"], .market-container, .market-group, .betting-option');
                         
-                        console.log("Found " + marketElements.length + " potential market elements");
+                            console.log("Found " + marketElements.length + " potential market elements");
                         
-                        // If nothing found, try a broader approach (look for anything with odds/prices)
-                        if (marketElements.length === 0) {
-                            const priceElements = document.querySelectorAll('[data-automation-id*="price"], .price-text, .odds-text');
-                            console.log("Found " + priceElements.length + " price elements");
+                            // If nothing found, try a broader approach (look for anything with odds/prices)
+                            if (marketElements.length === 0) {
+                                const priceElements = document.querySelectorAll('[data-automation-id*="price"], .price-text, .odds-text');
+                                console.log("Found " + priceElements.length + " price elements");
                             
-                            // Look for parent containers of price elements
-                            const marketContainers = new Set();
-                            priceElements.forEach(el => {
-                                // Go up 3 levels to find potential market container
-                                let parent = el.parentElement;
-                                for (let i = 0; i < 3 && parent; i++) {
-                                    if (parent.children.length > 2) {
-                                        marketContainers.add(parent);
-                                        break;
+                                // Look for parent containers of price elements
+                                const marketContainers = new Set();
+                                priceElements.forEach(el => {
+                                    // Go up 3 levels to find potential market container
+                                    let parent = el.parentElement;
+                                    for (let i = 0; i < 3 && parent; i++) {
+                                        if (parent.children.length > 2) {
+                                            marketContainers.add(parent);
+                                            break;
+                                        }
+                                        parent = parent.parentElement;
                                     }
-                                    parent = parent.parentElement;
-                                }
-                            });
+                                });
                             
-                            marketElements = Array.from(marketContainers);
-                            console.log("Found " + marketElements.length + " potential market containers from prices");
-                        }
+                                marketElements = Array.from(marketContainers);
+                                console.log("Found " + marketElements.length + " potential market containers from prices");
+                            }
                         
-                        // Process market elements
-                        for (const market of marketElements) {
-                            try {
-                                // Try to find market name - look at nearby headings or labels
-                                let marketName = "Unknown Market";
-                                const nameEls = market.querySelectorAll('h1, h2, h3, h4, h5, [data-automation-id*="name"], [data-automation-id*="title"], .market-name');
-                                if (nameEls.length > 0) {
-                                    marketName = nameEls[0].textContent.trim();
-                                } else {
-                                    // Try to infer market type based on patterns of odds (especially for sports betting)
-                                    // We'll determine common market types after scanning outcomes
-                                }
+                            // Process market elements
+                            for (const market of marketElements) {
+                                try {
+                                    // Try to find market name - look at nearby headings or labels
+                                    let marketName = "Unknown Market";
+                                    const nameEls = market.querySelectorAll('h1, h2, h3, h4, h5, [data-automation-id*="name"], [data-automation-id*="title"], .market-name');
+                                    if (nameEls.length > 0) {
+                                        marketName = nameEls[0].textContent.trim();
+                                    } else {
+                                        // Try to infer market type based on patterns of odds (especially for sports betting)
+                                        // We'll determine common market types after scanning outcomes
+                                    }
                                 
-                                // Get outcomes - look for elements with price information
-                                const outcomes = [];
-                                // First try specific outcome selectors
-                                let outcomeElements = market.querySelectorAll('[data-automation-id*="outcome"], .outcome-button, .price-button, .betting-option');
+                                    // Get outcomes - look for elements with price information
+                                    const outcomes = [];
+                                    // First try specific outcome selectors
+                                    let outcomeElements = market.querySelectorAll('[data-automation-id*="outcome"], .outcome-button, .price-button, .betting-option');
                                 
-                                // If nothing found, try a more general approach - find elements with price text
-                                if (outcomeElements.length === 0) {
-                                    outcomeElements = market.querySelectorAll('[data-automation-id*="price"], .price-text, .odds-text');
-                                    // For each price element, go up one level to get the container
-                                    outcomeElements = Array.from(outcomeElements).map(el => el.parentElement);
-                                }
+                                    // If nothing found, try a more general approach - find elements with price text
+                                    if (outcomeElements.length === 0) {
+                                        outcomeElements = market.querySelectorAll('[data-automation-id*="price"], .price-text, .odds-text');
+                                        // For each price element, go up one level to get the container
+                                        outcomeElements = Array.from(outcomeElements).map(el => el.parentElement);
+                                    }
                                 
-                                for (const outcome of outcomeElements) {
-                                    try {
-                                        // Find name element
-                                        let name = "Unknown";
-                                        const nameEls = outcome.querySelectorAll('[data-automation-id*="name"], .outcome-name, .selection-name, span:not(.price-text):not(.odds-text)');
-                                        if (nameEls.length > 0) {
-                                            name = nameEls[0].textContent.trim();
-                                        } else {
-                                            // If no name element found, create name based on index
-                                            // For horse racing, it's often just Runner 1, Runner 2, etc.
-                                            name = "Selection " + (outcomes.length + 1);
-                                        }
+                                    for (const outcome of outcomeElements) {
+                                        try {
+                                            // Find name element
+                                            let name = "Unknown";
+                                            const nameEls = outcome.querySelectorAll('[data-automation-id*="name"], .outcome-name, .selection-name, span:not(.price-text):not(.odds-text)');
+                                            if (nameEls.length > 0) {
+                                                name = nameEls[0].textContent.trim();
+                                            } else {
+                                                // If no name element found, create name based on index
+                                                // For horse racing, it's often just Runner 1, Runner 2, etc.
+                                                name = "Selection " + (outcomes.length + 1);
+                                            }
                                         
-                                        // Find price element
-                                        let price = null;
-                                        const priceEls = outcome.querySelectorAll('[data-automation-id*="price"], .price-text, .odds-text');
-                                        if (priceEls.length > 0) {
-                                            const priceText = priceEls[0].textContent.trim().replace('$', '');
-                                            price = parseFloat(priceText);
-                                        }
+                                            // Find price element
+                                            let price = null;
+                                            const priceEls = outcome.querySelectorAll('[data-automation-id*="price"], .price-text, .odds-text');
+                                            if (priceEls.length > 0) {
+                                                const priceText = priceEls[0].textContent.trim().replace('$', '');
+                                                price = parseFloat(priceText);
+                                            }
                                         
-                                        if (price !== null && !isNaN(price) && price > 1.0) {
-                                            outcomes.push({
-                                                name: name,
-                                                odds: price
-                                            });
+                                            if (price !== null && !isNaN(price) && price > 1.0) {
+                                                outcomes.push({
+                                                    name: name,
+                                                    odds: price
+                                                });
+                                            }
+                                        } catch (e) {
+                                            console.error('Error parsing outcome:', e);
                                         }
-                                    } catch (e) {
-                                        console.error('Error parsing outcome:', e);
                                     }
-                                }
                                 
-                                if (outcomes.length > 0) {
-                                    markets.push({
-                                        name: marketName,
-                                        outcomes: outcomes
-                                    });
+                                    if (outcomes.length > 0) {
+                                        markets.push({
+                                            name: marketName,
+                                            outcomes: outcomes
+                                        });
+                                    }
+                                } catch (e) {
+                                    console.error('Error parsing market:', e);
                                 }
-                            } catch (e) {
-                                console.error('Error parsing market:', e);
                             }
-                        }
                         
-                        return markets;
-                    }
-                """)
+                            return markets;
+                        }
+                    """)
                 
-                # Process the market data into our models
-                for i, market_dict in enumerate(market_data):
-                    market_name = market_dict.get("name", f"Market {i+1}")
-                    market_type = MarketType.OTHER
+                    # Process the market data into our models
+                    for i, market_dict in enumerate(market_data):
+                        market_name = market_dict.get("name", f"Market {i+1}")
+                        market_type = MarketType.OTHER
                     
-                    # Create outcomes
-                    outcomes = []
-                    for outcome_dict in market_dict.get("outcomes", []):
-                        outcome_name = outcome_dict.get("name", "Unknown")
-                        odds = outcome_dict.get("odds", 0.0)
-                        outcomes.append(Outcome(name=outcome_name, odds=odds))
+                        # Create outcomes
+                        outcomes = []
+                        for outcome_dict in market_dict.get("outcomes", []):
+                            outcome_name = outcome_dict.get("name", "Unknown")
+                            odds = outcome_dict.get("odds", 0.0)
+                            outcomes.append(Outcome(name=outcome_name, odds=odds))
                     
-                    # Try to determine market type based on outcome count/pattern
-                    if len(outcomes) == 2:
-                        # Could be Win/Draw/Win or Head-to-Head
-                        market_type = MarketType.MONEYLINE
-                        if market_name == "Unknown Market":
-                            market_name = "Head to Head"
-                    elif len(outcomes) == 3:
-                        # Likely 1X2 market (Win/Draw/Win)
-                        market_type = MarketType.WIN
-                        if market_name == "Unknown Market":
-                            market_name = "Match Result"
-                    elif "over" in market_name.lower() or "under" in market_name.lower():
-                        market_type = MarketType.TOTAL_OVER_UNDER
-                    elif "handicap" in market_name.lower() or "spread" in market_name.lower():
-                        market_type = MarketType.HANDICAP
+                        # Try to determine market type based on outcome count/pattern
+                        if len(outcomes) == 2:
+                            # Could be Win/Draw/Win or Head-to-Head
+                            market_type = MarketType.MONEYLINE
+                            if market_name == "Unknown Market":
+                                market_name = "Head to Head"
+                        elif len(outcomes) == 3:
+                            # Likely 1X2 market (Win/Draw/Win)
+                            market_type = MarketType.WIN
+                            if market_name == "Unknown Market":
+                                market_name = "Match Result"
+                        elif "over" in market_name.lower() or "under" in market_name.lower():
+                            market_type = MarketType.TOTAL_OVER_UNDER
+                        elif "handicap" in market_name.lower() or "spread" in market_name.lower():
+                            market_type = MarketType.HANDICAP
                     
-                    # For horse racing, use specialized market types
-                    elif any(term in market_name.lower() for term in ["place"]):
-                        market_type = MarketType.PLACE
-                    elif any(term in market_name.lower() for term in ["each way", "e/w"]):
-                        market_type = MarketType.EACH_WAY
-                    elif any(term in market_name.lower() for term in ["quinella", "quin"]):
-                        market_type = MarketType.QUINELLA
-                    elif any(term in market_name.lower() for term in ["exacta", "forecast"]):
-                        market_type = MarketType.EXACTA
-                    elif any(term in market_name.lower() for term in ["trifecta", "tricast"]):
-                        market_type = MarketType.TRIFECTA
-                    # This should be after the other horse racing market checks
-                    elif any(term in market_name.lower() for term in ["win"]) or (market_name == "Unknown Market" and event_name and any(term in event_name.lower() for term in ["race", "racing"])):
-                        market_name = "Win"
-                        market_type = MarketType.WIN
+                        # For horse racing, use specialized market types
+                        elif any(term in market_name.lower() for term in ["place"]):
+                            market_type = MarketType.PLACE
+                        elif any(term in market_name.lower() for term in ["each way", "e/w"]):
+                            market_type = MarketType.EACH_WAY
+                        elif any(term in market_name.lower() for term in ["quinella", "quin"]):
+                            market_type = MarketType.QUINELLA
+                        elif any(term in market_name.lower() for term in ["exacta", "forecast"]):
+                            market_type = MarketType.EXACTA
+                        elif any(term in market_name.lower() for term in ["trifecta", "tricast"]):
+                            market_type = MarketType.TRIFECTA
+                        # This should be after the other horse racing market checks
+                        elif any(term in market_name.lower() for term in ["win"]) or (market_name == "Unknown Market" and event_name and any(term in event_name.lower() for term in ["race", "racing"])):
+                            market_name = "Win"
+                            market_type = MarketType.WIN
                     
-                    # Add market if it has outcomes
-                    if outcomes:
-                        market_id = f"{market_name.lower().replace(' ', '_')}_{i}"
-                        markets.append(Market(
-                            id=market_id,
-                            type=market_type,
-                            name=market_name,
-                            outcomes=outcomes
-                        ))
-                        logger.info(f"Added market: {market_name} with {len(outcomes)} outcomes")
+                        # Add market if it has outcomes
+                        if outcomes:
+                            market_id = f"{market_name.lower().replace(' ', '_')}_{i}"
+                            markets.append(Market(
+                                id=market_id,
+                                type=market_type,
+                                name=market_name,
+                                outcomes=outcomes,
+                                line=determine_market_line(market_type, market_name)
+                            ))
+                            logger.info(f"Added market: {market_name} with {len(outcomes)} outcomes")
             
-        except Exception as e:
-            logger.error(f"Error extracting markets with JavaScript: {str(e)}")
+                except Exception as e:
+                    logger.error(f"Error extracting markets with JavaScript: {str(e)}")
         
-        if not markets:
-            logger.warning(f"No markets found for event: {url}")
-            return None
+            if not markets:
+                logger.warning(f"No markets found for event: {url}")
+                return None
         
-        # Create unique ID for the event
-        event_id = f"sportsbet_{url.split('/')[-1]}"
+            # Create unique ID for the event
+            event_id = f"sportsbet_{url.split('/')[-1]}"
         
-        # Determine the sport type from the URL
-        sport_type = SportType.SOCCER  # Default sport type
-        if "horse-racing" in url:
-            sport_type = SportType.HORSE_RACING
-        elif "harness-racing" in url:
-            sport_type = SportType.HORSE_RACING  # Use horse racing as a fallback
-        elif "greyhound" in url:
-            sport_type = SportType.OTHER
-        elif "basketball" in url:
-            sport_type = SportType.BASKETBALL
-        elif "tennis" in url:
-            sport_type = SportType.TENNIS
-        elif "cricket" in url:
-            sport_type = SportType.CRICKET
-        elif "rugby" in url:
-            sport_type = SportType.RUGBY
-        elif "afl" in url or "australian-rules" in url:
-            sport_type = SportType.AFL
+            # Determine the sport type from the URL
+            sport_type = SportType.SOCCER  # Default sport type
+            if "horse-racing" in url:
+                sport_type = SportType.HORSE_RACING
+            elif "harness-racing" in url:
+                sport_type = SportType.HORSE_RACING  # Use horse racing as a fallback
+            elif "greyhound" in url:
+                sport_type = SportType.OTHER
+            elif "basketball" in url:
+                sport_type = SportType.BASKETBALL
+            elif "tennis" in url:
+                sport_type = SportType.TENNIS
+            elif "cricket" in url:
+                sport_type = SportType.CRICKET
+            elif "rugby" in url:
+                sport_type = SportType.RUGBY
+            elif "afl" in url or "australian-rules" in url:
+                sport_type = SportType.AFL
         
-        # Create and return the event
-        return Event(
-            id=event_id,
-            sport=sport_type,
-            home_team=home_team,
-            away_team=away_team,
-            competition=competition_name,
-            start_time=start_time,
-            markets=markets,
-            bookmaker=self.bookmaker,
-            url=url
-        )
+            # Create and return the event
+            return Event(
+                id=event_id,
+                sport=sport_type,
+                home_team=home_team,
+                away_team=away_team,
+                competition=competition_name,
+                start_time=start_time or datetime.now(),
+                markets=markets,
+                bookmaker=self.bookmaker,
+                url=url,
+                start_time_known=start_time is not None
+            )
     
-    except Exception as e:
-        logger.error(f"Error parsing event page: {str(e)}")
-        return None
+        except Exception as e:
+            logger.error(f"Error parsing event page: {str(e)}")
+            return None
+        
+        finally:
+            readiness.detach()
+            if capture:
+                capture.detach()
 
     async def scrape_sport(self, sport: SportType) -> List[Event]:
         """
@@ -627,33 +669,35 @@ class SportsbetScraper(BaseScraper):
             # Get soccer competitions/events
             competitions = await self._get_soccer_competitions(page)
             
-            # Process a limited number of event links
+            # Process a limited number of event links, skipping the ones unchanged since the last cycle
             max_events = min(len(competitions), 10)
-            logger.info(f"Processing {max_events} event links")
+            to_parse, unchanged = self.select_changed_events(competitions[:max_events])
+            events.extend(unchanged)
+            logger.info(f"Processing {len(to_parse)} of {max_events} event links over {self.max_concurrent_pages} pages")
             
-            for i in range(max_events):
-                event_url = competitions[i]["url"]
-                event = await self._parse_event_page(page, event_url)
-                
-                if event:
-                    events.append(event)
-                    # Save debug info (but not the full event object)
-                    debug_file = os.path.join(self.debug_dir, f"event_{event.id}.json")
-                    with open(debug_file, "w") as f:
-                        # Create a simplified dict representation for debugging
-                        event_debug = {
-                            "id": event.id,
-                            "sport": event.sport.name,
-                            "home_team": event.home_team,
-                            "away_team": event.away_team,
-                            "competition": event.competition,
-                            "url": event.url,
-                            "market_count": len(event.markets)
-                        }
-                        json.dump(event_debug, f, indent=2, default=str)
-                
-                # Small delay between requests
-                await asyncio.sleep(1)
+            async def parse_listing(event_page: Page, listing: Dict[str, str]) -> Optional[Event]:
+                return await self._parse_event_page(event_page, listing["url"])
+            
+            # Event pages are fetched concurrently; results arrive as each page finishes
+            async with aclosing(self.scrape_concurrently(to_parse, parse_listing, self._context)) as results:
+                async for listing, event in results:
+                    if event:
+                        self.record_event(listing, event)
+                        events.append(event)
+                        # Save debug info (but not the full event object)
+                        debug_file = os.path.join(self.debug_dir, f"event_{event.id}.json")
+                        with open(debug_file, "w") as f:
+                            # Create a simplified dict representation for debugging
+                            event_debug = {
+                                "id": event.id,
+                                "sport": event.sport.name,
+                                "home_team": event.home_team,
+                                "away_team": event.away_team,
+                                "competition": event.competition,
+                                "url": event.url,
+                                "market_count": len(event.markets)
+                            }
+                            json.dump(event_debug, f, indent=2, default=str)
             
             # Close the page
             await page.close()
@@ -678,10 +722,11 @@ class SportsbetScraper(BaseScraper):
         events = []
         horse_racing_url = f"{self.base_url}/horse-racing"
         
+        readiness = PageReadiness(page, "racing_listing")
         try:
             # Navigate to horse racing page
             logger.info(f"Navigating to horse racing: {horse_racing_url}")
-            await page.goto(horse_racing_url, wait_until="domcontentloaded", timeout=30000)
+            await self.goto(page, horse_racing_url, wait_until="domcontentloaded", timeout=30000)
             await self._save_screenshot(page, "horse_racing_main")
             
             # Handle cookie consent if needed
@@ -697,13 +742,14 @@ class SportsbetScraper(BaseScraper):
                     if await consent.count() > 0:
                         logger.info(f"Accepting cookies with selector: {consent_selector}")
                         await consent.click()
-                        await page.wait_for_timeout(1000)
+                        await consent.first.wait_for(state="hidden", timeout=2000)
                         break
                 except Exception:
                     pass
             
-            # Wait for page to load
-            await page.wait_for_timeout(2000)
+            # Wait for the meetings to render
+            await readiness.wait()
+            readiness.detach()
             
             # Find all race meetings
             race_meetings = []
@@ -797,33 +843,32 @@ class SportsbetScraper(BaseScraper):
             
             # Limit the number of races to process to avoid overloading
             max_races = min(len(race_meetings), 10)
+            to_parse, unchanged = self.select_changed_events(race_meetings[:max_races])
+            events.extend(unchanged)
             
-            # Process each race by navigating to its page
-            for i in range(max_races):
-                race = race_meetings[i]
-                race_url = race["url"]
-                
-                logger.info(f"Processing race {i+1}/{max_races}: {race['race_name']} at {race['meeting']}")
-                event = await self._parse_horse_race(page, race_url, race["meeting"], race["race_name"])
-                
-                if event:
-                    events.append(event)
+            # Process the race pages concurrently, each race on its own pooled page
+            async def parse_race(race_page: Page, race: Dict[str, str]) -> Optional[Event]:
+                logger.info(f"Processing race: {race['race_name']} at {race['meeting']}")
+                return await self._parse_horse_race(race_page, race["url"], race["meeting"], race["race_name"])
+            
+            async with aclosing(self.scrape_concurrently(to_parse, parse_race, self._context)) as results:
+                async for race, event in results:
+                    if event:
+                        self.record_event(race, event)
+                        events.append(event)
                     
-                    # Save debug info
-                    debug_file = os.path.join(self.debug_dir, f"race_{event.id}.json")
-                    with open(debug_file, "w") as f:
-                        # Create a simplified dict representation for debugging
-                        event_debug = {
-                            "id": event.id,
-                            "name": event.home_team,
-                            "meeting": event.competition,
-                            "url": event.url,
-                            "market_count": len(event.markets)
-                        }
-                        json.dump(event_debug, f, indent=2, default=str)
-                
-                # Small delay between requests
-                await asyncio.sleep(1)
+                        # Save debug info
+                        debug_file = os.path.join(self.debug_dir, f"race_{event.id}.json")
+                        with open(debug_file, "w") as f:
+                            # Create a simplified dict representation for debugging
+                            event_debug = {
+                                "id": event.id,
+                                "name": event.home_team,
+                                "meeting": event.competition,
+                                "url": event.url,
+                                "market_count": len(event.markets)
+                            }
+                            json.dump(event_debug, f, indent=2, default=str)
         
         except Exception as e:
             logger.error(f"Error scraping horse racing: {str(e)}")
@@ -844,219 +889,239 @@ class SportsbetScraper(BaseScraper):
         Returns:
             Event object if successful, None otherwise
         """
+        # Record the odds API responses while the page loads
+        capture = self.create_response_capture()
+        if capture:
+            capture.attach(page)
+        readiness = PageReadiness(page, "race")
+        
         try:
             logger.info(f"Navigating to race: {race_url}")
-            await page.goto(race_url, wait_until="domcontentloaded", timeout=30000)
+            await self.goto(page, race_url, wait_until="domcontentloaded", timeout=30000)
             
-            # Wait for page to load
-            await page.wait_for_timeout(2000)
+            # Wait until the page has settled; the DOM only has to be ready without captured odds
+            await readiness.wait_for_network_quiet()
+            if capture:
+                await capture.wait_idle()
+            if not (capture and capture.payloads):
+                await readiness.wait_for_content()
             
             # Take screenshot for debugging
             race_name_file = re.sub(r'[^\w\-_]', '_', race_name[:30])
             await self._save_screenshot(page, f"race_{race_name_file}")
             
-            # Extract detailed race information using JavaScript
-            race_data = await page.evaluate("""
-                () => {
-                    const data = {
-                        raceName: document.title.split(" - ")[0] || document.title,
-                        raceNumber: null,
-                        raceTime: null,
-                        venue: null,
-                        runnerCount: 0,
-                        runners: [],
-                        markets: []
-                    };
+            # Prefer the runners and prices the page loaded from the bookmaker's JSON API
+            captured_markets = []
+            if capture:
+                await capture.wait_idle()
+                captured_markets = parse_markets(capture.payloads)
+            
+            race_data = {}
+            if captured_markets:
+                logger.info(f"Parsed {len(captured_markets)} markets from captured odds API responses")
+            else:
+                # Extract detailed race information using JavaScript
+                race_data = await page.evaluate("""
+                    () => {
+                        const data = {
+                            raceName: document.title.split(" - ")[0] || document.title,
+                            raceNumber: null,
+                            raceTime: null,
+                            venue: null,
+                            runnerCount: 0,
+                            runners: [],
+                            markets: []
+                        };
                     
-                    // Try to get race number from title or content
-                    const raceNumberMatch = data.raceName.match(/Race (\d+)/i);
-                    if (raceNumberMatch) {
-                        data.raceNumber = raceNumberMatch[1];
-                    }
+                        // Try to get race number from title or content
+                        const raceNumberMatch = data.raceName.match(/Race (\d+)/i);
+                        if (raceNumberMatch) {
+                            data.raceNumber = raceNumberMatch[1];
+                        }
                     
-                    // Try to extract venue from URL or page content
-                    const pathParts = window.location.pathname.split('/');
-                    for (const part of pathParts) {
-                        if (part && !['horse-racing', 'race'].includes(part) && !part.startsWith('race-')) {
-                            data.venue = part.replace(/-/g, ' ').replace(/\\b\\w/g, c => c.toUpperCase());
-                            break;
+                        // Try to extract venue from URL or page content
+                        const pathParts = window.location.pathname.split('/');
+                        for (const part of pathParts) {
+                            if (part && !['horse-racing', 'race'].includes(part) && !part.startsWith('race-')) {
+                                data.venue = part.replace(/-/g, ' ').replace(/\\b\\w/g, c => c.toUpperCase());
+                                break;
+                            }
                         }
-                    }
                     
-                    // Try to get race time
-                    const timeElements = document.querySelectorAll('[data-automation-id*="time"], .race-time, time');
-                    if (timeElements.length > 0) {
-                        data.raceTime = timeElements[0].textContent.trim();
-                    }
+                        // Try to get race time
+                        const timeElements = document.querySelectorAll('[data-automation-id*="time"], .race-time, time');
+                        if (timeElements.length > 0) {
+                            data.raceTime = timeElements[0].textContent.trim();
+                        }
                     
-                    // Extract runners - find the table or list of runners
-                    const runnerElements = document.querySelectorAll('[data-automation-id*="runner"], .runner-row, .runner-item, .betting-option-table tr');
-                    data.runnerCount = runnerElements.length;
+                        // Extract runners - find the table or list of runners
+                        const runnerElements = document.querySelectorAll('[data-automation-id*="runner"], .runner-row, .runner-item, .betting-option-table tr');
+                        data.runnerCount = runnerElements.length;
                     
-                    runnerElements.forEach((runner, index) => {
-                        try {
-                            const runnerData = {
-                                number: index + 1,
-                                name: "Unknown Runner",
-                                jockey: null,
-                                trainer: null,
-                                barrier: null,
-                                weight: null,
-                                silkUrl: null,
-                                odds: {}
-                            };
+                        runnerElements.forEach((runner, index) => {
+                            try {
+                                const runnerData = {
+                                    number: index + 1,
+                                    name: "Unknown Runner",
+                                    jockey: null,
+                                    trainer: null,
+                                    barrier: null,
+                                    weight: null,
+                                    silkUrl: null,
+                                    odds: {}
+                                };
                             
-                            // Extract runner number if available
-                            const numberElements = runner.querySelectorAll('[data-automation-id*="number"], .runner-number');
-                            if (numberElements.length > 0) {
-                                const numberText = numberElements[0].textContent.trim();
-                                const numberMatch = numberText.match(/\\d+/);
-                                if (numberMatch) {
-                                    runnerData.number = parseInt(numberMatch[0]);
+                                // Extract runner number if available
+                                const numberElements = runner.querySelectorAll('[data-automation-id*="number"], .runner-number');
+                                if (numberElements.length > 0) {
+                                    const numberText = numberElements[0].textContent.trim();
+                                    const numberMatch = numberText.match(/\\d+/);
+                                    if (numberMatch) {
+                                        runnerData.number = parseInt(numberMatch[0]);
+                                    }
                                 }
-                            }
                             
-                            // Extract runner name
-                            const nameElements = runner.querySelectorAll('[data-automation-id*="name"], .runner-name, .horse-name');
-                            if (nameElements.length > 0) {
-                                runnerData.name = nameElements[0].textContent.trim();
-                            }
-                            
-                            // Extract jockey if available
-                            const jockeyElements = runner.querySelectorAll('[data-automation-id*="jockey"], .jockey-name');
-                            if (jockeyElements.length > 0) {
-                                runnerData.jockey = jockeyElements[0].textContent.trim();
-                            }
+                                // Extract runner name
+                                const nameElements = runner.querySelectorAll('[data-automation-id*="name"], .runner-name, .horse-name');
+                                if (nameElements.length > 0) {
+                                    runnerData.name = nameElements[0].textContent.trim();
+                                }
                             
-                            // Extract trainer if available
-                            const trainerElements = runner.querySelectorAll('[data-automation-id*="trainer"], .trainer-name');
-                            if (trainerElements.length > 0) {
-                                runnerData.trainer = trainerElements[0].textContent.trim();
-                            }
+                                // Extract jockey if available
+                                const jockeyElements = runner.querySelectorAll('[data-automation-id*="jockey"], .jockey-name');
+                                if (jockeyElements.length > 0) {
+                                    runnerData.jockey = jockeyElements[0].textContent.trim();
+                                }
                             
-                            // Extract barrier if available
-                            const barrierElements = runner.querySelectorAll('[data-automation-id*="barrier"], .barrier');
-                            if (barrierElements.length > 0) {
-                                const barrierText = barrierElements[0].textContent.trim();
-                                const barrierMatch = barrierText.match(/\\d+/);
-                                if (barrierMatch) {
-                                    runnerData.barrier = parseInt(barrierMatch[0]);
+                                // Extract trainer if available
+                                const trainerElements = runner.querySelectorAll('[data-automation-id*="trainer"], .trainer-name');
+                                if (trainerElements.length > 0) {
+                                    runnerData.trainer = trainerElements[0].textContent.trim();
                                 }
-                            }
                             
-                            // Extract weight if available
-                            const weightElements = runner.querySelectorAll('[data-automation-id*="weight"], .weight');
-                            if (weightElements.length > 0) {
-                                runnerData.weight = weightElements[0].textContent.trim();
-                            }
+                                // Extract barrier if available
+                                const barrierElements = runner.querySelectorAll('[data-automation-id*="barrier"], .barrier');
+                                if (barrierElements.length > 0) {
+                                    const barrierText = barrierElements[0].textContent.trim();
+                                    const barrierMatch = barrierText.match(/\\d+/);
+                                    if (barrierMatch) {
+                                        runnerData.barrier = parseInt(barrierMatch[0]);
+                                    }
+                                }
                             
-                            // Try to find silk/colors image
-                            const silkElements = runner.querySelectorAll('img[src*="silk"], img[src*="color"], .silk-image');
-                            if (silkElements.length > 0) {
-                                runnerData.silkUrl = silkElements[0].src;
-                            }
+                                // Extract weight if available
+                                const weightElements = runner.querySelectorAll('[data-automation-id*="weight"], .weight');
+                                if (weightElements.length > 0) {
+                                    runnerData.weight = weightElements[0].textContent.trim();
+                                }
                             
-                            // Extract Win odds
-                            const winOddsElements = runner.querySelectorAll('[data-automation-id*="win-price"], [data-automation-id*="fixed-price"], .win-price, .fixed-price, .price-button');
-                            if (winOddsElements.length > 0) {
-                                const priceText = winOddsElements[0].textContent.trim().replace('$', '');
-                                const price = parseFloat(priceText);
-                                if (!isNaN(price) && price > 1.0) {
-                                    runnerData.odds.win = price;
+                                // Try to find silk/colors image
+                                const silkElements = runner.querySelectorAll('img[src*="silk"], img[src*="color"], .silk-image');
+                                if (silkElements.length > 0) {
+                                    runnerData.silkUrl = silkElements[0].src;
                                 }
-                            }
                             
-                            // Extract Place odds if available
-                            const placeOddsElements = runner.querySelectorAll('[data-automation-id*="place-price"], .place-price');
-                            if (placeOddsElements.length > 0) {
-                                const priceText = placeOddsElements[0].textContent.trim().replace('$', '');
-                                const price = parseFloat(priceText);
-                                if (!isNaN(price) && price > 1.0) {
-                                    runnerData.odds.place = price;
+                                // Extract Win odds
+                                const winOddsElements = runner.querySelectorAll('[data-automation-id*="win-price"], [data-automation-id*="fixed-price"], .win-price, .fixed-price, .price-button');
+                                if (winOddsElements.length > 0) {
+                                    const priceText = winOddsElements[0].textContent.trim().replace('$', '');
+                                    const price = parseFloat(priceText);
+                                    if (!isNaN(price) && price > 1.0) {
+                                        runnerData.odds.win = price;
+                                    }
                                 }
-                            }
                             
-                            data.runners.push(runnerData);
-                        } catch (e) {
-                            console.error('Error parsing runner:', e);
-                        }
-                    });
-                    
-                    // Try to identify different market types
-                    const marketTypes = ['Win', 'Place', 'Each Way', 'Quinella', 'Exacta', 'Trifecta'];
-                    const marketContainers = document.querySelectorAll('[data-automation-id*="market"], .market-container, .market-group, .tab-content, .betting-category');
-                    
-                    if (marketContainers.length === 0) {
-                        // If we didn't find specific market containers, look for market tabs
-                        const marketTabs = document.querySelectorAll('.tab, .tab-item, [role="tab"]');
-                        marketTabs.forEach(tab => {
-                            const tabText = tab.textContent.trim();
-                            // Check if this tab corresponds to a known market type
-                            const matchedMarket = marketTypes.find(marketType => 
-                                tabText.toLowerCase().includes(marketType.toLowerCase()));
+                                // Extract Place odds if available
+                                const placeOddsElements = runner.querySelectorAll('[data-automation-id*="place-price"], .place-price');
+                                if (placeOddsElements.length > 0) {
+                                    const priceText = placeOddsElements[0].textContent.trim().replace('$', '');
+                                    const price = parseFloat(priceText);
+                                    if (!isNaN(price) && price > 1.0) {
+                                        runnerData.odds.place = price;
+                                    }
+                                }
                             
-                            if (matchedMarket) {
-                                data.markets.push({
-                                    name: matchedMarket,
-                                    available: true
-                                });
+                                data.runners.push(runnerData);
+                            } catch (e) {
+                                console.error('Error parsing runner:', e);
                             }
                         });
-                    } else {
-                        // Process market containers
-                        marketContainers.forEach(container => {
-                            try {
-                                // Get market name
-                                let marketName = "Unknown";
-                                const nameEls = container.querySelectorAll('h2, h3, h4, .market-name, .market-title');
-                                if (nameEls.length > 0) {
-                                    marketName = nameEls[0].textContent.trim();
-                                }
-                                
-                                // Check if this is a known market type
+                    
+                        // Try to identify different market types
+                        const marketTypes = ['Win', 'Place', 'Each Way', 'Quinella', 'Exacta', 'Trifecta'];
+                        const marketContainers = document.querySelectorAll('[data-automation-id*="market"], .market-container, .market-group, .tab-content, .betting-category');
+                    
+                        if (marketContainers.length === 0) {
+                            // If we didn't find specific market containers, look for market tabs
+                            const marketTabs = document.querySelectorAll('.tab, .tab-item, [role="tab"]');
+                            marketTabs.forEach(tab => {
+                                const tabText = tab.textContent.trim();
+                                // Check if this tab corresponds to a known market type
                                 const matchedMarket = marketTypes.find(marketType => 
-                                    marketName.toLowerCase().includes(marketType.toLowerCase()));
-                                
+                                    tabText.toLowerCase().includes(marketType.toLowerCase()));
+                            
                                 if (matchedMarket) {
                                     data.markets.push({
                                         name: matchedMarket,
                                         available: true
                                     });
-                                } else if (marketName && marketName !== "Unknown") {
-                                    // Add any other market we found
-                                    data.markets.push({
-                                        name: marketName,
-                                        available: true
-                                    });
                                 }
-                            } catch (e) {
-                                console.error('Error parsing market container:', e);
-                            }
-                        });
-                    }
+                            });
+                        } else {
+                            // Process market containers
+                            marketContainers.forEach(container => {
+                                try {
+                                    // Get market name
+                                    let marketName = "Unknown";
+                                    const nameEls = container.querySelectorAll('h2, h3, h4, .market-name, .market-title');
+                                    if (nameEls.length > 0) {
+                                        marketName = nameEls[0].textContent.trim();
+                                    }
+                                
+                                    // Check if this is a known market type
+                                    const matchedMarket = marketTypes.find(marketType => 
+                                        marketName.toLowerCase().includes(marketType.toLowerCase()));
+                                
+                                    if (matchedMarket) {
+                                        data.markets.push({
+                                            name: matchedMarket,
+                                            available: true
+                                        });
+                                    } else if (marketName && marketName !== "Unknown") {
+                                        // Add any other market we found
+                                        data.markets.push({
+                                            name: marketName,
+                                            available: true
+                                        });
+                                    }
+                                } catch (e) {
+                                    console.error('Error parsing market container:', e);
+                                }
+                            });
+                        }
                     
-                    // If we didn't find any markets, add win market based on odds
-                    if (data.markets.length === 0 && data.runners.some(r => r.odds.win)) {
-                        data.markets.push({
-                            name: 'Win',
-                            available: true
-                        });
-                    }
+                        // If we didn't find any markets, add win market based on odds
+                        if (data.markets.length === 0 && data.runners.some(r => r.odds.win)) {
+                            data.markets.push({
+                                name: 'Win',
+                                available: true
+                            });
+                        }
                     
-                    // Add place market if we found place odds
-                    if (!data.markets.some(m => m.name === 'Place') && 
-                        data.runners.some(r => r.odds.place)) {
-                        data.markets.push({
-                            name: 'Place',
-                            available: true
-                        });
-                    }
+                        // Add place market if we found place odds
+                        if (!data.markets.some(m => m.name === 'Place') && 
+                            data.runners.some(r => r.odds.place)) {
+                            data.markets.push({
+                                name: 'Place',
+                                available: true
+                            });
+                        }
                     
-                    return data;
-                }
-            """)
+                        return data;
+                    }
+                """)
             
-            logger.info(f"Extracted race data: {json.dumps(race_data, indent=2)}")
+                logger.info(f"Extracted race data: {json.dumps(race_data, indent=2)}")
             
             # Create markets based on the data we extracted
             markets = []
@@ -1112,6 +1177,12 @@ class SportsbetScraper(BaseScraper):
                 )
                 markets.append(place_market)
             
+            # Markets parsed from the odds API replace the ones built from the DOM
+            if captured_markets:
+                markets = captured_markets
+                win_outcomes = next((m.outcomes for m in markets if m.type == MarketType.WIN), [])
+                place_outcomes = next((m.outcomes for m in markets if m.type == MarketType.PLACE), [])
+            
             # Check if we have both win and place markets for Each Way
             if win_outcomes and place_outcomes:
                 # Create a separate Each Way market (for display only - not used in calculations)
@@ -1134,6 +1205,9 @@ class SportsbetScraper(BaseScraper):
             if race_data.get("raceNumber"):
                 race_name = f"Race {race_data.get('raceNumber')} - {race_name}"
             
+            # Use the advertised start time from the odds API, current time as fallback
+            start_time = parse_start_time(capture.payloads) if capture else None
+            
             # Create the event
             event = Event(
                 id=event_id,
@@ -1141,10 +1215,11 @@ class SportsbetScraper(BaseScraper):
                 home_team=race_name,
                 away_team="",  # No away team in horse racing
                 competition=meeting_name,
-                start_time=datetime.now(),  # Use current time as fallback
+                start_time=start_time or datetime.now(),
                 markets=markets,
                 bookmaker=self.bookmaker,
-                url=race_url
+                url=race_url,
+                start_time_known=start_time is not None
             )
             
             return event
@@ -1152,6 +1227,11 @@ class SportsbetScraper(BaseScraper):
         except Exception as e:
             logger.error(f"Error parsing horse race: {str(e)}")
             return None
+        
+        finally:
+            readiness.detach()
+            if capture:
+                capture.detach()
 
     async def scrape_url(self, url: str) -> Optional[Event]:
         """
@@ -1184,16 +1264,11 @@ class SportsbetScraper(BaseScraper):
             return None
 
     async def cleanup(self) -> None:
-        """Close the browser and clean up resources."""
+        """Return the browser context to the shared pool and clean up resources."""
         logger.info(f"Closing {self.name} scraper")
         
-        if self._context:
-            await self._context.close()
-            self._context = None
-        
-        if self._browser:
-            await self._browser.close()
-            self._browser = None 
+        self._context = None
+        self._browser = None 
             
         # Call parent cleanup method
         await super().cleanup() 
\ No newline at end of file
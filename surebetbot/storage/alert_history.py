@@ -0,0 +1,183 @@
+"""
+De-duplication of arbitrage alerts.
+
+Every alerted opportunity's fingerprint is kept with an expiry time in a dict,
+so checking whether an opportunity was already alerted is one lookup. The
+fingerprint covers the event, market, line, selections, bookmakers and a
+profit bucket, so the same arb found again every cycle stays quiet until it
+expires or its profit moves into another bucket. Fingerprints are also written
+to SQLite and reloaded on start, so a restart does not re-alert everything
+that is still open.
+"""
+
+import logging
+import os
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from surebetbot.config import settings
+from surebetbot.core.models import ArbitrageOpportunity
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS alerts (
+    fingerprint TEXT PRIMARY KEY,
+    expires REAL NOT NULL,
+    event TEXT NOT NULL,
+    market TEXT NOT NULL,
+    profit REAL NOT NULL,
+    alerted REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS alerts_by_expiry ON alerts (expires);
+"""
+
+UPSERT_ALERT = """
+INSERT INTO alerts (fingerprint, expires, event, market, profit, alerted) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (fingerprint) DO UPDATE SET
+    expires = excluded.expires, profit = excluded.profit, alerted = excluded.alerted
+"""
+SELECT_ALERTS = "SELECT fingerprint, expires FROM alerts"
+DELETE_EXPIRED = "DELETE FROM alerts WHERE expires <= ?"
+
+
+class AlertHistory:
+    """
+    Fingerprints of recently alerted opportunities, in memory and in SQLite.
+    """
+
+    def __init__(
+        self,
+        path: str = settings.SQLITE_PATH,
+        ttl: timedelta = timedelta(seconds=settings.ALERT_TTL),
+        profit_step: float = settings.ALERT_PROFIT_STEP,
+    ):
+        """
+        Initialize the history. The database is opened on first use.
+
+        Args:
+            path: Database file, ":memory:" keeps nothing across restarts
+            ttl: How long an alerted opportunity stays quiet
+            profit_step: Profit change, in percentage points, that makes an opportunity new
+        """
+        self.path = path
+        self.ttl = ttl
+        self.profit_step = profit_step
+        self._connection: Optional[sqlite3.Connection] = None
+        # Fingerprint to expiry timestamp
+        self._expires: Dict[str, float] = {}
+        self._next_prune = 0.0
+
+    def __len__(self) -> int:
+        return len(self._expires)
+
+    def filter_new(
+        self,
+        opportunities: Iterable[ArbitrageOpportunity],
+        now: Optional[datetime] = None,
+    ) -> List[ArbitrageOpportunity]:
+        """
+        Keep the opportunities not alerted within the TTL, and record them as alerted.
+
+        Args:
+            opportunities: Opportunities found in a cycle
+            now: Current time, defaults to now
+
+        Returns:
+            The opportunities to alert, in their original order
+        """
+        connection = self._connect()
+        ts = (now or datetime.now()).timestamp()
+        if ts >= self._next_prune:
+            self._prune(ts)
+
+        expires = ts + self.ttl.total_seconds()
+        fresh = []
+        rows = []
+        for opportunity in opportunities:
+            fingerprint = opportunity.fingerprint(self.profit_step)
+            if self._expires.get(fingerprint, 0.0) > ts:
+                continue
+            self._expires[fingerprint] = expires
+            fresh.append(opportunity)
+            rows.append((
+                fingerprint,
+                expires,
+                opportunity.event_description,
+                opportunity.market_description,
+                opportunity.profit_percentage,
+                ts,
+            ))
+
+        if rows:
+            try:
+                with connection:
+                    connection.executemany(UPSERT_ALERT, rows)
+            except sqlite3.Error as e:
+                # Still de-duplicated in memory, only a restart would alert them again
+                logger.error(f"Error recording alerts: {str(e)}")
+        return fresh
+
+    def should_alert(self, opportunity: ArbitrageOpportunity, now: Optional[datetime] = None) -> bool:
+        """
+        Whether an opportunity was not alerted within the TTL, recording it as alerted if so.
+
+        Args:
+            opportunity: An opportunity found in a cycle
+            now: Current time, defaults to now
+
+        Returns:
+            True when it should be alerted
+        """
+        return bool(self.filter_new([opportunity], now))
+
+    def close(self) -> None:
+        """Close the database."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+            # Expired ones are pruned by the first check
+            self._expires = dict(connection.execute(SELECT_ALERTS).fetchall())
+            self._connection = connection
+            logger.info(f"Loaded {len(self._expires)} recent alerts from {self.path}")
+        return self._connection
+
+    def _prune(self, ts: float) -> None:
+        """Forget expired fingerprints, at most once per TTL."""
+        self._expires = {fingerprint: expires for fingerprint, expires in self._expires.items() if expires > ts}
+        try:
+            with self._connection:
+                self._connection.execute(DELETE_EXPIRED, (ts,))
+        except sqlite3.Error as e:
+            logger.error(f"Error pruning alerts: {str(e)}")
+        self._next_prune = ts + self.ttl.total_seconds()
+
+
+_alerts: Optional[AlertHistory] = None
+
+
+def get_alert_history() -> AlertHistory:
+    """Get the process-wide alert history, creating it on first use."""
+    global _alerts
+    if _alerts is None:
+        _alerts = AlertHistory()
+    return _alerts
+
+
+def close_alert_history() -> None:
+    """Close the process-wide alert history, if one was created."""
+    global _alerts
+    if _alerts is not None:
+        _alerts.close()
+        _alerts = None
@@ -0,0 +1,463 @@
+"""
+In-memory best-price order book across bookmakers.
+
+Every (canonical event, market type, line, market name, outcome) key holds a small indexed
+max-heap of the bookmakers' current back prices, so the best price and the
+runner-up are read in O(1) and a price update costs O(log k) for k bookmakers.
+Events are evicted once they start, as bookmakers stop listing them rather than
+withdrawing their prices.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Hashable, Iterator, List, Optional, Set, Tuple
+
+from surebetbot.core.market_keys import Line, describe_market, event_key, line_outcomes, market_key
+from surebetbot.core.matching import EventMatcher
+from surebetbot.core.models import Bookmaker, Event, MarketType, ScrapingResult
+
+logger = logging.getLogger(__name__)
+
+# (canonical event, market type, line, market name, outcome)
+BookKey = Tuple[Hashable, MarketType, Optional[Line], str, str]
+# (canonical event, market type, line, market name): the event's key and market_key() of the market
+MarketKey = Tuple[Hashable, MarketType, Optional[Line], str]
+
+
+@dataclass
+class BookmakerPrice:
+    """One bookmaker's current price for an outcome."""
+    bookmaker: Bookmaker
+    odds: float
+    outcome_name: str  # The name the bookmaker shows for the outcome
+    updated_at: datetime
+
+
+@dataclass
+class OddsDelta:
+    """A change of one bookmaker's price for one outcome."""
+    bookmaker: Bookmaker
+    market_key: MarketKey  # (canonical event, market type, line, market name)
+    outcome: str  # Outcome key within the market
+    odds: Optional[float]  # New decimal odds, None when the outcome was withdrawn or suspended
+    outcome_name: Optional[str] = None  # The name the bookmaker shows
+    timestamp: Optional[datetime] = None
+    event_description: Optional[str] = None
+    market_description: Optional[str] = None
+    start_time: Optional[datetime] = None  # None when no bookmaker showed one
+
+
+@dataclass
+class BookChange:
+    """What applying a delta did to an outcome's book."""
+    previous_best: Optional[float]
+    best: Optional[float]
+    added: bool  # The bookmaker started quoting the outcome
+    removed: bool  # The bookmaker stopped quoting the outcome
+
+
+class OutcomeBook:
+    """
+    Prices of one outcome across bookmakers, as an indexed max-heap on odds.
+    """
+
+    def __init__(self):
+        """Initialize an empty book."""
+        self._heap: List[BookmakerPrice] = []
+        self._positions: Dict[str, int] = {}  # Bookmaker id to heap position
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __iter__(self) -> Iterator[BookmakerPrice]:
+        return iter(self._heap)
+
+    def get(self, bookmaker_id: str) -> Optional[BookmakerPrice]:
+        """Get a bookmaker's current price."""
+        position = self._positions.get(bookmaker_id)
+        return self._heap[position] if position is not None else None
+
+    def best(self) -> Optional[BookmakerPrice]:
+        """The highest price, O(1)."""
+        return self._heap[0] if self._heap else None
+
+    def runner_up(self) -> Optional[BookmakerPrice]:
+        """The second highest price, O(1): one of the root's children."""
+        heap = self._heap
+        if len(heap) < 2:
+            return None
+        if len(heap) == 2 or heap[1].odds >= heap[2].odds:
+            return heap[1]
+        return heap[2]
+
+    def update(self, price: BookmakerPrice) -> None:
+        """
+        Set a bookmaker's price, O(log k).
+
+        Args:
+            price: The bookmaker's new price
+        """
+        position = self._positions.get(price.bookmaker.id)
+        if position is None:
+            self._heap.append(price)
+            position = len(self._heap) - 1
+            self._positions[price.bookmaker.id] = position
+            self._sift_up(position)
+            return
+
+        previous = self._heap[position]
+        self._heap[position] = price
+        if price.odds > previous.odds:
+            self._sift_up(position)
+        else:
+            self._sift_down(position)
+
+    def remove(self, bookmaker_id: str) -> Optional[BookmakerPrice]:
+        """
+        Remove a bookmaker's price, O(log k).
+
+        Args:
+            bookmaker_id: The bookmaker's id
+
+        Returns:
+            The removed price, None if the bookmaker had none
+        """
+        position = self._positions.pop(bookmaker_id, None)
+        if position is None:
+            return None
+
+        heap = self._heap
+        removed = heap[position]
+        last = heap.pop()
+        if position < len(heap):
+            heap[position] = last
+            self._positions[last.bookmaker.id] = position
+            self._sift_up(position)
+            self._sift_down(self._positions[last.bookmaker.id])
+        return removed
+
+    def _swap(self, i: int, j: int) -> None:
+        heap = self._heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self._positions[heap[i].bookmaker.id] = i
+        self._positions[heap[j].bookmaker.id] = j
+
+    def _sift_up(self, position: int) -> None:
+        heap = self._heap
+        while position > 0:
+            parent = (position - 1) // 2
+            if heap[position].odds <= heap[parent].odds:
+                break
+            self._swap(position, parent)
+            position = parent
+
+    def _sift_down(self, position: int) -> None:
+        heap = self._heap
+        size = len(heap)
+        while True:
+            largest = position
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < size and heap[child].odds > heap[largest].odds:
+                    largest = child
+            if largest == position:
+                return
+            self._swap(position, largest)
+            position = largest
+
+
+class OrderBookIndex:
+    """
+    Best back price per (canonical event, market type, line, market name, outcome) across bookmakers.
+    """
+
+    def __init__(self, matcher: Optional[EventMatcher] = None):
+        """
+        Initialize an empty index.
+
+        Args:
+            matcher: Matches events across bookmakers, events are keyed by exact names without one
+        """
+        self.matcher = matcher
+        self._books: Dict[BookKey, OutcomeBook] = {}
+        # Outcomes of each market, so a whole market can be read without scanning every key
+        self._markets: Dict[MarketKey, Dict[str, OutcomeBook]] = {}
+        # Keys each bookmaker priced per event, so outcomes it stopped offering can be dropped
+        self._quoted: Dict[Tuple[str, Hashable], Set[BookKey]] = {}
+        # Markets, start time and last price update of each event, so it can be evicted as a whole
+        self._event_markets: Dict[Hashable, Set[MarketKey]] = {}
+        self._starts: Dict[Hashable, datetime] = {}
+        self._updated: Dict[Hashable, datetime] = {}
+
+    def __len__(self) -> int:
+        return len(self._books)
+
+    def update(
+        self,
+        key: BookKey,
+        bookmaker: Bookmaker,
+        odds: float,
+        outcome_name: Optional[str] = None,
+        updated_at: Optional[datetime] = None,
+    ) -> None:
+        """
+        Set a bookmaker's price for an outcome.
+
+        Args:
+            key: (canonical event, market type, line, market name, outcome)
+            bookmaker: The bookmaker offering the price
+            odds: Decimal back odds
+            outcome_name: The name the bookmaker shows, defaults to the outcome key
+            updated_at: When the price was seen, defaults to now
+        """
+        book = self._books.get(key)
+        if book is None:
+            book = self._books[key] = OutcomeBook()
+            self._markets.setdefault(key[:4], {})[key[4]] = book
+            self._event_markets.setdefault(key[0], set()).add(key[:4])
+        book.update(BookmakerPrice(
+            bookmaker=bookmaker,
+            odds=odds,
+            outcome_name=outcome_name or key[4],
+            updated_at=updated_at or datetime.now()
+        ))
+
+    def remove(self, key: BookKey, bookmaker_id: str) -> None:
+        """
+        Remove a bookmaker's price for an outcome, e.g. when the selection is suspended.
+
+        Args:
+            key: (canonical event, market type, line, market name, outcome)
+            bookmaker_id: The bookmaker's id
+        """
+        book = self._books.get(key)
+        if book is None:
+            return
+        book.remove(bookmaker_id)
+        if not book:
+            del self._books[key]
+            outcomes = self._markets.get(key[:4])
+            if outcomes is not None:
+                outcomes.pop(key[4], None)
+                if not outcomes:
+                    del self._markets[key[:4]]
+                    markets = self._event_markets.get(key[0])
+                    if markets is not None:
+                        markets.discard(key[:4])
+                        if not markets:
+                            self._forget_event(key[0])
+
+    def best(self, key: BookKey) -> Optional[BookmakerPrice]:
+        """The best price of an outcome, O(1)."""
+        book = self._books.get(key)
+        return book.best() if book else None
+
+    def runner_up(self, key: BookKey) -> Optional[BookmakerPrice]:
+        """The second best price of an outcome, from another bookmaker, O(1)."""
+        book = self._books.get(key)
+        return book.runner_up() if book else None
+
+    def market(
+        self,
+        event: Hashable,
+        market_type: MarketType,
+        line: Optional[Line] = None,
+        name: str = "",
+    ) -> Dict[str, OutcomeBook]:
+        """
+        The outcome books of one market.
+
+        Args:
+            event: Canonical event key
+            market_type: The market type
+            line: Handicap or total line, None for markets without one
+            name: Market name key from market_key(), "" for main result and line markets
+
+        Returns:
+            Outcome key to OutcomeBook
+        """
+        return self._markets.get((event, market_type, line, name), {})
+
+    def best_prices(
+        self,
+        event: Hashable,
+        market_type: MarketType,
+        line: Optional[Line] = None,
+        name: str = "",
+    ) -> Dict[str, BookmakerPrice]:
+        """The best price of every outcome of one market."""
+        return {outcome: book.best() for outcome, book in self.market(event, market_type, line, name).items()}
+
+    def market_keys(self) -> Iterator[MarketKey]:
+        """Every market that has at least one price."""
+        return iter(self._markets)
+
+    def apply(self, delta: OddsDelta) -> BookChange:
+        """
+        Apply one price change.
+
+        Args:
+            delta: The change
+
+        Returns:
+            The outcome's best odds before and after, and whether the bookmaker started or stopped quoting it
+        """
+        key = (*delta.market_key, delta.outcome)
+        event = delta.market_key[0]
+        book = self._books.get(key)
+        previous_best = book.best().odds if book else None
+        had_price = book is not None and book.get(delta.bookmaker.id) is not None
+
+        if delta.odds is None:
+            self.remove(key, delta.bookmaker.id)
+            quoted = self._quoted.get((delta.bookmaker.id, event))
+            if quoted is not None:
+                quoted.discard(key)
+                if not quoted:
+                    del self._quoted[(delta.bookmaker.id, event)]
+        else:
+            self.update(key, delta.bookmaker, delta.odds, delta.outcome_name, delta.timestamp)
+            self._quoted.setdefault((delta.bookmaker.id, event), set()).add(key)
+            if delta.start_time is not None:
+                self._starts[event] = delta.start_time
+            self._updated[event] = delta.timestamp or datetime.now()
+
+        book = self._books.get(key)
+        return BookChange(
+            previous_best=previous_best,
+            best=book.best().odds if book else None,
+            added=not had_price and delta.odds is not None,
+            removed=had_price and delta.odds is None,
+        )
+
+    def event_deltas(self, event: Event, updated_at: Optional[datetime] = None) -> List[OddsDelta]:
+        """
+        The price changes a bookmaker's freshly scraped event makes to the index.
+
+        Only prices that differ from the bookmaker's current ones are returned, plus
+        removals for the outcomes it no longer offers.
+
+        Args:
+            event: A scraped event
+            updated_at: When it was scraped, defaults to now
+
+        Returns:
+            The deltas, not yet applied
+        """
+        swapped = False
+        if self.matcher is not None:
+            match = self.matcher.match(event)
+            canonical, swapped = match.canonical.id, match.swapped
+        else:
+            canonical = event_key(event)
+        bookmaker = event.bookmaker
+        description = f"{event.home_team} vs {event.away_team}" if event.away_team else event.home_team
+        updated_at = updated_at or datetime.now()
+        deltas = []
+        seen: Set[BookKey] = set()
+
+        for market in event.markets:
+            for line, outcome_id, outcome in line_outcomes(event, market, swapped):
+                if outcome.odds <= 1.0:
+                    continue
+                key = (canonical, *market_key(market, line), outcome_id)
+                seen.add(key)
+                book = self._books.get(key)
+                current = book.get(bookmaker.id) if book else None
+                if current is not None and current.odds == outcome.odds:
+                    continue
+                deltas.append(OddsDelta(
+                    bookmaker=bookmaker,
+                    market_key=key[:4],
+                    outcome=outcome_id,
+                    odds=outcome.odds,
+                    outcome_name=outcome.name,
+                    timestamp=updated_at,
+                    event_description=description,
+                    market_description=describe_market(market, line),
+                    start_time=event.start_time if event.start_time_known else None,
+                ))
+
+        # Outcomes the bookmaker no longer offers lose their price
+        for key in self._quoted.get((bookmaker.id, canonical), set()) - seen:
+            deltas.append(OddsDelta(
+                bookmaker=bookmaker, market_key=key[:4], outcome=key[4], odds=None, timestamp=updated_at
+            ))
+        return deltas
+
+    def ingest_event(self, event: Event, updated_at: Optional[datetime] = None) -> None:
+        """
+        Load a bookmaker's event into the index, replacing its previous prices for that event.
+
+        Args:
+            event: A scraped event
+            updated_at: When it was scraped, defaults to now
+        """
+        for delta in self.event_deltas(event, updated_at):
+            self.apply(delta)
+
+    def ingest_result(self, result: ScrapingResult) -> None:
+        """Load every event of a scraping result into the index."""
+        for event in result.events:
+            self.ingest_event(event, result.timestamp)
+
+    def evict_event(self, event: Hashable) -> List[MarketKey]:
+        """
+        Drop every price of an event, e.g. once it has started.
+
+        Args:
+            event: Canonical event key
+
+        Returns:
+            The markets of the event that had prices
+        """
+        markets = self._event_markets.get(event, set())
+        bookmakers: Set[str] = set()
+        for key in markets:
+            for outcome, book in self._markets.pop(key, {}).items():
+                bookmakers.update(price.bookmaker.id for price in book)
+                del self._books[(*key, outcome)]
+        for bookmaker_id in bookmakers:
+            self._quoted.pop((bookmaker_id, event), None)
+        self._forget_event(event)
+        return list(markets)
+
+    def prune(self, before: datetime, idle_before: Optional[datetime] = None) -> List[Hashable]:
+        """
+        Evict the events that started before a point in time.
+
+        Args:
+            before: Events starting earlier are evicted
+            idle_before: Events without a start time are evicted when their prices were last
+                updated earlier, kept without one
+
+        Returns:
+            The evicted events
+        """
+        expired = []
+        for event, updated in self._updated.items():
+            start_time = self._starts.get(event)
+            if start_time is not None:
+                if start_time < before:
+                    expired.append(event)
+            elif idle_before is not None and updated < idle_before:
+                expired.append(event)
+        for event in expired:
+            self.evict_event(event)
+        if expired:
+            logger.info(f"Evicted {len(expired)} started events from the order book")
+        return expired
+
+    def clear(self) -> None:
+        """Drop every price."""
+        self._books.clear()
+        self._markets.clear()
+        self._quoted.clear()
+        self._event_markets.clear()
+        self._starts.clear()
+        self._updated.clear()
+
+    def _forget_event(self, event: Hashable) -> None:
+        self._event_markets.pop(event, None)
+        self._starts.pop(event, None)
+        self._updated.pop(event, None)
@@ -0,0 +1,447 @@
+"""
+SQLite odds history.
+
+Events, markets and price ticks are kept in one SQLite database in WAL mode,
+so readers never wait for the writer. Scrapers hand whole snapshots to an
+asyncio queue without waiting; a single writer task drains it and writes each
+batch in one transaction with executemany on fixed statements, on a thread of
+its own so the event loop never blocks on disk.
+
+A tick is only written when a price differs from the last one written for that
+outcome, which an in-memory cache tells without reading the database, so the
+history grows with market activity rather than board size. Ticks older than
+SQLITE_COMPACT_AFTER are periodically folded into open/high/low/close bars.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from surebetbot.config import settings
+from surebetbot.core.models import ScrapingResult
+from surebetbot.core.snapshot import OddsSnapshot
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    bookmaker TEXT NOT NULL,
+    event_id TEXT NOT NULL,
+    sport TEXT NOT NULL,
+    home_team TEXT NOT NULL,
+    away_team TEXT NOT NULL,
+    competition TEXT NOT NULL,
+    start_time REAL NOT NULL,
+    url TEXT NOT NULL,
+    UNIQUE (bookmaker, event_id)
+);
+CREATE TABLE IF NOT EXISTS markets (
+    id INTEGER PRIMARY KEY,
+    event INTEGER NOT NULL REFERENCES events (id),
+    market_id TEXT NOT NULL,
+    type TEXT NOT NULL,
+    name TEXT NOT NULL,
+    line REAL,
+    UNIQUE (event, market_id)
+);
+CREATE TABLE IF NOT EXISTS ticks (
+    event INTEGER NOT NULL,
+    market INTEGER NOT NULL,
+    outcome TEXT NOT NULL,
+    ts REAL NOT NULL,
+    odds REAL
+);
+CREATE INDEX IF NOT EXISTS ticks_by_outcome ON ticks (event, market, outcome, ts);
+CREATE TABLE IF NOT EXISTS ohlc (
+    event INTEGER NOT NULL,
+    market INTEGER NOT NULL,
+    outcome TEXT NOT NULL,
+    start REAL NOT NULL,
+    open REAL,
+    high REAL,
+    low REAL,
+    close REAL,
+    ticks INTEGER NOT NULL,
+    PRIMARY KEY (event, market, outcome, start)
+);
+"""
+
+INSERT_EVENT = """
+INSERT INTO events (bookmaker, event_id, sport, home_team, away_team, competition, start_time, url)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (bookmaker, event_id) DO UPDATE SET start_time = excluded.start_time
+"""
+SELECT_EVENT = "SELECT id FROM events WHERE bookmaker = ? AND event_id = ?"
+INSERT_MARKET = """
+INSERT INTO markets (event, market_id, type, name, line) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (event, market_id) DO UPDATE SET name = excluded.name, line = excluded.line
+"""
+SELECT_MARKET = "SELECT id FROM markets WHERE event = ? AND market_id = ?"
+INSERT_TICK = "INSERT INTO ticks (event, market, outcome, ts, odds) VALUES (?, ?, ?, ?, ?)"
+SELECT_HISTORY = """
+SELECT ticks.ts, ticks.odds FROM ticks
+JOIN events ON events.id = ticks.event
+JOIN markets ON markets.id = ticks.market
+WHERE events.bookmaker = ? AND events.event_id = ? AND markets.market_id = ? AND ticks.outcome = ?
+    AND ticks.ts >= ?
+ORDER BY ticks.ts
+"""
+SELECT_BARS = """
+SELECT ohlc.start, ohlc.open, ohlc.high, ohlc.low, ohlc.close FROM ohlc
+JOIN events ON events.id = ohlc.event
+JOIN markets ON markets.id = ohlc.market
+WHERE events.bookmaker = ? AND events.event_id = ? AND markets.market_id = ? AND ohlc.outcome = ?
+    AND ohlc.start >= ?
+ORDER BY ohlc.start
+"""
+# Suspended ticks have NULL odds, which MIN and MAX skip but open and close keep
+COMPACT_TICKS = """
+WITH bars AS (
+    SELECT event, market, outcome, CAST(ts / :interval AS INTEGER) * :interval AS start, ts, odds
+    FROM ticks WHERE ts < :cutoff
+), framed AS (
+    SELECT event, market, outcome, start, odds,
+        FIRST_VALUE(odds) OVER bar AS open, LAST_VALUE(odds) OVER bar AS close
+    FROM bars
+    WINDOW bar AS (
+        PARTITION BY event, market, outcome, start ORDER BY ts
+        ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING
+    )
+)
+INSERT INTO ohlc (event, market, outcome, start, open, high, low, close, ticks)
+SELECT event, market, outcome, start, MIN(open), MAX(odds), MIN(odds), MIN(close), COUNT(*)
+FROM framed WHERE true
+GROUP BY event, market, outcome, start
+ON CONFLICT (event, market, outcome, start) DO UPDATE SET
+    high = MAX(COALESCE(high, excluded.high), COALESCE(excluded.high, high)),
+    low = MIN(COALESCE(low, excluded.low), COALESCE(excluded.low, low)),
+    close = excluded.close,
+    ticks = ticks + excluded.ticks
+"""
+DELETE_TICKS = "DELETE FROM ticks WHERE ts < ?"
+SELECT_STARTED = "SELECT id FROM events WHERE start_time < ?"
+
+# Closes the writer
+_STOP = object()
+
+
+class SqliteHistory:
+    """
+    Odds history in SQLite, written by one background task.
+    """
+
+    def __init__(self, path: str = settings.SQLITE_PATH, queue_size: int = settings.SQLITE_QUEUE_SIZE):
+        """
+        Initialize the store. The database is opened by start().
+
+        Args:
+            path: Database file, ":memory:" is not supported since readers use their own connection
+            queue_size: Snapshots waiting for the writer before the oldest is dropped
+        """
+        self.path = path
+        self.queue_size = queue_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+        # One thread owns the write connection, so writes are serialized without locks
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-writer")
+        self._connection: Optional[sqlite3.Connection] = None
+        self._reader: Optional[sqlite3.Connection] = None
+        # Row ids of the events and markets already written, so ticks need no lookups
+        self._event_ids: Dict[Tuple[str, str], int] = {}
+        self._market_ids: Dict[Tuple[int, str], int] = {}
+        # Last odds written per (event row, market row, outcome), None while suspended
+        self._last: Dict[Tuple[int, int, str], Optional[float]] = {}
+        self._compactor: Optional[asyncio.Task] = None
+        self.dropped = 0
+
+    async def start(self) -> None:
+        """Open the database and start the writer task."""
+        if self._writer is not None:
+            return
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._open)
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._writer = asyncio.create_task(self._write_loop())
+        if settings.SQLITE_COMPACT_EVERY > 0:
+            self._compactor = asyncio.create_task(self._compact_loop())
+        logger.info(f"Odds history at {self.path}")
+
+    def write_snapshot(self, snapshot: OddsSnapshot) -> None:
+        """
+        Queue a snapshot for writing, without waiting.
+
+        Args:
+            snapshot: A cycle's prices; it must not be modified afterwards
+        """
+        if self._queue is None:
+            raise RuntimeError("SqliteHistory.start() has not been awaited")
+        if self._queue.full():
+            # Falling behind: the oldest cycle is the least useful one
+            self._queue.get_nowait()
+            self._queue.task_done()
+            self.dropped += 1
+            logger.warning(f"Odds history writer is behind, dropped a snapshot ({self.dropped} so far)")
+        self._queue.put_nowait(snapshot)
+
+    def write_results(self, results: Iterable[ScrapingResult], timestamp: Optional[datetime] = None) -> None:
+        """Queue a cycle's scraping results for writing, without waiting."""
+        self.write_snapshot(OddsSnapshot.from_results(results, timestamp=timestamp))
+
+    async def flush(self) -> None:
+        """Wait until every queued snapshot is written."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def close(self) -> None:
+        """Write what is queued, stop the writer and close the database."""
+        if self._compactor is not None:
+            self._compactor.cancel()
+            try:
+                await self._compactor
+            except asyncio.CancelledError:
+                pass
+            self._compactor = None
+        if self._writer is not None:
+            await self._queue.put(_STOP)
+            await self._writer
+            self._writer = None
+            self._queue = None
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._close)
+
+    async def compact(self, older_than: Optional[datetime] = None, interval: Optional[timedelta] = None) -> int:
+        """
+        Fold old ticks into open/high/low/close bars and delete them.
+
+        Bars only cover whole intervals, so the cutoff is rounded down to one. Events
+        that started before the cutoff are also dropped from the in-memory caches.
+
+        Args:
+            older_than: Ticks before this time are compacted, defaults to SQLITE_COMPACT_AFTER ago
+            interval: Time covered by one bar, defaults to SQLITE_OHLC_INTERVAL
+
+        Returns:
+            The number of ticks compacted
+        """
+        if older_than is None:
+            older_than = datetime.now() - timedelta(seconds=settings.SQLITE_COMPACT_AFTER)
+        if interval is None:
+            interval = timedelta(seconds=settings.SQLITE_OHLC_INTERVAL)
+        seconds = interval.total_seconds()
+        cutoff = math.floor(older_than.timestamp() / seconds) * seconds
+        # On the writer thread, so it never interleaves with a write
+        compacted = await asyncio.get_running_loop().run_in_executor(self._executor, self._compact, cutoff, seconds)
+        logger.info(f"Compacted {compacted} ticks older than {datetime.fromtimestamp(cutoff)} into OHLC bars")
+        return compacted
+
+    def price_history(
+        self,
+        bookmaker_id: str,
+        event_id: str,
+        market_id: str,
+        outcome: str,
+        since: Optional[datetime] = None,
+    ) -> List[Tuple[datetime, Optional[float]]]:
+        """
+        The stored prices of one outcome, oldest first. Reads use their own connection
+        and, thanks to WAL, never wait for the writer.
+
+        Args:
+            bookmaker_id: The bookmaker
+            event_id: The bookmaker's event id
+            market_id: The bookmaker's market id
+            outcome: The outcome name as the bookmaker shows it
+            since: Only ticks from this time on
+
+        Returns:
+            (time, odds) per tick, odds None while the selection was suspended
+        """
+        if self._reader is None:
+            self._reader = sqlite3.connect(self.path, check_same_thread=False)
+        rows = self._reader.execute(
+            SELECT_HISTORY,
+            (bookmaker_id, event_id, market_id, outcome, since.timestamp() if since else 0.0),
+        ).fetchall()
+        return [(datetime.fromtimestamp(ts), odds) for ts, odds in rows]
+
+    def price_bars(
+        self,
+        bookmaker_id: str,
+        event_id: str,
+        market_id: str,
+        outcome: str,
+        since: Optional[datetime] = None,
+    ) -> List[Tuple[datetime, Optional[float], Optional[float], Optional[float], Optional[float]]]:
+        """
+        The compacted prices of one outcome, oldest first.
+
+        Args:
+            bookmaker_id: The bookmaker
+            event_id: The bookmaker's event id
+            market_id: The bookmaker's market id
+            outcome: The outcome name as the bookmaker shows it
+            since: Only bars starting from this time on
+
+        Returns:
+            (bar start, open, high, low, close) per bar; open or close None when suspended
+            then, high and low None when suspended throughout
+        """
+        if self._reader is None:
+            self._reader = sqlite3.connect(self.path, check_same_thread=False)
+        rows = self._reader.execute(
+            SELECT_BARS,
+            (bookmaker_id, event_id, market_id, outcome, since.timestamp() if since else 0.0),
+        ).fetchall()
+        return [(datetime.fromtimestamp(start), *prices) for start, *prices in rows]
+
+    async def _write_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            # Everything already waiting goes into the same transaction
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            stop = any(item is _STOP for item in batch)
+            snapshots = [item for item in batch if item is not _STOP]
+            try:
+                if snapshots:
+                    await loop.run_in_executor(self._executor, self._write, snapshots)
+            except sqlite3.Error as e:
+                logger.error(f"Error writing odds history: {str(e)}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                return
+
+    async def _compact_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.SQLITE_COMPACT_EVERY)
+            try:
+                await self.compact()
+            except sqlite3.Error as e:
+                logger.error(f"Error compacting odds history: {str(e)}")
+
+    def _open(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        # WAL with NORMAL sync stays consistent after a crash and skips an fsync per commit
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(SCHEMA)
+        self._connection = connection
+
+    def _close(self) -> None:
+        for connection in (self._connection, self._reader):
+            if connection is not None:
+                connection.close()
+        self._connection = None
+        self._reader = None
+
+    def _write(self, snapshots: List[OddsSnapshot]) -> None:
+        connection = self._connection
+        try:
+            with connection:
+                ticks = []
+                for snapshot in snapshots:
+                    ticks.extend(self._tick_rows(connection, snapshot))
+                connection.executemany(INSERT_TICK, ticks)
+        except sqlite3.Error:
+            # The transaction was rolled back, so the cached row ids and odds may not exist
+            self._event_ids.clear()
+            self._market_ids.clear()
+            self._last.clear()
+            raise
+        logger.debug(f"Wrote {len(ticks)} ticks from {len(snapshots)} snapshots")
+
+    def _compact(self, cutoff: float, interval: float) -> int:
+        connection = self._connection
+        with connection:
+            connection.execute(COMPACT_TICKS, {"interval": interval, "cutoff": cutoff})
+            compacted = connection.execute(DELETE_TICKS, (cutoff,)).rowcount
+            started = {row for row, in connection.execute(SELECT_STARTED, (cutoff,))}
+        # Events over by now are not scraped again, so their cached values would only take memory
+        self._event_ids = {key: row for key, row in self._event_ids.items() if row not in started}
+        self._market_ids = {key: row for key, row in self._market_ids.items() if key[0] not in started}
+        self._last = {key: odds for key, odds in self._last.items() if key[0] not in started}
+        return compacted
+
+    def _tick_rows(self, connection: sqlite3.Connection, snapshot: OddsSnapshot) -> List[tuple]:
+        """Make sure the snapshot's events and markets have rows, and lay out the ticks of changed prices."""
+        event_rows = [self._event_id(connection, event) for event in snapshot.events]
+
+        market_rows = []
+        strings = snapshot.strings
+        for market in range(len(snapshot.market_event)):
+            event_row = event_rows[snapshot.market_event[market]]
+            market_id = strings.decode(snapshot.market_id[market])
+            row = self._market_ids.get((event_row, market_id))
+            if row is None:
+                line = float(snapshot.market_line[market])
+                connection.execute(INSERT_MARKET, (
+                    event_row,
+                    market_id,
+                    snapshot.market_header(market).type.name,
+                    strings.decode(snapshot.market_name[market]),
+                    None if math.isnan(line) else line,
+                ))
+                row = connection.execute(SELECT_MARKET, (event_row, market_id)).fetchone()[0]
+                self._market_ids[(event_row, market_id)] = row
+            market_rows.append(row)
+
+        ts = snapshot.timestamp.timestamp()
+        names = strings.values
+        last = self._last
+        ticks = []
+        for event, market, name, price in zip(
+            snapshot.event.tolist(), snapshot.market.tolist(), snapshot.name.tolist(), snapshot.price.tolist()
+        ):
+            key = (event_rows[event], market_rows[market], names[name])
+            odds = price if price > 1.0 else None
+            if key in last and last[key] == odds:
+                continue
+            last[key] = odds
+            ticks.append((*key, ts, odds))
+        return ticks
+
+    def _event_id(self, connection: sqlite3.Connection, event) -> int:
+        key = (event.bookmaker.id, event.id)
+        row = self._event_ids.get(key)
+        if row is None:
+            connection.execute(INSERT_EVENT, (
+                event.bookmaker.id,
+                event.id,
+                event.sport.name,
+                event.home_team,
+                event.away_team,
+                event.competition,
+                event.start_time.timestamp(),
+                event.url,
+            ))
+            row = self._event_ids[key] = connection.execute(SELECT_EVENT, key).fetchone()[0]
+        return row
+
+
+_history: Optional[SqliteHistory] = None
+
+
+def get_history_store() -> SqliteHistory:
+    """Get the process-wide odds history store, creating it on first use. Await start() before writing."""
+    global _history
+    if _history is None:
+        _history = SqliteHistory()
+    return _history
+
+
+async def close_history_store() -> None:
+    """Write what is queued and close the process-wide odds history store, if one was created."""
+    global _history
+    if _history is not None:
+        await _history.close()
+        _history = None
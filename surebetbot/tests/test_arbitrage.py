@@ -0,0 +1,624 @@
+from datetime import datetime, timedelta
+import itertools
+import random
+import time
+
+import numpy as np
+import pytest
+
+from surebetbot.core.arbitrage import ArbitrageDetector, build_odds_matrix
+from surebetbot.core.incremental_arbitrage import IncrementalArbitrageDetector
+from surebetbot.core.matching import EventMatcher, normalize_team, token_set_similarity
+from surebetbot.core.middles import MiddleDetector
+from surebetbot.core.snapshot import NO_KEY, OddsSnapshot
+from surebetbot.core.snapshot_diff import diff_snapshots
+from surebetbot.core.arbitrage import make_opportunity
+from surebetbot.core.models import Bookmaker, Event, Market, MarketType, Outcome, ScrapingResult, SportType
+from surebetbot.core.utils import determine_market_type, parse_line
+from surebetbot.core.stake_calculator import StakeCalculator, StakeStrategy, solve_rounded_stakes
+from surebetbot.storage.in_memory import OddsDelta, OrderBookIndex
+
+
+SPORTSBET = Bookmaker(id="sportsbet", name="Sportsbet", base_url="https://www.sportsbet.com.au")
+TAB = Bookmaker(id="tab", name="TAB", base_url="https://www.tab.com.au")
+LADBROKES = Bookmaker(id="ladbrokes", name="Ladbrokes", base_url="https://www.ladbrokes.com.au")
+
+KICK_OFF = datetime(2024, 5, 1, 19, 30)
+
+
+def make_event(bookmaker, home, away, competition="Premier League", start_time=KICK_OFF,
+               sport=SportType.SOCCER, markets=None, event_id="1"):
+    return Event(
+        id=f"{bookmaker.id}_{event_id}",
+        sport=sport,
+        home_team=home,
+        away_team=away,
+        competition=competition,
+        start_time=start_time,
+        markets=markets or [],
+        bookmaker=bookmaker,
+        url=f"{bookmaker.base_url}/event/{event_id}"
+    )
+
+
+def make_result(bookmaker, markets, home="Arsenal", away="Chelsea"):
+    event = Event(
+        id=f"{bookmaker.id}_1",
+        sport=SportType.SOCCER,
+        home_team=home,
+        away_team=away,
+        competition="Premier League",
+        start_time=KICK_OFF,
+        markets=markets,
+        bookmaker=bookmaker,
+        url=f"{bookmaker.base_url}/event/1"
+    )
+    return ScrapingResult(bookmaker=bookmaker, events=[event])
+
+
+def match_result(home, draw, away, home_name="Arsenal", away_name="Chelsea"):
+    return Market(
+        id="h2h",
+        type=MarketType.WIN,
+        name="Match Result",
+        outcomes=[Outcome(home_name, home), Outcome("Draw", draw), Outcome(away_name, away)]
+    )
+
+
+def test_best_odds_matrix_takes_highest_price_per_outcome():
+    matrix = build_odds_matrix([
+        make_result(SPORTSBET, [match_result(2.10, 3.40, 3.60)]),
+        make_result(TAB, [match_result(2.30, 3.30, 3.50)]),
+        make_result(LADBROKES, [match_result(2.00, 3.60, 3.40)]),
+    ])
+
+    assert len(matrix.books) == 1
+    assert matrix.best_odds[matrix.row(0)].tolist() == [2.30, 3.60, 3.60]
+    assert [matrix.bookmakers[b].id for b in matrix.best_bookmaker[matrix.row(0)]] == [
+        "tab", "ladbrokes", "sportsbet"
+    ]
+    assert matrix.implied_sums()[0] == pytest.approx(1 / 2.30 + 1 / 3.60 + 1 / 3.60)
+
+
+def test_detects_three_way_arbitrage_across_bookmakers():
+    detector = ArbitrageDetector(min_profit_percentage=0.5, total_stake=100)
+    opportunities = detector.find_opportunities([
+        make_result(SPORTSBET, [match_result(2.60, 3.40, 3.20)]),
+        make_result(TAB, [match_result(2.30, 4.00, 3.10)]),
+        # Same teams spelled differently by another bookmaker
+        make_result(LADBROKES, [match_result(2.20, 3.50, 3.60, "Arsenal FC", "Chelsea FC")],
+                    home="Arsenal FC", away="Chelsea FC"),
+    ])
+
+    assert len(opportunities) == 1
+    opportunity = opportunities[0]
+    implied = 1 / 2.60 + 1 / 4.00 + 1 / 3.60
+    assert opportunity.profit_percentage == pytest.approx((1 / implied - 1) * 100, abs=1e-4)
+    assert [(name, odds, bookmaker.id) for name, odds, bookmaker in opportunity.selections] == [
+        ("Arsenal", 2.60, "sportsbet"), ("Draw", 4.00, "tab"), ("Chelsea FC", 3.60, "ladbrokes")
+    ]
+    # Every outcome returns the same amount
+    returns = [opportunity.stakes[name] * odds for name, odds, _ in opportunity.selections]
+    assert max(returns) - min(returns) < 0.05
+
+
+def test_detects_dutching_arbitrage_across_racing_fields():
+    rng = random.Random(3)
+    fair = [rng.uniform(4.0, 40.0) for _ in range(16)]
+    scale = sum(1 / odds for odds in fair)
+    # Each bookmaker has a 12% margin, but their best prices together leave a 2% arb
+    runners = [f"Runner {i}" for i in range(16)]
+    sportsbet_odds = [odds * scale / 1.12 for odds in fair]
+    tab_odds = [odds * scale / 1.12 for odds in fair]
+    for i in range(16):
+        (sportsbet_odds if i % 2 else tab_odds)[i] = fair[i] * scale / 0.98
+
+    def race(bookmaker, prices, with_jockeys):
+        outcomes = [
+            Outcome(f"{i + 1}. {name} (J Smith)" if with_jockeys else name, round(price, 2))
+            for i, (name, price) in enumerate(zip(runners, prices))
+        ]
+        event = make_event(bookmaker, "Race 4", "", competition="Randwick", sport=SportType.HORSE_RACING,
+                           event_id="r4", markets=[Market(id="win", type=MarketType.WIN, name="Win", outcomes=outcomes)])
+        return ScrapingResult(bookmaker=bookmaker, events=[event])
+
+    # Plus a 2-way market in the same batch, so the fields are ragged
+    results = [
+        race(SPORTSBET, sportsbet_odds, with_jockeys=True),
+        race(TAB, tab_odds, with_jockeys=False),
+        make_result(SPORTSBET, [match_result(2.10, 3.40, 3.60)]),
+    ]
+    matrix = build_odds_matrix(results)
+    assert sorted(matrix.outcome_counts.tolist()) == [3, 16]
+
+    opportunities = ArbitrageDetector(min_profit_percentage=1.0).find_opportunities(results)
+    assert len(opportunities) == 1
+    selections = opportunities[0].selections
+    assert len(selections) == 16
+    assert {bookmaker.id for _, _, bookmaker in selections} == {"sportsbet", "tab"}
+    assert opportunities[0].profit_percentage == pytest.approx(2.0, abs=0.1)
+
+
+def test_ignores_markets_under_threshold_or_not_fully_priced():
+    detector = ArbitrageDetector(min_profit_percentage=0.5)
+
+    assert detector.find_opportunities([
+        make_result(SPORTSBET, [match_result(2.10, 3.40, 3.60)]),
+        make_result(TAB, [match_result(2.20, 3.30, 3.50)]),
+    ]) == []
+
+    # Only part of a correct score market is listed, which is not an arbitrage
+    partial = Market(id="cs", type=MarketType.CORRECT_SCORE, name="Correct Score",
+                     outcomes=[Outcome("1-0", 7.0), Outcome("2-1", 9.0)])
+    other_scores = Market(id="cs", type=MarketType.CORRECT_SCORE, name="Correct Score",
+                          outcomes=[Outcome("0-0", 8.0), Outcome("1-1", 6.5)])
+    assert detector.find_opportunities([
+        make_result(SPORTSBET, [partial]),
+        make_result(TAB, [other_scores]),
+    ]) == []
+
+
+def test_one_bookmakers_prices_are_never_an_arbitrage():
+    # A two-outcome prop typed as a head to head lists only some of the results
+    win_to_nil = Market(id="wtn", type=MarketType.MONEYLINE, name="To Win To Nil",
+                        outcomes=[Outcome("Arsenal", 4.0), Outcome("Chelsea", 6.0)])
+    # A misread main result sums below 1 at a single bookmaker
+    misread = Market(id="h2h", type=MarketType.MONEYLINE, name="Head to Head",
+                     outcomes=[Outcome("Arsenal", 2.4), Outcome("Chelsea", 2.4)])
+    results = [make_result(SPORTSBET, [win_to_nil, misread]), make_result(TAB, [match_result(2.1, 3.3, 3.5)])]
+
+    assert ArbitrageDetector(min_profit_percentage=0.5).find_opportunities(results) == []
+    incremental = IncrementalArbitrageDetector(min_profit_percentage=0.5)
+    for result in results:
+        assert not incremental.ingest_result(result)
+    assert incremental.open_opportunities == []
+
+
+def test_winner_markets_of_other_periods_are_not_merged_with_the_result():
+    first_half = Market(id="fhw", type=MarketType.WIN, name="First Half Winner",
+                        outcomes=[Outcome("Arsenal", 2.8), Outcome("Draw", 2.1), Outcome("Chelsea", 4.2)])
+    detector = ArbitrageDetector(min_profit_percentage=0.5)
+    assert detector.find_opportunities([make_result(SPORTSBET, [match_result(2.0, 3.5, 3.8), first_half])]) == []
+
+    # The main result still lines up under different names, and first halves with first halves
+    head_to_head = Market(id="h2h", type=MarketType.WIN, name="Head to Head",
+                          outcomes=[Outcome("Arsenal", 2.6), Outcome("Draw", 4.0), Outcome("Chelsea", 3.6)])
+    half_time = Market(id="1h", type=MarketType.WIN, name="1st Half Winner",
+                       outcomes=[Outcome("Arsenal", 2.2), Outcome("Draw", 2.0), Outcome("Chelsea", 3.0)])
+    opportunities = detector.find_opportunities([
+        make_result(SPORTSBET, [match_result(2.0, 3.5, 3.8), first_half]),
+        make_result(TAB, [head_to_head, half_time]),
+    ])
+    assert [(o.market_description, [odds for _, odds, _ in o.selections]) for o in opportunities] == [
+        ("Match Result", [2.6, 4.0, 3.8]),
+    ]
+
+
+def test_parses_handicap_and_total_lines():
+    assert parse_line("Over 2.5") == 2.5
+    assert parse_line("Arsenal (-1.5)") == -1.5
+    assert parse_line("Over/Under 2.5 Goals") == 2.5
+    assert parse_line("Chelsea -0.5/-1") == -0.75
+    assert parse_line("1st Half Total Goals") is None
+    assert parse_line("1-0") is None
+
+
+def test_market_types_only_take_the_main_result_as_win():
+    for name in ["Match Result", "Head to Head", "Win", "Win-Draw-Win", "Race Winner"]:
+        assert determine_market_type(name) == MarketType.WIN
+    for name in ["First Half Winner", "Winning Margin", "To Win To Nil", "1st Half Result"]:
+        assert determine_market_type(name) == MarketType.OTHER
+    assert determine_market_type("Total Goals Line") == MarketType.TOTAL_OVER_UNDER
+    assert determine_market_type("Line") == MarketType.HANDICAP
+    assert determine_market_type("Asian Handicap") == MarketType.HANDICAP
+
+
+def totals(name, prices, line=None):
+    return Market(id=name.lower(), type=MarketType.TOTAL_OVER_UNDER, name=name, line=line,
+                  outcomes=[Outcome(outcome, odds) for outcome, odds in prices])
+
+
+def test_pairs_over_and_under_on_the_same_line_only():
+    detector = ArbitrageDetector(min_profit_percentage=0.5)
+    opportunities = detector.find_opportunities([
+        make_result(SPORTSBET, [totals("Total Goals", [
+            ("Over 2.5", 2.10), ("Under 2.5", 1.75), ("Over 3.5", 3.00), ("Under 3.5", 1.36),
+        ])]),
+        # The line is only in the market name
+        make_result(TAB, [totals("Over/Under 2.5 Goals", [("Over", 1.80), ("Under", 2.15)], line=2.5)]),
+        # Corners are a different total on the same line
+        make_result(LADBROKES, [totals("Total Corners", [("Over 3.5", 1.30), ("Under 3.5", 3.20)])]),
+    ])
+
+    assert len(opportunities) == 1
+    assert opportunities[0].market_description == "Total Goals 2.5"
+    assert [(name, odds, bookmaker.id) for name, odds, bookmaker in opportunities[0].selections] == [
+        ("Over 2.5", 2.10, "sportsbet"), ("Under", 2.15, "tab")
+    ]
+
+
+def test_handicap_lines_line_up_when_teams_are_swapped():
+    def handicap(bookmaker, home, away, prices):
+        market = Market(id="line", type=MarketType.HANDICAP, name="Handicap",
+                        outcomes=[Outcome(outcome, odds) for outcome, odds in prices])
+        return ScrapingResult(bookmaker=bookmaker, events=[make_event(bookmaker, home, away, markets=[market])])
+
+    opportunities = ArbitrageDetector(min_profit_percentage=0.5).find_opportunities([
+        handicap(SPORTSBET, "Arsenal", "Chelsea", [("Arsenal -1.5", 2.90), ("Chelsea +1.5", 1.40)]),
+        handicap(LADBROKES, "Chelsea", "Arsenal", [("Chelsea +1.5", 1.60), ("Arsenal -1.5", 2.60)]),
+    ])
+
+    assert len(opportunities) == 1
+    assert {(name, odds) for name, odds, _ in opportunities[0].selections} == {
+        ("Arsenal -1.5", 2.90), ("Chelsea +1.5", 1.60)
+    }
+
+
+def test_middle_mode_pairs_adjacent_total_lines():
+    results = [
+        make_result(SPORTSBET, [totals("Total Goals", [("Over 2.5", 2.00), ("Under 2.5", 1.85)])]),
+        make_result(TAB, [totals("Total Goals", [("Over 3.5", 1.85), ("Under 3.5", 1.95)])]),
+    ]
+
+    middles = MiddleDetector(max_implied_sum=1.03).find_middles(results)
+    assert len(middles) == 1
+    middle = middles[0]
+    assert middle.lines == (2.5, 3.5) and middle.width == 1.0
+    assert [(name, bookmaker.id) for name, _, bookmaker in middle.selections] == [
+        ("Over 2.5", "sportsbet"), ("Under 3.5", "tab")
+    ]
+    assert middle.implied_sum == pytest.approx(1 / 2.00 + 1 / 1.95)
+    # Not risk-free, so never an arbitrage
+    assert ArbitrageDetector(min_profit_percentage=0).find_opportunities(results) == []
+
+
+def test_snapshot_round_trips_and_feeds_the_matrix():
+    results = [
+        make_result(SPORTSBET, [match_result(2.60, 3.40, 3.20), totals("Total Goals", [
+            ("Over 2.5", 2.10), ("Under 2.5", 1.75), ("Both teams", 1.90),
+        ])]),
+        make_result(TAB, [match_result(2.30, 4.00, 3.10)]),
+    ]
+    snapshot = OddsSnapshot.from_results(results)
+
+    assert len(snapshot) == 9
+    assert snapshot.price.dtype == np.float64 and snapshot.event.dtype == np.int32
+    # The two bookmakers' "Draw" share one dictionary entry and one outcome key
+    draws = snapshot.name == snapshot.strings.lookup("Draw")
+    assert draws.sum() == 2 and len(set(snapshot.outcome[draws].tolist())) == 1
+    # An outcome that is neither over nor under can not be keyed
+    assert snapshot.market_key[snapshot.name == snapshot.strings.lookup("Both teams")].tolist() == [NO_KEY]
+
+    rebuilt = snapshot.to_results()
+    assert [result.bookmaker for result in rebuilt] == [SPORTSBET, TAB]
+    assert [[(market.name, market.outcomes) for market in event.markets] for result in rebuilt
+            for event in result.events] == [[(market.name, market.outcomes) for market in event.markets]
+                                            for result in results for event in result.events]
+
+    from_results = build_odds_matrix(results)
+    from_snapshot = build_odds_matrix(snapshot)
+    assert from_snapshot.best_odds.tolist() == from_results.best_odds.tolist()
+    assert [book.outcome_names for book in from_snapshot.books] == [
+        ["Arsenal", "Draw", "Chelsea"], ["Over 2.5", "Under 2.5"]
+    ]
+
+
+def test_snapshot_diff_reports_moves_suspensions_and_market_changes():
+    old = OddsSnapshot.from_results([
+        make_result(SPORTSBET, [match_result(2.10, 3.40, 3.60),
+                                totals("Total Goals", [("Over 2.5", 2.00), ("Under 2.5", 1.80)])]),
+        make_result(TAB, [match_result(2.30, 3.30, 3.50)]),
+    ])
+    scores = Market(id="cs", type=MarketType.CORRECT_SCORE, name="Correct Score",
+                    outcomes=[Outcome("1-0", 7.0), Outcome("0-0", 8.0)])
+    tab_market = match_result(2.30, 3.30, 3.50)
+    tab_market.outcomes = [tab_market.outcomes[0], Outcome("Draw", 1.0), tab_market.outcomes[2]]
+    new = OddsSnapshot.from_results([
+        make_result(SPORTSBET, [match_result(2.10, 3.40, 3.80), scores]),
+        make_result(TAB, [tab_market]),
+    ])
+
+    diff = diff_snapshots(old, new)
+    assert [(new.strings.decode(new.name[i]), new.price[i]) for i in diff.moved] == [("Chelsea", 3.80)]
+    assert old.price[diff.moved_from].tolist() == [3.60]
+    assert [(old.bookmakers[old.bookmaker[i]].id, old.strings.decode(old.name[i])) for i in diff.suspended] == [
+        ("tab", "Draw")
+    ]
+    assert [new.strings.decode(new.market_name[m]) for m in diff.new_markets] == ["Correct Score"]
+    assert [old.strings.decode(old.market_name[m]) for m in diff.removed_markets] == ["Total Goals"]
+    assert len(diff.added) == 0
+
+    # An unchanged board diffs to nothing
+    assert not diff_snapshots(new, OddsSnapshot.from_results(new.to_results()))
+
+
+def test_incremental_detector_applies_snapshot_diffs():
+    detector = IncrementalArbitrageDetector(min_profit_percentage=0.5)
+    matcher = detector.index.matcher
+    first = OddsSnapshot.from_results([
+        make_result(SPORTSBET, [match_result(2.10, 3.40, 3.20)]),
+        make_result(TAB, [match_result(2.30, 3.30, 3.10)]),
+    ], matcher)
+    assert not detector.apply_diff(diff_snapshots(OddsSnapshot.from_results([]), first))
+
+    second = OddsSnapshot.from_results([
+        make_result(SPORTSBET, [match_result(2.60, 3.40, 3.20)]),
+        make_result(TAB, [match_result(2.30, 4.00, 3.60)]),
+    ], matcher)
+    update = detector.apply_diff(diff_snapshots(first, second))
+    assert len(update.opened) == 1
+    assert {odds for _, odds, _ in update.opened[0].selections} == {2.60, 4.00, 3.60}
+
+
+def test_matcher_resolves_aliases_and_team_order():
+    matcher = EventMatcher()
+    sportsbet = matcher.match(make_event(SPORTSBET, "Manchester United", "Tottenham Hotspur", "English Premier League"))
+    tab = matcher.match(make_event(TAB, "Man Utd", "Spurs", "EPL", start_time=KICK_OFF + timedelta(minutes=5)))
+    ladbrokes = matcher.match(make_event(LADBROKES, "Tottenham", "Man United", "Premier League"))
+
+    assert normalize_team("Man Utd FC") == "manchester united"
+    assert tab.canonical is sportsbet.canonical and not tab.swapped
+    assert ladbrokes.canonical is sportsbet.canonical and ladbrokes.swapped
+    assert set(sportsbet.canonical.members) == {"sportsbet", "tab", "ladbrokes"}
+    # Each event is matched once and then served from the cache
+    assert matcher.match(make_event(TAB, "Man Utd", "Spurs", "EPL")) is tab
+
+
+def test_matcher_keeps_different_fixtures_apart():
+    matcher = EventMatcher()
+    men = matcher.match(make_event(SPORTSBET, "Arsenal", "Chelsea"))
+
+    assert matcher.match(make_event(TAB, "Arsenal Women", "Chelsea Women")).canonical is not men.canonical
+    assert matcher.match(make_event(LADBROKES, "Arsenal", "Chelsea",
+                                    start_time=KICK_OFF + timedelta(days=1))).canonical is not men.canonical
+
+    # One name contained in the other is not the same team
+    ac_milan = matcher.match(make_event(SPORTSBET, "AC Milan", "Juventus", "Serie A", event_id="milan"))
+    inter = matcher.match(make_event(TAB, "Inter", "Juventus", "Italian Serie A", event_id="milan"))
+    assert inter.canonical is not ac_milan.canonical
+    assert token_set_similarity(normalize_team("AC Milan"), normalize_team("Inter")) < 0.85
+
+    # Races only match within the same meeting
+    race = matcher.match(make_event(SPORTSBET, "Race 1", "", "Randwick", sport=SportType.HORSE_RACING, event_id="r1"))
+    other_meeting = matcher.match(make_event(TAB, "Race 1", "", "Flemington", sport=SportType.HORSE_RACING, event_id="r1"))
+    same_meeting = matcher.match(make_event(LADBROKES, "Race 1", "", "Randwick", sport=SportType.HORSE_RACING, event_id="r1"))
+    assert other_meeting.canonical is not race.canonical
+    assert same_meeting.canonical is race.canonical
+
+
+def test_matcher_forgets_started_events_and_their_cached_matches():
+    matcher = EventMatcher(time_tolerance=timedelta(minutes=15))
+    started = matcher.match(make_event(SPORTSBET, "Arsenal", "Chelsea"))
+    later = matcher.match(make_event(SPORTSBET, "Liverpool", "Everton", start_time=KICK_OFF + timedelta(hours=3),
+                                     event_id="2"))
+    # The page showed no start time, so the parse time stands in for it
+    unknown = make_event(SPORTSBET, "Leeds", "Burnley", start_time=KICK_OFF - timedelta(hours=1), event_id="3")
+    unknown.start_time_known = False
+    matcher.match(unknown)
+
+    # Kept for the time tolerance past the start, as its bookmakers may show a later start time
+    matcher.prune(KICK_OFF + timedelta(minutes=10))
+    assert len(matcher) == 3
+    matcher.prune(KICK_OFF + timedelta(minutes=20))
+    assert len(matcher) == 2
+    assert matcher.match(make_event(SPORTSBET, "Arsenal", "Chelsea")).canonical is not started.canonical
+
+    # Events without a start time go only when the order book evicts them
+    unknown_id = matcher.match(unknown).canonical.id
+    matcher.prune(KICK_OFF + timedelta(minutes=20), [unknown_id])
+    assert matcher.match(unknown).canonical.id != unknown_id
+    assert matcher.match(make_event(SPORTSBET, "Liverpool", "Everton", event_id="2")) is later
+
+
+def test_swapped_team_order_lines_up_outcomes():
+    detector = ArbitrageDetector(min_profit_percentage=0.0)
+    opportunities = detector.find_opportunities([
+        make_result(SPORTSBET, [match_result(2.60, 3.40, 3.20)]),
+        # Listed as Chelsea v Arsenal, so its first price is Chelsea's, not the home side's
+        make_result(TAB, [match_result(3.70, 4.00, 2.30, "Chelsea", "Arsenal")], home="Chelsea", away="Arsenal"),
+    ])
+
+    assert len(opportunities) == 1
+    assert [(name, odds) for name, odds, _ in opportunities[0].selections] == [
+        ("Arsenal", 2.60), ("Draw", 4.00), ("Chelsea", 3.70)
+    ]
+
+
+def test_incremental_detector_reports_opened_changed_and_closed_arbs():
+    detector = IncrementalArbitrageDetector(min_profit_percentage=0.5, index=OrderBookIndex())
+    market = ("arsenal_chelsea", MarketType.WIN, None, "")
+
+    def delta(bookmaker, outcome, odds):
+        return OddsDelta(bookmaker=bookmaker, market_key=market, outcome=outcome, odds=odds,
+                         event_description="Arsenal vs Chelsea", market_description="Match Result")
+
+    update = detector.apply_many([
+        delta(SPORTSBET, "home", 2.10), delta(SPORTSBET, "draw", 3.40), delta(SPORTSBET, "away", 3.60),
+        delta(TAB, "home", 2.20), delta(TAB, "draw", 3.30), delta(TAB, "away", 3.50),
+    ])
+    assert not update
+
+    # A lower price elsewhere moves no best price and opens nothing
+    assert not detector.apply(delta(TAB, "away", 3.40))
+
+    opened = detector.apply(delta(TAB, "draw", 4.20))
+    assert len(opened.opened) == 1
+    assert opened.opened[0].profit_percentage == pytest.approx((1 / (1 / 2.20 + 1 / 4.20 + 1 / 3.60) - 1) * 100, abs=1e-4)
+
+    changed = detector.apply(delta(SPORTSBET, "home", 2.25))
+    assert [o.selections[0][1] for o in changed.changed] == [2.25]
+
+    closed = detector.apply(delta(TAB, "draw", None))
+    assert len(closed.closed) == 1 and not closed.opened
+    assert detector.open_opportunities == []
+
+
+def test_incremental_detector_reports_only_profit_changes_and_drops_evicted_events():
+    detector = IncrementalArbitrageDetector(min_profit_percentage=0.5, index=OrderBookIndex())
+    results = [make_result(SPORTSBET, [match_result(2.60, 3.40, 3.20)]), make_result(TAB, [match_result(2.30, 4.00, 3.60)])]
+    opened = [o for result in results for o in detector.ingest_result(result).opened]
+    assert len(opened) == 1
+
+    # Ladbrokes quotes below the best prices: the coverage changes, the arbitrage does not
+    assert not detector.ingest_result(make_result(LADBROKES, [match_result(2.10, 3.30, 3.40)]))
+    assert detector.open_opportunities[0].profit_percentage == opened[0].profit_percentage
+
+    evicted = detector.prune(KICK_OFF + timedelta(minutes=1))
+    assert evicted == [opened[0].market_key[0]]
+    assert detector.open_opportunities == [] and detector._markets == {} and len(detector.index) == 0
+
+    # Listed again, the event is tracked from scratch
+    for result in results:
+        detector.ingest_result(result)
+    assert [o.profit_percentage for o in detector.open_opportunities] == [opened[0].profit_percentage]
+
+
+def test_incremental_and_batch_detectors_key_markets_alike():
+    def correct_score(market_id, name, prices):
+        return Market(id=market_id, type=MarketType.CORRECT_SCORE, name=name,
+                      outcomes=[Outcome(score, odds) for score, odds in prices])
+
+    # Neither of the bookmaker's correct score markets is an arbitrage, their best prices together would be
+    results = [
+        make_result(SPORTSBET, [
+            match_result(2.60, 3.40, 3.20),
+            correct_score("cs", "Correct Score", [("1-0", 4.0), ("0-0", 2.0), ("1-1", 3.0)]),
+            correct_score("htcs", "Half Time Correct Score", [("1-0", 2.5), ("0-0", 4.0), ("1-1", 2.4)]),
+        ]),
+        make_result(TAB, [match_result(2.30, 4.00, 3.10)]),
+    ]
+    batch = ArbitrageDetector(min_profit_percentage=0.5).find_opportunities(results)
+    incremental = IncrementalArbitrageDetector(min_profit_percentage=0.5)
+    for result in results:
+        incremental.ingest_result(result)
+
+    assert [(o.market_description, o.market_key[1:]) for o in batch] == [("Match Result", (MarketType.WIN, None, ""))]
+    assert [(o.market_description, o.market_key[1:], o.profit_percentage) for o in incremental.open_opportunities] == [
+        (o.market_description, o.market_key[1:], o.profit_percentage) for o in batch
+    ]
+
+
+def test_incremental_running_sums_agree_with_full_recomputation():
+    rng = random.Random(3)
+    bookmakers = [SPORTSBET, TAB, LADBROKES]
+    detector = IncrementalArbitrageDetector(min_profit_percentage=0.0, index=OrderBookIndex())
+    market = ("event", MarketType.WIN, None, "")
+    prices = {}
+
+    for _ in range(2000):
+        bookmaker = rng.choice(bookmakers)
+        outcome = rng.choice(["home", "draw", "away"])
+        odds = None if rng.random() < 0.1 else round(rng.uniform(2.0, 4.5), 2)
+        detector.apply(OddsDelta(bookmaker=bookmaker, market_key=market, outcome=outcome, odds=odds))
+        if odds is None:
+            prices.pop((bookmaker.id, outcome), None)
+        else:
+            prices[(bookmaker.id, outcome)] = odds
+
+        best = {}
+        for (_, name), price in prices.items():
+            best[name] = max(best.get(name, 0), price)
+        state = detector._markets.get(market)
+        assert (state.implied_sum if state else 0.0) == pytest.approx(sum(1 / price for price in best.values()))
+
+
+def two_way(odds_a, odds_b, bookmaker_a=SPORTSBET, bookmaker_b=TAB):
+    return make_opportunity("Kings vs Wildcats", "Head to Head",
+                            [("Kings", odds_a, bookmaker_a), ("Wildcats", odds_b, bookmaker_b)], 100)
+
+
+def test_equal_profit_stakes_account_for_commission():
+    exchange = Bookmaker(id="exchange", name="Exchange", base_url="https://exchange.example.com", commission=0.05)
+    calculator = StakeCalculator(total_stake=1000, strategy=StakeStrategy.EQUAL_PROFIT, rounding=0)
+    allocation = calculator.allocate([two_way(2.20, 2.10, bookmaker_b=exchange)])
+
+    returns = allocation.returns[0]
+    assert returns[0] == pytest.approx(returns[1])
+    assert allocation.totals[0] == pytest.approx(1000)
+    # Without commission the plain proportional split favours the exchange side too little
+    proportional = StakeCalculator(total_stake=1000, strategy=StakeStrategy.PROPORTIONAL, rounding=0)
+    plain = proportional.allocate([two_way(2.20, 2.10, bookmaker_b=exchange)])
+    assert plain.guaranteed_profit[0] < allocation.guaranteed_profit[0]
+
+
+def test_stakes_respect_bookmaker_limits():
+    capped = Bookmaker(id="capped", name="Capped", base_url="https://capped.example.com", max_stake=20)
+    minimum = Bookmaker(id="minimum", name="Minimum", base_url="https://minimum.example.com", min_stake=500)
+    calculator = StakeCalculator(total_stake=100, rounding=0)
+
+    allocation = calculator.allocate([two_way(2.20, 2.10, bookmaker_a=capped), two_way(2.20, 2.10, bookmaker_a=capped, bookmaker_b=minimum)])
+
+    assert allocation.feasible.tolist() == [True, False]
+    assert allocation.stakes[0, 0] == pytest.approx(20)
+    assert allocation.totals[0] < 100
+
+
+def test_rounded_stakes_keep_every_outcome_profitable():
+    rng = random.Random(11)
+    opportunities = []
+    for _ in range(300):
+        a = rng.uniform(1.3, 6.0)
+        b = 1 / (0.97 - 1 / a)  # Implied sum of 0.97
+        opportunities.append(two_way(round(a, 2), round(b, 2)))
+
+    calculator = StakeCalculator(total_stake=250, strategy=StakeStrategy.EQUAL_PROFIT, rounding=5)
+    allocation = calculator.allocate(opportunities)
+
+    assert allocation.feasible.mean() > 0.9
+    feasible = allocation.feasible
+    assert (allocation.stakes[feasible] % 5 == 0).all()
+    assert (allocation.returns[feasible].min(axis=1) > allocation.totals[feasible]).all()
+
+
+def test_rounded_stake_solver_finds_the_best_vector_quickly():
+    rng = random.Random(5)
+    cases = []
+    for _ in range(100):
+        a = rng.uniform(1.5, 4.0)
+        b = rng.uniform(2.5, 6.0)
+        c = 1 / (rng.uniform(0.96, 0.995) - 1 / a - 1 / b)
+        cases.append([round(a, 2), round(b, 2), round(c, 2)])
+
+    for odds in cases[:20]:
+        solution = solve_rounded_stakes(odds, [2, 2, 2], [30, None, None], bankroll=40)
+        # Exhaustive search over every whole-dollar vector within the limits
+        best = None
+        for stakes in itertools.product(range(2, 31), range(2, 41), range(2, 41)):
+            if sum(stakes) > 40:
+                continue
+            profit = min(s * o for s, o in zip(stakes, odds)) - sum(stakes)
+            if profit > 1e-9 and (best is None or profit > best):
+                best = profit
+        if best is None:
+            assert solution is None
+        else:
+            assert solution[1] == pytest.approx(best)
+            assert sum(solution[0]) <= 40 and solution[0][0] <= 30
+
+    started = time.perf_counter()
+    for odds in cases:
+        solve_rounded_stakes(odds, [0, 0, 0], [None, None, None], bankroll=1000)
+    assert (time.perf_counter() - started) / len(cases) < 1e-3
+
+    # 20-runner races with a 0.5-4% edge, at a large bankroll
+    races = []
+    for _ in range(30):
+        fair = [rng.uniform(1.0, 30.0) for _ in range(20)]
+        scale = sum(1 / price for price in fair) * (1 + rng.uniform(0.005, 0.04))
+        races.append([round(price * scale, 2) for price in fair])
+    started = time.perf_counter()
+    for odds in races:
+        assert solve_rounded_stakes(odds, [0] * 20, [None] * 20, bankroll=10000) is not None
+    assert (time.perf_counter() - started) / len(races) < 1e-3
+
+
+def test_profit_biased_stakes_break_even_on_other_outcomes():
+    calculator = StakeCalculator(total_stake=100, strategy=StakeStrategy.PROFIT_BIASED, rounding=0)
+    allocation = calculator.allocate([two_way(2.20, 2.10)], bias_outcomes=[1])
+
+    assert allocation.feasible[0]
+    assert allocation.returns[0, 0] == pytest.approx(100)
+    assert allocation.returns[0, 1] > 100
+
+    sized = calculator.apply([two_way(2.20, 2.10)])
+    assert sized[0].required_investment == pytest.approx(100)
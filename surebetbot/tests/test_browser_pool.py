@@ -0,0 +1,211 @@
+import asyncio
+
+from surebetbot.scrapers import browser_pool
+from surebetbot.scrapers.browser_pool import BrowserPool
+from surebetbot.scrapers.page_pool import PagePool
+
+
+class FakePage:
+    def __init__(self, context):
+        self.context = context
+
+    def is_closed(self):
+        return self not in self.context.pages
+
+    async def close(self):
+        self.context.pages.remove(self)
+
+
+class FakeContext:
+    def __init__(self):
+        self.pages = []
+        self.closed = False
+        self._listeners = []
+
+    def on(self, event, handler):
+        self._listeners.append(handler)
+
+    async def new_page(self):
+        page = FakePage(self)
+        self.pages.append(page)
+        for handler in self._listeners:
+            handler(page)
+        return page
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+        self.contexts = []
+
+    def on(self, event, handler):
+        pass
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **options):
+        context = FakeContext()
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        self.connected = False
+
+
+class FakeLauncher:
+    def __init__(self):
+        self.launched = []
+
+    async def launch(self, headless=True):
+        browser = FakeBrowser()
+        self.launched.append(browser)
+        return browser
+
+
+class FakePlaywright:
+    def __init__(self):
+        self.firefox = FakeLauncher()
+
+    async def stop(self):
+        pass
+
+
+class FakeAsyncPlaywright:
+    def __init__(self, playwright):
+        self.playwright = playwright
+
+    async def start(self):
+        return self.playwright
+
+
+def _patch_playwright(monkeypatch):
+    playwright = FakePlaywright()
+    monkeypatch.setattr(browser_pool, "async_playwright", lambda: FakeAsyncPlaywright(playwright))
+    return playwright
+
+
+def test_contexts_are_reused_across_leases(monkeypatch):
+    playwright = _patch_playwright(monkeypatch)
+
+    async def run():
+        pool = BrowserPool(size=1, max_pages_per_browser=100, max_pages_per_context=100)
+        lease = await pool.acquire("firefox")
+        await lease.context.new_page()
+        first_context = lease.context
+        await pool.release(lease)
+
+        lease = await pool.acquire("firefox")
+        assert lease.context is first_context
+        assert lease.context.pages == []
+        await pool.release(lease)
+        await pool.close()
+
+    asyncio.run(run())
+    assert len(playwright.firefox.launched) == 1
+
+
+def test_browser_is_recycled_after_page_budget(monkeypatch):
+    playwright = _patch_playwright(monkeypatch)
+
+    async def run():
+        pool = BrowserPool(size=1, max_pages_per_browser=2, max_pages_per_context=100)
+        lease = await pool.acquire("firefox")
+        await lease.context.new_page()
+        await lease.context.new_page()
+        await pool.release(lease)
+
+        lease = await pool.acquire("firefox")
+        await pool.release(lease)
+        await pool.close()
+
+    asyncio.run(run())
+    assert len(playwright.firefox.launched) == 2
+    assert not playwright.firefox.launched[0].connected
+
+
+def test_crashed_browser_is_replaced(monkeypatch):
+    playwright = _patch_playwright(monkeypatch)
+
+    async def run():
+        pool = BrowserPool(size=1)
+        lease = await pool.acquire("firefox")
+        await pool.release(lease, crashed=True)
+
+        lease = await pool.acquire("firefox")
+        assert lease.browser is playwright.firefox.launched[1]
+        await pool.release(lease)
+        await pool.close()
+
+    asyncio.run(run())
+
+
+def test_contexts_of_a_crashed_browser_are_not_pooled_after_a_restart(monkeypatch):
+    playwright = _patch_playwright(monkeypatch)
+
+    async def run():
+        pool = BrowserPool(size=1)
+        stale = await pool.acquire("firefox")
+        playwright.firefox.launched[0].connected = False
+
+        # The next lease restarts the slot while the first one is still out
+        fresh = await pool.acquire("firefox")
+        assert fresh.browser is playwright.firefox.launched[1]
+        await pool.release(stale, crashed=True)
+        assert stale.context.closed
+        assert playwright.firefox.launched[1].connected
+        await pool.release(fresh)
+
+        lease = await pool.acquire("firefox")
+        assert lease.context is fresh.context
+        await pool.release(lease)
+        await pool.close()
+
+    asyncio.run(run())
+    assert len(playwright.firefox.launched) == 2
+
+
+def test_page_pool_bounds_concurrency_and_streams_results():
+    async def run():
+        context = FakeContext()
+        pool = PagePool(context, size=3)
+        in_flight = 0
+        peak = 0
+
+        async def handler(page, delay):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(delay)
+            in_flight -= 1
+            return delay
+
+        delays = [0.03, 0.01, 0.02, 0.0, 0.01, 0.02]
+        results = [result async for _, result in pool.map(delays, handler)]
+        await pool.close()
+        return context, peak, results
+
+    context, peak, results = asyncio.run(run())
+    assert peak == 3
+    assert sorted(results) == sorted([0.03, 0.01, 0.02, 0.0, 0.01, 0.02])
+    assert results[0] == 0.01  # first to finish, not first submitted
+    assert context.pages == []
+
+
+def test_page_pool_failing_item_yields_none():
+    async def run():
+        pool = PagePool(FakeContext(), size=2)
+
+        async def handler(page, item):
+            if item == "bad":
+                raise RuntimeError("boom")
+            return item
+
+        results = dict([pair async for pair in pool.map(["a", "bad", "b"], handler)])
+        await pool.close()
+        return results
+
+    assert asyncio.run(run()) == {"a": "a", "bad": None, "b": "b"}
@@ -0,0 +1,201 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from surebetbot.core.arbitrage import make_opportunity
+from surebetbot.core.models import Bookmaker
+from surebetbot.core.rate_limit import TokenBucket
+from surebetbot.notifications.base_notifier import Alert, BaseNotifier, NotificationError, Outbox, alert_priority
+from surebetbot.notifications.discord_notifier import (
+    MAX_MESSAGE_CHARS, DiscordNotifier, embed_chars, opportunity_embed,
+)
+
+SPORTSBET = Bookmaker(id="sportsbet", name="Sportsbet", base_url="https://www.sportsbet.com.au")
+TAB = Bookmaker(id="tab", name="TAB", base_url="https://www.tab.com.au")
+
+
+def arb(number, runners=2, odds=None, start_time=None, bookmaker=TAB):
+    odds = odds or runners + 0.2
+    return make_opportunity(f"Event {number}", "Head to Head",
+                            [(f"Runner {i}", odds, SPORTSBET if i % 2 else bookmaker) for i in range(runners)], 100,
+                            start_time=start_time)
+
+
+class FakeNotifier(BaseNotifier):
+    def __init__(self, failures=(), delay=0.0, **kwargs):
+        kwargs.setdefault("batch_window", 0.05)
+        kwargs.setdefault("backoff", 0.01)
+        super().__init__(**kwargs)
+        self.failures = list(failures)
+        self.delay = delay
+        self.messages = []
+
+    async def send(self, alerts):
+        await asyncio.sleep(self.delay)
+        if self.failures:
+            raise self.failures.pop(0)
+        self.messages.append([alert.opportunity.event_description for alert in alerts])
+
+
+def test_burst_is_coalesced_into_few_paced_messages():
+    async def run():
+        notifier = FakeNotifier(batch_size=10, rate=2, burst=5)
+        await notifier.start()
+        started = time.monotonic()
+        notifier.notify_many(arb(i) for i in range(50))
+        await notifier.flush()
+        elapsed = time.monotonic() - started
+        await notifier.close()
+        return notifier, elapsed
+
+    notifier, elapsed = asyncio.run(run())
+    assert [len(message) for message in notifier.messages] == [10] * 5
+    assert notifier.messages[0][0] == "Event 0"
+    assert notifier.sent == 50
+    assert elapsed < 1.0
+
+
+def test_notify_never_waits_for_a_slow_channel():
+    async def run():
+        notifier = FakeNotifier(delay=0.5)
+        await notifier.start()
+        started = time.monotonic()
+        for i in range(20):
+            notifier.notify(arb(i))
+        queued = time.monotonic() - started
+        await notifier.close()
+        return notifier, queued
+
+    notifier, queued = asyncio.run(run())
+    assert queued < 0.05
+    assert notifier.sent == 20
+
+
+def test_failed_messages_are_retried_and_stale_alerts_dropped():
+    async def run():
+        retried = FakeNotifier(failures=[NotificationError("busy"), NotificationError("slow down", retry_after=0.05)])
+        await retried.start()
+        retried.notify(arb(1))
+        await retried.close()
+
+        hopeless = FakeNotifier(failures=[NotificationError("bad request", retryable=False)])
+        await hopeless.start()
+        hopeless.notify(arb(2))
+        await hopeless.close()
+
+        stale = FakeNotifier(failures=[NotificationError("busy")] * 3, delay=0.05, expiry=0.1)
+        await stale.start()
+        stale.notify(arb(3))
+        await stale.close()
+        return retried, hopeless, stale
+
+    retried, hopeless, stale = asyncio.run(run())
+    assert retried.messages == [["Event 1"]] and retried.sent == 1
+    assert hopeless.messages == [] and hopeless.failed == 1
+    assert stale.messages == [] and stale.expired == 1
+
+
+def test_alert_priority_weighs_expected_profit_and_time_to_start():
+    now = datetime(2024, 5, 1, 18, 0)
+    capped = Bookmaker(id="capped", name="Capped", base_url="https://capped.example.com", max_stake=10)
+    big = arb(1, odds=2.3)  # 15% on 100
+    small = arb(2, odds=2.1)  # 5% on 100
+    assert alert_priority(big, now) > alert_priority(small, now)
+    # A 10 stake limit caps what the 15% can earn below the uncapped 5%
+    assert alert_priority(arb(1, odds=2.3, bookmaker=capped), now) < alert_priority(small, now)
+    # Starting in five minutes beats three times the profit a day out
+    soon = arb(3, odds=2.1, start_time=now + timedelta(minutes=5))
+    later = arb(4, odds=2.3, start_time=now + timedelta(days=1))
+    assert alert_priority(soon, now) > alert_priority(later, now)
+
+
+def test_outbox_sends_most_valuable_first_and_supersedes_in_place():
+    async def run():
+        notifier = FakeNotifier(batch_size=1, delay=0.05, rate=100, burst=100)
+        await notifier.start()
+        notifier.notify(arb(0, odds=2.05))
+        await asyncio.sleep(0.01)
+        # Backed up behind the message in flight
+        for number, odds in [(1, 2.10), (2, 2.40), (3, 2.20), (1, 2.30)]:
+            notifier.notify(arb(number, odds=odds))
+        await notifier.close()
+        return notifier
+
+    notifier = asyncio.run(run())
+    assert notifier.messages == [["Event 0"], ["Event 2"], ["Event 1"], ["Event 3"]]
+    assert notifier.superseded == 1 and notifier.sent == 4
+
+    async def overflow():
+        outbox = Outbox(max_size=2)
+        for number, priority in [(1, 5.0), (2, 1.0), (3, 3.0), (4, 0.5)]:
+            outbox.put(Alert(arb(number), 0.0, 60.0, priority=priority, key=number))
+        return [outbox.get_nowait().key for _ in range(len(outbox))]
+
+    # The least valuable alert makes room, or is not let in
+    assert asyncio.run(overflow()) == [1, 3]
+
+
+def test_token_bucket_follows_server_limits():
+    now = [0.0]
+    bucket = TokenBucket(rate=2, capacity=5, clock=lambda: now[0])
+    assert all(bucket.try_acquire() for _ in range(5))
+    assert not bucket.try_acquire()
+    assert bucket.delay() == 0.5
+
+    now[0] = 10.0
+    bucket.limit(remaining=2, reset_after=1.0)
+    assert bucket.try_acquire() and bucket.try_acquire() and not bucket.try_acquire()
+
+    now[0] = 20.0
+    # Window used up: nothing until it resets, then one message
+    bucket.limit(remaining=0, reset_after=0.1)
+    assert abs(bucket.delay() - 0.1) < 1e-9
+    now[0] = 20.1
+    assert bucket.try_acquire() and not bucket.try_acquire()
+
+
+class FakeDiscord(DiscordNotifier):
+    def __init__(self, responses, **kwargs):
+        super().__init__(webhook_url="https://discord.example.com/webhook", batch_window=0.05, **kwargs)
+        self.responses = list(responses)
+        self.payloads = []
+
+    async def _post(self, payload):
+        self.payloads.append(payload)
+        return self.responses.pop(0)
+
+
+def test_discord_follows_rate_limits_and_embed_limits():
+    async def run():
+        discord = FakeDiscord([
+            (429, {}, {"retry_after": 0.2, "global": False}),
+            (204, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset-After": "0.1"}, None),
+            (204, {}, None),
+        ])
+        await discord.start()
+        started = time.monotonic()
+        discord.notify_many([arb(1), arb(2)])
+        await discord.flush()
+        elapsed = time.monotonic() - started
+        # Webhook window used up: the next message waits for it to reset
+        delay = discord.bucket.delay()
+        await discord.close()
+        return discord, elapsed, delay
+
+    discord, elapsed, delay = asyncio.run(run())
+    assert len(discord.payloads) == 2
+    assert len(discord.payloads[1]["embeds"]) == 2
+    assert "Runner 0** 2.20 @ TAB" in discord.payloads[1]["embeds"][0]["description"]
+    assert elapsed >= 0.2
+    assert delay >= 0.1
+
+    # Racing fields make long embeds, which are split over several messages
+    discord = FakeDiscord([])
+    batch = []
+    for i in range(10):
+        alert = Alert(arb(i, runners=20), queued_at=0.0, expires_at=60.0)
+        if not discord.fits(batch, alert):
+            break
+        batch.append(alert)
+    assert 1 <= len(batch) < 10
+    assert sum(embed_chars(opportunity_embed(alert.opportunity)) for alert in batch) <= MAX_MESSAGE_CHARS
@@ -0,0 +1,217 @@
+import asyncio
+from collections import Counter
+from datetime import datetime, timedelta
+import time
+
+from aiohttp import web
+
+from surebetbot.config.bookmakers import ScrapeBudget
+from surebetbot.core.models import Bookmaker, Event, Market, MarketType, Outcome, SportType
+from surebetbot.core.rate_limit import TokenBucket
+from surebetbot.scheduler import Scheduler, refresh_interval
+from surebetbot.scrapers.base_scraper import BaseScraper
+from surebetbot.scrapers.http_client import HttpClient
+
+SPORTSBET = Bookmaker(id="sportsbet", name="Sportsbet", base_url="https://www.sportsbet.com.au")
+TAB = Bookmaker(id="tab", name="TAB", base_url="https://www.tab.com.au")
+
+
+def unlimited(bookmaker_id):
+    return ScrapeBudget(requests_per_second=1000.0, burst=1000, concurrent_pages=4, bytes_per_minute=2**30)
+
+
+def make_event(url, sport, start_time, bookmaker=SPORTSBET):
+    return Event(
+        id=url,
+        sport=sport,
+        home_team=url,
+        away_team="",
+        competition="Test",
+        start_time=start_time,
+        markets=[Market(id="win", type=MarketType.WIN, name="Win", outcomes=[Outcome("1. Runner", 3.0)])],
+        bookmaker=bookmaker,
+        url=url,
+    )
+
+
+class FakeScraper:
+    def __init__(self, events, bookmaker=SPORTSBET, delay=0.0):
+        self.bookmaker = bookmaker
+        self.events = {event.url: event for event in events}
+        self.delay = delay
+        self.scraped = Counter()
+        self.open_pages = 0
+        self.most_pages = 0
+        self.request_bucket = None
+
+    async def request(self):
+        # Every fetch and page load of a real scraper takes a request token first
+        if self.request_bucket is not None:
+            await self.request_bucket.acquire()
+
+    async def scrape_sport_http(self, sport):
+        await self.request()
+        self.scraped["listing"] += 1
+        return list(self.events.values())
+
+    async def scrape_sport(self, sport):
+        raise AssertionError("the HTTP listing worked")
+
+    async def scrape_event(self, url):
+        await self.request()
+        self.scraped[url] += 1
+        self.open_pages += 1
+        self.most_pages = max(self.most_pages, self.open_pages)
+        await asyncio.sleep(self.delay)
+        self.open_pages -= 1
+        return self.events.get(url)
+
+
+def test_refresh_interval_shrinks_towards_the_start():
+    three_minutes = refresh_interval(180, min_interval=10, max_interval=3600, fraction=0.02)
+    hour = refresh_interval(3600, min_interval=10, max_interval=3600, fraction=0.02)
+    week = refresh_interval(7 * 86400, min_interval=10, max_interval=3600, fraction=0.02)
+    assert three_minutes == 10 and hour == 72 and week == 3600
+    assert refresh_interval(-60, min_interval=10, max_interval=3600, fraction=0.02) == 10
+
+
+def test_events_near_the_start_are_refreshed_far_more_often():
+    now = datetime.now()
+    scraper = FakeScraper([
+        make_event("race", SportType.HORSE_RACING, now + timedelta(minutes=3)),
+        make_event("match", SportType.SOCCER, now + timedelta(days=7)),
+        make_event("finished", SportType.HORSE_RACING, now - timedelta(minutes=10)),
+    ])
+    results = []
+
+    async def run():
+        scheduler = Scheduler(
+            [scraper], results.append, concurrency=2,
+            min_interval=0.02, max_interval=1.0, fraction=0.0001, discovery_interval=10.0, budgets=unlimited,
+        )
+        task = asyncio.create_task(scheduler.run())
+        await asyncio.sleep(0.5)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return scheduler
+
+    scheduler = asyncio.run(run())
+    assert scraper.scraped["listing"] == 1
+    assert scraper.scraped["race"] >= 10
+    assert scraper.scraped["match"] == 0
+    assert scraper.scraped["finished"] == 0
+    # The listing and every race refresh reached the callback
+    assert len(results) == 1 + scraper.scraped["race"]
+    assert {job[1] for job in scheduler._jobs} == {"race", "match", "SOCCER"}
+
+
+def test_events_without_a_start_time_are_refreshed_at_the_longest_interval():
+    now = datetime.now()
+    # The page showed no start time, so the scraper fell back to the time it parsed the event
+    event = make_event("dom", SportType.SOCCER, now)
+    event.start_time_known = False
+    scraper = FakeScraper([event])
+
+    async def run():
+        scheduler = Scheduler(
+            [scraper], lambda result: None, min_interval=0.01, max_interval=0.1, fraction=0.0001,
+            discovery_interval=10.0, after_start=0.0, clock=lambda: now + timedelta(seconds=1), budgets=unlimited,
+        )
+        task = asyncio.create_task(scheduler.run())
+        await asyncio.sleep(0.35)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return scheduler
+
+    scheduler = asyncio.run(run())
+    assert 2 <= scraper.scraped["dom"] <= 4
+    assert ("sportsbet", "dom") in scheduler._jobs
+
+
+def test_a_throttled_bookmaker_does_not_hold_up_the_others():
+    now = datetime.now()
+    soon = now + timedelta(minutes=3)
+    slow = FakeScraper([make_event(f"tab{i}", SportType.HORSE_RACING, soon, TAB) for i in range(10)], TAB)
+    fast = FakeScraper(
+        [make_event(f"sb{i}", SportType.HORSE_RACING, soon) for i in range(10)], SPORTSBET, delay=0.02,
+    )
+    budgets = {
+        "tab": ScrapeBudget(requests_per_second=2.0, burst=2, concurrent_pages=1),
+        "sportsbet": ScrapeBudget(requests_per_second=1000.0, burst=1000, concurrent_pages=2),
+    }
+
+    async def run():
+        scheduler = Scheduler(
+            [slow, fast], lambda result: None, concurrency=4,
+            min_interval=0.02, max_interval=1.0, fraction=0.0001, discovery_interval=10.0, budgets=budgets.get,
+        )
+        task = asyncio.create_task(scheduler.run())
+        await asyncio.sleep(0.5)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(run())
+    tab = sum(slow.scraped.values())
+    sportsbet = sum(fast.scraped.values())
+    # TAB's burst and half a second at two a second, listing included
+    assert tab <= 4
+    # Sportsbet's backlog took the slots TAB could not use, two pages at a time
+    assert sportsbet >= 10 * tab
+    assert fast.most_pages == 2 and slow.most_pages == 1
+
+
+class ApiScraper(BaseScraper):
+    def __init__(self, urls):
+        super().__init__(TAB)
+        self.urls = urls
+
+    def get_api_urls(self, sport_type):
+        return self.urls
+
+    def parse_api_response(self, sport_type, url, payload):
+        return []
+
+    async def scrape(self, sport_types=None):
+        raise NotImplementedError
+
+    async def scrape_sport(self, sport_type):
+        raise NotImplementedError
+
+    async def scrape_event(self, event_url):
+        raise NotImplementedError
+
+    def get_sport_paths(self):
+        return {}
+
+
+def test_every_fetch_of_a_listing_spends_the_bookmakers_budget():
+    async def handler(request):
+        return web.json_response({"events": [], "padding": "x" * 1000})
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/events/{page}", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        scraper = ApiScraper([f"http://127.0.0.1:{port}/events/{page}" for page in range(6)])
+        scraper.http = HttpClient()
+        scraper.request_bucket = TokenBucket(rate=20, capacity=2)
+        scraper.byte_bucket = TokenBucket(rate=1, capacity=100000)
+        try:
+            started = time.monotonic()
+            await scraper.scrape_sport_http(SportType.SOCCER)
+            return scraper, time.monotonic() - started
+        finally:
+            await scraper.http.close()
+            await runner.cleanup()
+
+    scraper, elapsed = asyncio.run(run())
+    # A burst of two, then the other four at 20 a second
+    assert elapsed >= 0.19
+    assert scraper.requests_made == 6
+    assert scraper.bytes_received > 6000
+    assert scraper.byte_bucket.tokens < 100000 - scraper.bytes_received + 1
@@ -1,10 +1,18 @@
 import asyncio
 import json
+
+from aiohttp import web
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 import os
 
-from surebetbot.core.models import Bookmaker, SportType
+from surebetbot.config.bookmakers import ResourceFilterConfig
+from surebetbot.core.models import Bookmaker, Event, MarketType, SportType
+from surebetbot.scrapers.event_index import EventIndex, hash_listing_odds
+from surebetbot.scrapers.http_client import HttpClient
+from surebetbot.scrapers.network_capture import parse_events, parse_markets, parse_start_time
+from surebetbot.scrapers.readiness import PageReadiness, ReadinessCondition
+from surebetbot.scrapers.resource_filter import ResourceFilter
 from surebetbot.scrapers.sportsbet import SportsbetScraper
 
 # Set up logging
@@ -118,6 +126,308 @@ async def test_sportsbet_scraper():
         # Ensure cleanup happens
         await scraper.cleanup()
 
+class FakeRequest:
+    def __init__(self, url, resource_type):
+        self.url = url
+        self.resource_type = resource_type
+
+
+class FakeRoute:
+    def __init__(self, url, resource_type):
+        self.request = FakeRequest(url, resource_type)
+        self.outcome = None
+
+    async def abort(self, error_code=None):
+        self.outcome = "aborted"
+
+    async def continue_(self):
+        self.outcome = "continued"
+
+
+def test_resource_filter_blocks_heavy_resources_and_trackers():
+    resource_filter = ResourceFilter("sportsbet", ResourceFilterConfig(
+        allowed_url_patterns=["sportsbet.com.au/apigw"]
+    ))
+    
+    assert resource_filter.should_block("https://www.sportsbet.com.au/silks/1.png", "image")
+    assert resource_filter.should_block("https://www.google-analytics.com/analytics.js", "script")
+    assert not resource_filter.should_block("https://www.sportsbet.com.au/soccer", "document")
+    assert not resource_filter.should_block("https://www.sportsbet.com.au/apigw/icon.png", "image")
+
+
+def test_resource_filter_counts_blocked_requests():
+    resource_filter = ResourceFilter("sportsbet", ResourceFilterConfig())
+    routes = [
+        FakeRoute("https://www.sportsbet.com.au/logo.png", "image"),
+        FakeRoute("https://fonts.example.com/font.woff2", "font"),
+        FakeRoute("https://www.sportsbet.com.au/app.js", "script"),
+    ]
+    
+    async def run():
+        for route in routes:
+            await resource_filter._handle_route(route)
+    
+    asyncio.run(run())
+    
+    assert [route.outcome for route in routes] == ["aborted", "aborted", "continued"]
+    assert resource_filter.stats.blocked == 2
+    assert resource_filter.stats.allowed == 1
+    assert resource_filter.stats.blocked_by_type == {"image": 1, "font": 1}
+    assert resource_filter.stats.estimated_bytes_saved > 0
+
+
+def test_parse_markets_from_captured_sports_json():
+    payloads = [("https://www.sportsbet.com.au/apigw/sportsbook-sports/Sportsbook/Sports/Events/1/Markets", [
+        {
+            "id": 101,
+            "name": "Win-Draw-Win",
+            "selections": [
+                {"name": "Arsenal", "price": {"winPrice": 2.1}},
+                {"name": "Draw", "price": {"winPrice": 3.4}},
+                {"name": "Chelsea", "price": {"winPrice": 3.6}},
+            ],
+        },
+        {"id": 102, "name": "Total Goals Over/Under 2.5", "selections": [
+            {"name": "Over 2.5", "price": {"winPrice": 1.9}},
+            {"name": "Under 2.5", "price": {"winPrice": 1.95}, "statusCode": "S"},
+        ]},
+    ])]
+    
+    markets = {market.id: market for market in parse_markets(payloads)}
+    
+    assert markets["101"].type == MarketType.WIN
+    assert [(o.name, o.odds) for o in markets["101"].outcomes] == [("Arsenal", 2.1), ("Draw", 3.4), ("Chelsea", 3.6)]
+    # Suspended selections are dropped
+    assert [o.name for o in markets["102"].outcomes] == ["Over 2.5"]
+
+
+def test_parse_markets_from_captured_racing_json():
+    payloads = [("https://www.sportsbet.com.au/apigw/sportsbook-racing/Sportsbook/Racing/Events/9", {
+        "id": 9,
+        "displayName": "Race 1 - Flemington",
+        "startTime": 1743890400,
+        "markets": [{
+            "id": 55,
+            "selections": [
+                {"name": "Fast Horse", "runnerNumber": 1, "prices": [{"winPrice": 3.5, "placePrice": 1.5}]},
+                {"name": "Slow Horse", "runnerNumber": 2, "prices": [{"winPrice": 8.0, "placePrice": 2.4}]},
+                {"name": "Gone Horse", "runnerNumber": 3, "statusCode": "SCRATCHED", "prices": [{"winPrice": 5.0}]},
+            ],
+        }],
+    })]
+    
+    markets = {market.type: market for market in parse_markets(payloads)}
+    
+    assert [(o.name, o.odds) for o in markets[MarketType.WIN].outcomes] == [("1. Fast Horse", 3.5), ("2. Slow Horse", 8.0)]
+    assert [o.odds for o in markets[MarketType.PLACE].outcomes] == [1.5, 2.4]
+    assert parse_start_time(payloads) == datetime.fromtimestamp(1743890400)
+
+
+def test_parse_events_from_listing_json():
+    sportsbet = Bookmaker(id="sportsbet", name="Sportsbet", base_url="https://www.sportsbet.com.au")
+    payload = [{
+        "id": 7001,
+        "name": "Arsenal v Chelsea",
+        "competitionName": "English Premier League",
+        "startTime": 1743890400,
+        "httpLink": "/betting/soccer/arsenal-v-chelsea-7001",
+        "primaryMarket": {"id": 1, "name": "Win-Draw-Win", "selections": [
+            {"name": "Arsenal", "price": {"winPrice": 2.1}},
+            {"name": "Draw", "price": {"winPrice": 3.4}},
+            {"name": "Chelsea", "price": {"winPrice": 3.6}},
+        ]},
+    }]
+    
+    events = parse_events(payload, sportsbet, SportType.SOCCER, "https://example.test/events")
+    
+    assert len(events) == 1
+    event = events[0]
+    assert (event.home_team, event.away_team) == ("Arsenal", "Chelsea")
+    assert event.competition == "English Premier League"
+    assert event.url == "https://www.sportsbet.com.au/betting/soccer/arsenal-v-chelsea-7001"
+    assert event.markets[0].type == MarketType.WIN
+
+
+def test_http_client_retries_transient_errors():
+    attempts = []
+    
+    async def handler(request):
+        attempts.append(request)
+        if len(attempts) < 3:
+            return web.Response(status=503)
+        return web.json_response({"ok": True})
+    
+    async def run():
+        app = web.Application()
+        app.router.add_get("/events", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        
+        client = HttpClient(max_retries=3, backoff=0.001)
+        try:
+            return await client.get_json(f"http://127.0.0.1:{port}/events")
+        finally:
+            await client.close()
+            await runner.cleanup()
+    
+    assert asyncio.run(run()) == {"ok": True}
+    assert len(attempts) == 3
+
+
+def test_http_client_does_not_retry_undecodable_bodies_and_caps_retry_after():
+    attempts = []
+    
+    async def broken(request):
+        attempts.append(request)
+        return web.Response(text="<html>maintenance</html>")
+    
+    async def run():
+        app = web.Application()
+        app.router.add_get("/broken", broken)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        
+        client = HttpClient(max_retries=3, backoff=0.001, max_retry_after=30)
+        try:
+            return await client.get_json(f"http://127.0.0.1:{port}/broken"), client
+        finally:
+            await client.close()
+            await runner.cleanup()
+    
+    body, client = asyncio.run(run())
+    assert body is None
+    assert len(attempts) == 1
+    assert client._retry_delay(0, "86400") == 30
+    assert client._retry_delay(0, "2") == 2
+
+
+class FakeEventPage:
+    def __init__(self):
+        self.listeners = {}
+        self.selectors = []
+    
+    def on(self, event, handler):
+        self.listeners.setdefault(event, []).append(handler)
+    
+    def remove_listener(self, event, handler):
+        self.listeners[event].remove(handler)
+    
+    def emit(self, event, request):
+        for handler in list(self.listeners.get(event, [])):
+            handler(request)
+    
+    async def wait_for_selector(self, selector, state=None, timeout=None):
+        self.selectors.append(selector)
+    
+    async def wait_for_function(self, expression, arg=None, timeout=None):
+        self.selectors.append(arg[0])
+
+
+def test_page_readiness_waits_for_network_quiet():
+    async def run():
+        page = FakeEventPage()
+        readiness = PageReadiness(page, "event")
+        readiness.condition = ReadinessCondition(
+            content_selectors=[".market"], odds_selectors=[".price"], min_odds=2,
+            network_quiet_ms=50, timeout_ms=2000
+        )
+        api_call = FakeRequest("https://www.sportsbet.com.au/apigw/event/1", "xhr")
+        stream = FakeRequest("https://www.sportsbet.com.au/push", "eventsource")
+        page.emit("request", api_call)
+        page.emit("request", stream)  # Never finishes, must not block readiness
+        
+        loop = asyncio.get_running_loop()
+        loop.call_later(0.1, page.emit, "requestfinished", api_call)
+        started = loop.time()
+        ready = await readiness.wait()
+        elapsed = loop.time() - started
+        
+        readiness.detach()
+        readiness.detach()
+        return ready, elapsed, page
+    
+    ready, elapsed, page = asyncio.run(run())
+    
+    assert ready
+    assert 0.15 <= elapsed < 1.0
+    assert page.selectors == [".market", ".price"]
+    assert not any(page.listeners.values())
+
+
+def test_page_readiness_gives_up_when_budget_runs_out():
+    async def run():
+        page = FakeEventPage()
+        readiness = PageReadiness(page, "sport_listing")
+        readiness.condition = ReadinessCondition(network_quiet_ms=50, timeout_ms=200)
+        page.emit("request", FakeRequest("https://www.sportsbet.com.au/slow", "xhr"))
+        
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        ready = await readiness.wait(check_dom=False)
+        return ready, loop.time() - started
+    
+    ready, elapsed = asyncio.run(run())
+    
+    assert not ready
+    assert 0.15 <= elapsed < 1.0
+
+
+def test_event_index_only_refreshes_changed_near_start_and_stale_events():
+    now = datetime(2024, 5, 1, 12, 0)
+    index = EventIndex(stale_after=timedelta(minutes=10), near_start=timedelta(minutes=30))
+    bookmaker = Bookmaker(id="sportsbet", name="Sportsbet", base_url="https://www.sportsbet.com.au")
+    
+    def make_event(url, start_time):
+        return Event(
+            id=url, sport=SportType.SOCCER, home_team="Home", away_team="Away", competition="League",
+            start_time=start_time, markets=[], bookmaker=bookmaker, url=url
+        )
+    
+    odds = hash_listing_odds(["2.10", "3.40", "3.25"])
+    index.record("/later", make_event("/later", now + timedelta(hours=5)), odds, now)
+    index.record("/soon", make_event("/soon", now + timedelta(minutes=20)), odds, now)
+    
+    later = now + timedelta(minutes=2)
+    assert not index.needs_refresh("/later", odds, later)
+    assert index.needs_refresh("/later", hash_listing_odds(["2.20", "3.40", "3.25"]), later)
+    assert index.needs_refresh("/soon", odds, later)
+    assert index.needs_refresh("/new", odds, later)
+    assert index.needs_refresh("/later", odds, now + timedelta(minutes=10))
+    
+    to_parse, unchanged = index.select([
+        {"url": "/later", "odds_hash": odds},
+        {"url": "/soon", "odds_hash": odds},
+        {"url": "/new", "odds_hash": None},
+    ], later)
+    assert [listing["url"] for listing in to_parse] == ["/soon", "/new"]
+    assert [event.url for event in unchanged] == ["/later"]
+    assert index.get("/later").last_seen == later
+
+
+def test_event_index_skips_unchanged_events_without_a_start_time():
+    now = datetime(2024, 5, 1, 12, 0)
+    index = EventIndex(stale_after=timedelta(minutes=10), near_start=timedelta(minutes=30))
+    bookmaker = Bookmaker(id="sportsbet", name="Sportsbet", base_url="https://www.sportsbet.com.au")
+    # The page showed no start time, so the scraper fell back to the parse time
+    event = Event(
+        id="/dom", sport=SportType.SOCCER, home_team="Home", away_team="Away", competition="League",
+        start_time=now, markets=[], bookmaker=bookmaker, url="/dom", start_time_known=False
+    )
+    
+    odds = hash_listing_odds(["2.10", "3.40", "3.25"])
+    index.record("/dom", event, odds, now)
+    
+    assert index.get("/dom").start_time is None
+    assert not index.needs_refresh("/dom", odds, now + timedelta(minutes=2))
+    assert index.needs_refresh("/dom", odds, now + timedelta(minutes=10))
+
+
 if __name__ == "__main__":
     logger.info("Starting scraper test")
     asyncio.run(test_sportsbet_scraper())
@@ -0,0 +1,218 @@
+import asyncio
+import random
+import sqlite3
+from dataclasses import FrozenInstanceError
+from datetime import datetime, timedelta
+
+import pytest
+
+from surebetbot.core.arbitrage import make_opportunity
+from surebetbot.core.models import Bookmaker, Event, Market, MarketType, Outcome, ScrapingResult, SportType
+from surebetbot.storage.alert_history import AlertHistory
+from surebetbot.storage.in_memory import OrderBookIndex
+from surebetbot.storage.sqlite_handler import SqliteHistory
+
+
+BOOKMAKERS = [
+    Bookmaker(id=f"bookie{i}", name=f"Bookie {i}", base_url=f"https://bookie{i}.example.com")
+    for i in range(8)
+]
+
+
+def make_event(bookmaker, home_odds, away_odds):
+    return Event(
+        id=f"{bookmaker.id}_1",
+        sport=SportType.BASKETBALL,
+        home_team="Sydney Kings",
+        away_team="Perth Wildcats",
+        competition="NBL",
+        start_time=datetime(2024, 5, 1, 19, 30),
+        markets=[Market(id="h2h", type=MarketType.WIN, name="Head to Head", outcomes=[
+            Outcome("Sydney Kings", home_odds), Outcome("Perth Wildcats", away_odds)
+        ])],
+        bookmaker=bookmaker,
+        url=f"{bookmaker.base_url}/1"
+    )
+
+
+def test_order_book_keeps_best_and_runner_up_through_updates():
+    index = OrderBookIndex()
+    key = ("event", MarketType.WIN, None, "", "home")
+    prices = {}
+    rng = random.Random(7)
+
+    for _ in range(500):
+        bookmaker = rng.choice(BOOKMAKERS)
+        if prices and rng.random() < 0.2:
+            index.remove(key, bookmaker.id)
+            prices.pop(bookmaker.id, None)
+        else:
+            odds = round(rng.uniform(1.5, 3.0), 2)
+            index.update(key, bookmaker, odds)
+            prices[bookmaker.id] = odds
+
+        ranked = sorted(prices.values(), reverse=True)
+        best = index.best(key)
+        runner_up = index.runner_up(key)
+        assert (best.odds if best else None) == (ranked[0] if ranked else None)
+        assert (runner_up.odds if runner_up else None) == (ranked[1] if len(ranked) > 1 else None)
+
+
+def test_ingest_events_indexes_best_prices_and_drops_withdrawn_outcomes():
+    index = OrderBookIndex()
+    index.ingest_event(make_event(BOOKMAKERS[0], 1.90, 1.95))
+    index.ingest_event(make_event(BOOKMAKERS[1], 1.85, 2.05))
+
+    event = next(index.market_keys())[0]
+    best = index.best_prices(event, MarketType.WIN)
+    assert (best["home"].bookmaker.id, best["home"].odds) == ("bookie0", 1.90)
+    assert (best["away"].bookmaker.id, best["away"].odds) == ("bookie1", 2.05)
+    assert index.runner_up((event, MarketType.WIN, None, "", "away")).odds == 1.95
+
+    # Bookie 1 suspends its market
+    suspended = make_event(BOOKMAKERS[1], 1.85, 2.05)
+    suspended.markets = []
+    index.ingest_event(suspended)
+
+    best = index.best_prices(event, MarketType.WIN)
+    assert best["away"].bookmaker.id == "bookie0"
+    assert index.runner_up((event, MarketType.WIN, None, "", "away")) is None
+
+
+def test_started_events_are_evicted_from_the_order_book():
+    index = OrderBookIndex()
+    started = make_event(BOOKMAKERS[0], 1.90, 1.95)
+    later = make_event(BOOKMAKERS[0], 1.80, 2.00)
+    later.home_team, later.start_time = "Cairns Taipans", datetime(2024, 5, 1, 21, 30)
+    # The page showed no start time, so the parse time stands in for it
+    unknown = make_event(BOOKMAKERS[0], 1.70, 2.10)
+    unknown.home_team, unknown.start_time, unknown.start_time_known = "Brisbane Bullets", datetime(2024, 5, 1, 19, 0), False
+    for bookmaker in BOOKMAKERS[:2]:
+        for event in (started, later, unknown):
+            event.bookmaker = bookmaker
+            index.ingest_event(event, datetime(2024, 5, 1, 19, 0))
+    assert len(index) == 6
+
+    evicted = index.prune(datetime(2024, 5, 1, 19, 31), idle_before=datetime(2024, 5, 1, 18, 0))
+    assert [event[1] for event in evicted] == ["sydney kings"]
+    assert len(index) == 4
+    assert index.best_prices(evicted[0], MarketType.WIN) == {}
+
+    # Events without a start time go once no bookmaker has priced them for a while
+    assert [event[1] for event in index.prune(datetime(2024, 5, 1, 19, 31), datetime(2024, 5, 1, 20, 0))] == [
+        "brisbane bullets"
+    ]
+    assert {key[0][1] for key in index.market_keys()} == {"cairns taipans"}
+
+    # A bookmaker listing an evicted event again starts from scratch
+    started.bookmaker = BOOKMAKERS[0]
+    assert len(index.event_deltas(started)) == 2
+
+
+def test_models_are_slotted_with_interned_names():
+    first = Outcome("".join(["3. Horse", " Name"]), 4.5)
+    second = Outcome("".join(["3. Horse", " Name"]), 5.0)
+
+    assert not hasattr(first, "__dict__")
+    assert first.name is second.name
+    event = make_event(BOOKMAKERS[0], 1.9, 1.9)
+    assert event.home_team is make_event(BOOKMAKERS[1], 1.9, 1.9).home_team
+    assert not hasattr(event, "__dict__") and not hasattr(event.markets[0], "__dict__")
+    with pytest.raises(FrozenInstanceError):
+        first.odds = 6.0
+
+
+def test_sqlite_history_writes_snapshots_in_the_background(tmp_path):
+    path = str(tmp_path / "history.db")
+
+    async def run():
+        store = SqliteHistory(path)
+        await store.start()
+        first = datetime(2024, 5, 1, 18, 0)
+        store.write_results([ScrapingResult(BOOKMAKERS[0], [make_event(BOOKMAKERS[0], 1.90, 1.95)])], first)
+        store.write_results([ScrapingResult(BOOKMAKERS[0], [make_event(BOOKMAKERS[0], 1.85, 1.0)])],
+                            first + timedelta(minutes=1))
+        await store.flush()
+        history = store.price_history("bookie0", "bookie0_1", "h2h", "Perth Wildcats")
+        await store.close()
+        return history
+
+    history = asyncio.run(run())
+    assert [odds for _, odds in history] == [1.95, None]
+
+    connection = sqlite3.connect(path)
+    assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    index = connection.execute("PRAGMA index_info(ticks_by_outcome)").fetchall()
+    assert [column for _, _, column in index] == ["event", "market", "outcome", "ts"]
+    assert connection.execute("SELECT COUNT(*) FROM events").fetchone()[0] == 1
+
+
+def test_sqlite_history_stores_changes_only_and_compacts_into_bars(tmp_path):
+    path = str(tmp_path / "history.db")
+    start = datetime(2024, 5, 1, 18, 0)
+    # Perth drifts within the first five minutes, is suspended and comes back in the next five
+    prices = [(1.90, 1.95), (1.90, 1.95), (1.90, 2.05), (1.90, 1.90), (1.90, 1.0), (1.90, 1.0), (1.90, 2.0)]
+
+    async def run():
+        store = SqliteHistory(path)
+        await store.start()
+        for minute, (home, away) in enumerate(prices):
+            store.write_results([ScrapingResult(BOOKMAKERS[0], [make_event(BOOKMAKERS[0], home, away)])],
+                                start + timedelta(minutes=2 * minute))
+        await store.flush()
+        ticks = store.price_history("bookie0", "bookie0_1", "h2h", "Perth Wildcats")
+        compacted = await store.compact(start + timedelta(minutes=11), timedelta(minutes=5))
+        bars = store.price_bars("bookie0", "bookie0_1", "h2h", "Perth Wildcats")
+        kept = store.price_history("bookie0", "bookie0_1", "h2h", "Perth Wildcats")
+        await store.close()
+        return ticks, compacted, bars, kept
+
+    ticks, compacted, bars, kept = asyncio.run(run())
+    # Unchanged prices are not written again
+    assert [odds for _, odds in ticks] == [1.95, 2.05, 1.90, None, 2.0]
+    # Sydney's single tick and Perth's four before 18:10 are folded into bars
+    assert compacted == 5
+    assert bars == [
+        (start, 1.95, 2.05, 1.95, 2.05),
+        (start + timedelta(minutes=5), 1.90, 1.90, 1.90, None),
+    ]
+    assert [odds for _, odds in kept] == [2.0]
+
+
+def make_arb(home_odds, away_odds, away_bookmaker=BOOKMAKERS[1]):
+    return make_opportunity(
+        "Sydney Kings vs Perth Wildcats",
+        "Head to Head",
+        [("Sydney Kings", home_odds, BOOKMAKERS[0]), ("Perth Wildcats", away_odds, away_bookmaker)],
+        100.0,
+        market_key=("basketball_1", MarketType.WIN, None, ""),
+    )
+
+
+def test_opportunities_get_their_own_id_and_detection_time():
+    first, second = make_arb(2.10, 2.10), make_arb(2.10, 2.10)
+    assert first.id != second.id
+    assert first.fingerprint(0.5) == second.fingerprint(0.5)
+    assert make_arb(2.10, 2.10, BOOKMAKERS[2]).fingerprint(0.5) != first.fingerprint(0.5)
+
+
+def test_alert_history_refires_only_on_profit_change_or_expiry(tmp_path):
+    path = str(tmp_path / "alerts.db")
+    now = datetime(2024, 5, 1, 18, 0)
+    alerts = AlertHistory(path, ttl=timedelta(hours=1), profit_step=0.5)
+
+    assert alerts.should_alert(make_arb(2.10, 2.10), now)  # 5.0%
+    # Found again next cycle, odds wobbling within the same profit bucket
+    assert not alerts.should_alert(make_arb(2.10, 2.11), now + timedelta(minutes=1))
+    # Profit up to 7.5%
+    assert alerts.should_alert(make_arb(2.15, 2.15), now + timedelta(minutes=2))
+    alerts.close()
+
+    # A restart remembers what was alerted
+    alerts = AlertHistory(path, ttl=timedelta(hours=1), profit_step=0.5)
+    assert alerts.filter_new([make_arb(2.10, 2.10), make_arb(2.15, 2.15)], now + timedelta(minutes=3)) == []
+    assert len(alerts) == 2
+    # Until the TTL runs out
+    assert alerts.should_alert(make_arb(2.10, 2.10), now + timedelta(hours=1, minutes=5))
+    assert len(alerts) == 1
+    alerts.close()